@@ -6,6 +6,7 @@
 import collections.abc
 import contextlib
 import functools
+import gc
 import inspect
 import itertools
 import os
@@ -485,6 +486,18 @@ def __init__(self):
     def __getitem__(self, key):
         return self.dict[key]
 
+    def __contains__(self, key):
+        return key in self.dict
+
+    def keys(self):
+        return self.dict.keys()
+
+    def values(self):
+        return self.dict.values()
+
+    def items(self):
+        return self.dict.items()
+
     def __setitem__(self, key, value):
         self.dict[key] = value
 
@@ -954,6 +967,22 @@ def nullcontext(*args, **kwargs):
     yield
 
 
+@contextlib.contextmanager
+def disable_gc():
+    """Disable the cyclic garbage collector within the context.
+
+    Useful when creating many objects that stay alive, like the specs of a large DAG,
+    since the collections triggered by the allocations could not free any of them.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 class UnhashableArguments(TypeError):
     """Raise when an @memoized function receives unhashable arg or kwarg values."""
 
@@ -2517,8 +2517,8 @@ def __init__(self, all_architectures):
         specs = update_cache_and_get_specs()
 
         if not self.all_architectures:
-            arch = spack.spec.Spec.default_arch()
-            specs = [s for s in specs if s.satisfies(arch)]
+            matcher = spack.spec.SpecMatcher(spack.spec.Spec.default_arch())
+            specs = [s for s in specs if matcher(s)]
 
         self.possible_specs = specs
 
@@ -2527,7 +2527,8 @@ def __call__(self, spec: Spec, **kwargs):
         Args:
             spec: The spec being searched for
         """
-        return [s for s in self.possible_specs if s.satisfies(spec)]
+        matcher = spack.spec.SpecMatcher(spec)
+        return [s for s in self.possible_specs if matcher(s)]
 
 
 class FetchIndexError(Exception):
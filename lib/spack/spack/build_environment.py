@@ -32,18 +32,20 @@
 Skimming this module is a nice way to get acquainted with the types of
 calls you can make from within the install() function.
 """
+import contextlib
 import inspect
 import io
 import multiprocessing
 import os
 import re
 import sys
+import threading
 import traceback
 import types
 from collections import defaultdict
 from enum import Flag, auto
 from itertools import chain
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 import llnl.util.tty as tty
 from llnl.string import plural
@@ -140,6 +142,148 @@ def get_effective_jobs(jobs, parallel=True, supports_jobserver=False):
     return jobs
 
 
+class Jobserver:
+    """A GNU make compatible jobserver, i.e. a pipe holding one token per job slot.
+
+    Every process taking part in the build has an implicit slot, and has to read a token
+    from the pipe before running each additional job, then write it back when done. By
+    exporting the same jobserver to the packages built concurrently, the total number
+    of jobs stays bounded by the number of slots, plus one implicit slot per build.
+    """
+
+    def __init__(self, jobs: int):
+        self.jobs = jobs
+        self.read_fd, self.write_fd = os.pipe()
+        # Builds run make in a subprocess, which has to inherit the pipe
+        os.set_inheritable(self.read_fd, True)
+        os.set_inheritable(self.write_fd, True)
+        os.write(self.write_fd, b"+" * (jobs - 1))
+
+    @property
+    def makeflags(self) -> str:
+        """Value of MAKEFLAGS connecting make (>= 4.2) to this jobserver."""
+        return f"-j{self.jobs} --jobserver-auth={self.read_fd},{self.write_fd}"
+
+    def close(self) -> None:
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+@contextlib.contextmanager
+def shared_jobserver(jobs: int) -> Iterator[None]:
+    """Export a jobserver with ``jobs`` slots to all the builds started in the context.
+
+    Nothing is done if a jobserver is already available, e.g. when Spack itself is run
+    by make, since builds then use that one.
+    """
+    if sys.platform == "win32" or jobs <= 1 or jobserver_enabled():
+        yield
+        return
+
+    jobserver = Jobserver(jobs)
+    makeflags = os.environ.get("MAKEFLAGS")
+    os.environ["MAKEFLAGS"] = (
+        f"{makeflags} {jobserver.makeflags}" if makeflags else jobserver.makeflags
+    )
+    try:
+        yield
+    finally:
+        if makeflags is None:
+            del os.environ["MAKEFLAGS"]
+        else:
+            os.environ["MAKEFLAGS"] = makeflags
+        jobserver.close()
+
+
+def _jobserver_fds() -> Optional[Tuple[int, int, bool, bool]]:
+    """Return a private read file descriptor for the jobserver in MAKEFLAGS, its write file
+    descriptor, whether the latter was opened here, and whether the former shares its
+    open file with make, or None if the jobserver cannot be used.
+
+    Unless it shares its open file with make, the read file descriptor is non-blocking."""
+    makeflags = os.environ.get("MAKEFLAGS", "")
+
+    # make >= 4.4 uses a named pipe by default
+    m = re.search(r"--jobserver-auth=fifo:(\S+)", makeflags)
+    if m:
+        try:
+            read_fd = os.open(m.group(1), os.O_RDONLY | os.O_NONBLOCK)
+        except OSError:
+            return None
+        try:
+            write_fd = os.open(m.group(1), os.O_WRONLY)
+        except OSError:
+            os.close(read_fd)
+            return None
+        return read_fd, write_fd, True, False
+
+    m = re.search(r"--jobserver-(?:auth|fds)=(\d+),(\d+)", makeflags)
+    if not m:
+        return None
+    read_fd, write_fd = int(m.group(1)), int(m.group(2))
+    try:
+        os.fstat(write_fd)
+    except OSError:
+        return None
+    try:
+        # O_NONBLOCK is a property of the open file, which is shared with make through
+        # the inherited descriptor, so the pipe is opened again instead of duplicated.
+        private_fd = os.open(f"/proc/self/fd/{read_fd}", os.O_RDONLY | os.O_NONBLOCK)
+        return private_fd, write_fd, False, False
+    except OSError:
+        pass
+    # Without /proc, e.g. on macOS and the BSDs, the open file is shared with make
+    tty.debug("Cannot open the jobserver pipe again, sharing its open file with make")
+    try:
+        return os.dup(read_fd), write_fd, False, True
+    except OSError:
+        return None
+
+
+@contextlib.contextmanager
+def jobserver_tokens(jobs: int) -> Iterator[int]:
+    """Take up to ``jobs - 1`` job slots from the jobserver in MAKEFLAGS, without waiting,
+    and yield the number of jobs that can be run, including the implicit slot of the
+    current process. The slots are given back on exit.
+
+    This is meant for tools that cannot act as jobserver clients themselves. If the
+    jobserver is not usable, ``jobs`` is yielded.
+    """
+    fds = _jobserver_fds() if sys.platform != "win32" else None
+    if fds is None:
+        yield jobs
+        return
+
+    read_fd, write_fd, opened, shared = fds
+    tokens = b""
+    try:
+        # An open file shared with make is non-blocking only while taking the slots
+        blocking = shared and os.get_blocking(read_fd)
+        if blocking:
+            os.set_blocking(read_fd, False)
+        try:
+            while len(tokens) < jobs - 1:
+                # Other clients may take the tokens at any time, so the pipe is never
+                # read in blocking mode
+                try:
+                    data = os.read(read_fd, jobs - 1 - len(tokens))
+                except BlockingIOError:
+                    break
+                if not data:
+                    break
+                tokens += data
+        finally:
+            if blocking:
+                os.set_blocking(read_fd, True)
+        yield len(tokens) + 1
+    finally:
+        if tokens:
+            os.write(write_fd, tokens)
+        os.close(read_fd)
+        if opened:
+            os.close(write_fd)
+
+
 class MakeExecutable(Executable):
     """Special callable executable object for make so the user can specify
     parallelism options on a per-invocation basis.  Specifying
@@ -162,12 +306,21 @@ def __call__(self, *args, **kwargs):
         remaining arguments are passed through to the superclass.
         """
         parallel = kwargs.pop("parallel", True)
-        jobs_env = kwargs.pop("jobs_env", None)
-        jobs_env_supports_jobserver = kwargs.pop("jobs_env_supports_jobserver", False)
-
         jobs = get_effective_jobs(
             self.jobs, parallel=parallel, supports_jobserver=self.supports_jobserver
         )
+
+        # Executables that are not jobserver clients take their job slots from the
+        # jobserver up front, so that concurrent builds do not oversubscribe the node.
+        if jobs is not None and jobs > 1 and jobserver_enabled():
+            with jobserver_tokens(jobs) as jobs:
+                return self._call_with_jobs(jobs, parallel, *args, **kwargs)
+        return self._call_with_jobs(jobs, parallel, *args, **kwargs)
+
+    def _call_with_jobs(self, jobs, parallel, *args, **kwargs):
+        jobs_env = kwargs.pop("jobs_env", None)
+        jobs_env_supports_jobserver = kwargs.pop("jobs_env_supports_jobserver", False)
+
         if jobs is not None:
             args = ("-j{0}".format(jobs),) + args
 
@@ -1175,6 +1328,167 @@ def _setup_pkg_and_run(
             input_multiprocess_fd.close()
 
 
+#: Held while forking build processes, and to change the number of busy helper threads
+_fork_lock = threading.Lock()
+_busy_helper_threads = 0
+
+
+@contextlib.contextmanager
+def busy_helper_thread() -> Iterator[None]:
+    """Mark the calling thread as busy, e.g. downloading or extracting a package, until
+    the end of the context.
+
+    A forked child only has the thread that forked it, and locks held at that time by
+    other threads, e.g. in the SSL library or on a buffered stream, are never released in
+    the child. Build processes are forked only while no helper thread is busy, and are
+    spawned otherwise, see ``BuildProcess.start``.
+    """
+    global _busy_helper_threads
+    with _fork_lock:
+        _busy_helper_threads += 1
+    try:
+        yield
+    finally:
+        with _fork_lock:
+            _busy_helper_threads -= 1
+
+
+class BuildProcess:
+    """Child process running part of a spack build, see ``start_build_process``.
+
+    Splitting the lifecycle of the child into ``start`` and ``complete`` allows
+    callers to keep several build processes in flight at the same time, and to
+    wait on their ``read_pipe`` until one of them reports back.
+    """
+
+    def __init__(self, pkg, function, kwargs):
+        self.pkg = pkg
+        self.function = function
+        self.kwargs = kwargs
+        self.process = None
+        self.read_pipe = None
+
+    def start(self) -> None:
+        """Start the child process, which immediately starts running the function.
+
+        The child is forked, unless helper threads are busy, in which case it is spawned.
+        """
+        with _fork_lock:
+            context = multiprocessing.get_context()
+            if _busy_helper_threads and context.get_start_method() == "fork":
+                context = multiprocessing.get_context("spawn")
+            self._start(context)
+
+    def _start(self, context) -> None:
+        read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
+        input_multiprocess_fd = None
+        jobserver_fd1 = None
+        jobserver_fd2 = None
+
+        serialized_pkg = spack.subprocess_context.PackageInstallContext(
+            self.pkg, serialize_state=context.get_start_method() != "fork"
+        )
+
+        try:
+            # Forward sys.stdin when appropriate, to allow toggling verbosity
+            if sys.platform != "win32" and sys.stdin.isatty() and hasattr(sys.stdin, "fileno"):
+                input_fd = os.dup(sys.stdin.fileno())
+                input_multiprocess_fd = MultiProcessFd(input_fd)
+            mflags = os.environ.get("MAKEFLAGS", False)
+            if mflags:
+                m = re.search(r"--jobserver-[^=]*=(\d+),(\d+)", mflags)
+                if m:
+                    jobserver_fd1 = MultiProcessFd(int(m.group(1)))
+                    jobserver_fd2 = MultiProcessFd(int(m.group(2)))
+
+            p = context.Process(
+                target=_setup_pkg_and_run,
+                args=(
+                    serialized_pkg,
+                    self.function,
+                    self.kwargs,
+                    write_pipe,
+                    input_multiprocess_fd,
+                    jobserver_fd1,
+                    jobserver_fd2,
+                ),
+            )
+
+            p.start()
+
+            # We close the writable end of the pipe now to be sure that p is the
+            # only process which owns a handle for it. This ensures that when p
+            # closes its handle for the writable end, read_pipe.recv() will
+            # promptly report the readable end as being ready.
+            write_pipe.close()
+
+        except InstallError as e:
+            e.pkg = self.pkg
+            raise
+
+        finally:
+            # Close the input stream in the parent process
+            if input_multiprocess_fd is not None:
+                input_multiprocess_fd.close()
+
+        self.process = p
+        self.read_pipe = read_pipe
+
+    def poll(self) -> bool:
+        """Return ``True`` if the child has sent its result or stopped, without blocking."""
+        assert self.read_pipe is not None, "the build process has not been started"
+        return self.read_pipe.poll()
+
+    def terminate(self) -> None:
+        """Terminate the child process, if still running, and reap it."""
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+    def complete(self):
+        """Wait for the child process to finish and return the function's result.
+
+        Errors raised in the child are re-raised in the parent process.
+        """
+        assert self.process is not None, "the build process has not been started"
+        p = self.process
+
+        def exitcode_msg(p):
+            typ = "exit" if p.exitcode >= 0 else "signal"
+            return f"{typ} {abs(p.exitcode)}"
+
+        try:
+            child_result = self.read_pipe.recv()
+        except EOFError:
+            p.join()
+            raise InstallError(f"The process has stopped unexpectedly ({exitcode_msg(p)})")
+
+        p.join()
+
+        # If returns a StopPhase, raise it
+        if isinstance(child_result, StopPhase):
+            # do not print
+            raise child_result
+
+        # let the caller know which package went wrong.
+        if isinstance(child_result, InstallError):
+            child_result.pkg = self.pkg
+
+        if isinstance(child_result, ChildError):
+            # If the child process raised an error, print its output here rather
+            # than waiting until the call to SpackError.die() in main(). This
+            # allows exception handling output to be logged from within Spack.
+            # see spack.main.SpackCommand.
+            child_result.print_context()
+            raise child_result
+
+        # Fallback. Usually caught beforehand in EOFError above.
+        if p.exitcode != 0:
+            raise InstallError(f"The process failed unexpectedly ({exitcode_msg(p)})")
+
+        return child_result
+
+
 def start_build_process(pkg, function, kwargs):
     """Create a child process to do part of a spack build.
 
@@ -1214,89 +1528,9 @@ def child_fun():
     For more information on `multiprocessing` child process creation
     mechanisms, see https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
     """
-    read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
-    input_multiprocess_fd = None
-    jobserver_fd1 = None
-    jobserver_fd2 = None
-
-    serialized_pkg = spack.subprocess_context.PackageInstallContext(pkg)
-
-    try:
-        # Forward sys.stdin when appropriate, to allow toggling verbosity
-        if sys.platform != "win32" and sys.stdin.isatty() and hasattr(sys.stdin, "fileno"):
-            input_fd = os.dup(sys.stdin.fileno())
-            input_multiprocess_fd = MultiProcessFd(input_fd)
-        mflags = os.environ.get("MAKEFLAGS", False)
-        if mflags:
-            m = re.search(r"--jobserver-[^=]*=(\d),(\d)", mflags)
-            if m:
-                jobserver_fd1 = MultiProcessFd(int(m.group(1)))
-                jobserver_fd2 = MultiProcessFd(int(m.group(2)))
-
-        p = multiprocessing.Process(
-            target=_setup_pkg_and_run,
-            args=(
-                serialized_pkg,
-                function,
-                kwargs,
-                write_pipe,
-                input_multiprocess_fd,
-                jobserver_fd1,
-                jobserver_fd2,
-            ),
-        )
-
-        p.start()
-
-        # We close the writable end of the pipe now to be sure that p is the
-        # only process which owns a handle for it. This ensures that when p
-        # closes its handle for the writable end, read_pipe.recv() will
-        # promptly report the readable end as being ready.
-        write_pipe.close()
-
-    except InstallError as e:
-        e.pkg = pkg
-        raise
-
-    finally:
-        # Close the input stream in the parent process
-        if input_multiprocess_fd is not None:
-            input_multiprocess_fd.close()
-
-    def exitcode_msg(p):
-        typ = "exit" if p.exitcode >= 0 else "signal"
-        return f"{typ} {abs(p.exitcode)}"
-
-    try:
-        child_result = read_pipe.recv()
-    except EOFError:
-        p.join()
-        raise InstallError(f"The process has stopped unexpectedly ({exitcode_msg(p)})")
-
-    p.join()
-
-    # If returns a StopPhase, raise it
-    if isinstance(child_result, StopPhase):
-        # do not print
-        raise child_result
-
-    # let the caller know which package went wrong.
-    if isinstance(child_result, InstallError):
-        child_result.pkg = pkg
-
-    if isinstance(child_result, ChildError):
-        # If the child process raised an error, print its output here rather
-        # than waiting until the call to SpackError.die() in main(). This
-        # allows exception handling output to be logged from within Spack.
-        # see spack.main.SpackCommand.
-        child_result.print_context()
-        raise child_result
-
-    # Fallback. Usually caught beforehand in EOFError above.
-    if p.exitcode != 0:
-        raise InstallError(f"The process failed unexpectedly ({exitcode_msg(p)})")
-
-    return child_result
+    process = BuildProcess(pkg, function, kwargs)
+    process.start()
+    return process.complete()
 
 
 CONTEXT_BASES = (spack.package_base.PackageBase, spack.build_systems._checks.BaseBuilder)
@@ -901,12 +901,13 @@ def list_fn(args):
         tty.die(e)
 
     if not args.allarch:
-        arch = spack.spec.Spec.default_arch()
-        specs = [s for s in specs if s.intersects(arch)]
+        # Specs in build caches are concrete, so matching them is the same as intersecting
+        arch = spack.spec.SpecMatcher(spack.spec.Spec.default_arch())
+        specs = [s for s in specs if arch(s)]
 
     if args.specs:
-        constraints = set(args.specs)
-        specs = [s for s in specs if any(s.intersects(c) for c in constraints)]
+        constraints = [spack.spec.SpecMatcher(c) for c in set(args.specs)]
+        specs = [s for s in specs if any(c(s) for c in constraints)]
     if sys.stdout.isatty():
         builds = len(specs)
         tty.msg("%s." % plural(builds, "cached build"))
@@ -15,6 +15,7 @@
 import spack.cmd.test
 import spack.config
 import spack.repo
+import spack.solver.cache
 import spack.stage
 import spack.store
 import spack.util.path
@@ -52,6 +53,12 @@ def setup_parser(subparser):
         action="store_true",
         help="remove long-lived caches, like the virtual package index",
     )
+    subparser.add_argument(
+        "-c",
+        "--concretization-cache",
+        action="store_true",
+        help="remove the caches of the concretizer",
+    )
     subparser.add_argument(
         "-p",
         "--python-cache",
@@ -98,6 +105,7 @@ def clean(parser, args):
             args.downloads,
             args.failures,
             args.misc_cache,
+            args.concretization_cache,
             args.python_cache,
             args.bootstrap,
         ]
@@ -128,6 +136,13 @@ def clean(parser, args):
         tty.msg("Removing cached information on repositories")
         spack.caches.MISC_CACHE.destroy()
 
+    if args.concretization_cache:
+        tty.msg("Removing cached concretization results")
+        cache_location = spack.solver.cache.concretization_cache_location()
+        spack.solver.cache.ConcretizationCache(cache_location).destroy()
+        cache_location = spack.solver.cache.package_facts_cache_location()
+        spack.solver.cache.SolverCache(cache_location).destroy()
+
     if args.python_cache:
         tty.msg("Removing python cache files")
         remove_python_cache()
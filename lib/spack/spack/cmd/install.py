@@ -98,6 +98,13 @@ def setup_parser(subparser):
         action="store_true",
         help="stop all builds if any build fails (default is best effort)",
     )
+    subparser.add_argument(
+        "--concurrent-packages",
+        type=int,
+        default=None,
+        metavar="N",
+        help="maximum number of packages to build at the same time (default 1)",
+    )
     subparser.add_argument(
         "--keep-prefix",
         action="store_true",
@@ -329,6 +336,13 @@ def install(parser, args):
     if args.deprecated:
         spack.config.set("config:deprecated", True, scope="command_line")
 
+    if args.concurrent_packages is not None:
+        if args.concurrent_packages < 1:
+            tty.die("the '--concurrent-packages' argument must be a positive integer")
+        spack.config.set(
+            "config:concurrent_packages", args.concurrent_packages, scope="command_line"
+        )
+
     if args.log_file and not args.log_format:
         msg = "the '--log-format' must be specified when using '--log-file'"
         tty.die(msg)
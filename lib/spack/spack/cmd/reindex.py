@@ -3,12 +3,60 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import time
+
+import llnl.util.tty as tty
+from llnl.util.lang import pretty_seconds
+
 import spack.store
 
 description = "rebuild Spack's package database"
 section = "admin"
 level = "long"
 
+#: Minimum number of seconds between two progress messages
+PROGRESS_INTERVAL = 5.0
+
+
+def setup_parser(subparser):
+    subparser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="number of threads looking for and reading spec files concurrently",
+    )
+    subparser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only read the spec files modified since the database was last written",
+    )
+
+
+class _Progress:
+    """Report the spec files processed while reindexing, at most every few seconds."""
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+
+    def __call__(self, done: int, total: int) -> None:
+        now = time.perf_counter()
+        if now - self.last < PROGRESS_INTERVAL:
+            return
+        self.last = now
+        rate = done / (now - self.start)
+        tty.msg(f"Processed {done} of {total} spec files ({rate:.0f}/s)")
+
 
 def reindex(parser, args):
-    spack.store.STORE.reindex()
+    if args.jobs is not None and args.jobs < 1:
+        tty.die("the number of jobs must be a positive integer")
+
+    stats = spack.store.STORE.reindex(
+        jobs=args.jobs, incremental=args.incremental, progress=_Progress()
+    )
+    rate = stats.prefixes / stats.seconds if stats.seconds > 0 else 0.0
+    tty.msg(
+        f"Reindexed {stats.prefixes} install prefixes in {pretty_seconds(stats.seconds)} "
+        f"({rate:.0f}/s): {stats.read} spec files read, {stats.reused} reused"
+    )
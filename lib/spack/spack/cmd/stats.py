@@ -0,0 +1,202 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+from collections import defaultdict
+from typing import Any, Dict, List, Union
+
+import llnl.util.tty as tty
+from llnl.util.lang import pretty_seconds
+from llnl.util.tty.colify import colify_table
+
+import spack.install_history
+import spack.store
+import spack.version
+
+description = "report statistics on the time taken to install packages"
+section = "admin"
+level = "long"
+
+#: A record of the install history, see ``spack.install_history.InstallHistory``
+Record = Dict[str, Any]
+
+
+def setup_parser(subparser):
+    setup_parser.parser = subparser
+    subparsers = subparser.add_subparsers(help="stats sub-commands")
+
+    slowest = subparsers.add_parser("slowest", help=stats_slowest.__doc__)
+    slowest.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of packages to show (default 10)",
+    )
+    slowest.add_argument(
+        "--from-cache",
+        action="store_true",
+        help="rank installs from binary caches instead of builds from sources",
+    )
+    slowest.set_defaults(func=stats_slowest)
+
+    phases = subparsers.add_parser("phases", help=stats_phases.__doc__)
+    phases.add_argument("package", help="name of the package")
+    phases.add_argument("--version", help="only consider builds of this version")
+    phases.set_defaults(func=stats_phases)
+
+    regressions = subparsers.add_parser("regressions", help=stats_regressions.__doc__)
+    regressions.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=20.0,
+        metavar="PERCENT",
+        help="minimum slowdown to report, in percent (default 20)",
+    )
+    regressions.set_defaults(func=stats_regressions)
+
+    cache = subparsers.add_parser("cache", help=stats_cache.__doc__)
+    cache.set_defaults(func=stats_cache)
+
+    clear = subparsers.add_parser("clear", help=stats_clear.__doc__)
+    clear.set_defaults(func=stats_clear)
+
+
+def _records_by_name(from_cache: bool) -> Dict[str, List[Record]]:
+    """Group the records of the installs from sources, or from binary caches, by package."""
+    by_name: Dict[str, List[Record]] = defaultdict(list)
+    for record in spack.store.STORE.install_history.records():
+        if bool(record.get("cache", False)) == from_cache:
+            by_name[record["name"]].append(record)
+    return by_name
+
+
+def _mean(records: List[Record]) -> float:
+    return sum(record["total"] for record in records) / len(records)
+
+
+def stats_slowest(args):
+    """show the packages taking the longest to install"""
+    by_name = _records_by_name(args.from_cache)
+    if not by_name:
+        tty.msg("No install times recorded")
+        return
+
+    ranked = sorted(by_name.items(), key=lambda item: _mean(item[1]), reverse=True)
+    table = [["PACKAGE", "LAST VERSION", "INSTALLS", "MEAN", "MAX"]]
+    for name, records in ranked[: args.number]:
+        table.append(
+            [
+                name,
+                records[-1].get("version", ""),
+                str(len(records)),
+                pretty_seconds(_mean(records)),
+                pretty_seconds(max(record["total"] for record in records)),
+            ]
+        )
+    colify_table(table)
+
+
+def stats_phases(args):
+    """show the mean time of each phase of the builds of a package"""
+    records = [
+        record
+        for record in spack.store.STORE.install_history.records(args.package)
+        if not record.get("cache", False)
+        and (args.version is None or record.get("version") == args.version)
+    ]
+    if not records:
+        tty.msg(f"No builds from sources recorded for {args.package}")
+        return
+
+    table = [["PHASE", "MEAN"]]
+    for path, seconds in spack.install_history.phase_seconds(records).items():
+        table.append([path, pretty_seconds(seconds)])
+    table.append(["total", pretty_seconds(_mean(records))])
+    tty.msg(f"{args.package}: {len(records)} builds from sources")
+    colify_table(table)
+
+
+def stats_regressions(args):
+    """show packages whose latest version builds slower than the previous one"""
+    table = [["PACKAGE", "VERSION", "MEAN", "PREVIOUS", "MEAN", "CHANGE"]]
+    for name, records in sorted(_records_by_name(from_cache=False).items()):
+        by_version: Dict[
+            Union[spack.version.GitVersion, spack.version.StandardVersion], List[Record]
+        ] = {}
+        for record in records:
+            try:
+                version = spack.version.Version(record.get("version", ""))
+            except ValueError:
+                continue
+            by_version.setdefault(version, []).append(record)
+        if len(by_version) < 2:
+            continue
+
+        # Compare the two highest versions, whatever the order they were built in
+        previous, latest = sorted(by_version)[-2:]
+        previous_records, latest_records = by_version[previous], by_version[latest]
+        previous_mean, latest_mean = _mean(previous_records), _mean(latest_records)
+        if previous_mean <= 0:
+            continue
+
+        change = 100.0 * (latest_mean - previous_mean) / previous_mean
+        if change >= args.threshold:
+            table.append(
+                [
+                    name,
+                    str(latest),
+                    pretty_seconds(latest_mean),
+                    str(previous),
+                    pretty_seconds(previous_mean),
+                    f"+{change:.0f}%",
+                ]
+            )
+
+    if len(table) == 1:
+        tty.msg(f"No build time regressions above {args.threshold:g}%")
+        return
+    colify_table(table)
+
+
+def stats_cache(args):
+    """show how many installs were from binary caches rather than from sources"""
+    from_cache = _records_by_name(from_cache=True)
+    from_source = _records_by_name(from_cache=False)
+    names = sorted(set(from_cache) | set(from_source))
+    if not names:
+        tty.msg("No install times recorded")
+        return
+
+    table = [["PACKAGE", "FROM CACHE", "FROM SOURCE", "SOURCE TIME"]]
+    for name in names:
+        source_records = from_source.get(name, [])
+        source_time = sum(record["total"] for record in source_records)
+        table.append(
+            [
+                name,
+                str(len(from_cache.get(name, []))),
+                str(len(source_records)),
+                pretty_seconds(source_time) if source_records else "-",
+            ]
+        )
+    colify_table(table)
+
+    cached = sum(len(records) for records in from_cache.values())
+    total = cached + sum(len(records) for records in from_source.values())
+    tty.msg(f"{cached} of {total} installs from binary caches ({100.0 * cached / total:.0f}%)")
+
+
+def stats_clear(args):
+    """remove all the recorded install times"""
+    spack.store.STORE.install_history.clear()
+
+
+def stats(parser, args):
+    if not hasattr(args, "func"):
+        setup_parser.parser.print_help()
+        return
+    args.func(args)
@@ -132,26 +132,17 @@ def find_matching_specs(
 
 
 def installed_dependents(specs: List[spack.spec.Spec]) -> List[spack.spec.Spec]:
-    # Note: the combination of arguments (in particular order=breadth
-    # and root=False) ensures dependents and matching_specs are non-overlapping;
-    # In the extreme case of "spack uninstall --all" we get the entire database as
-    # input; in that case we return an empty list.
-
-    def is_installed(spec):
-        record = spack.store.STORE.db.query_local_by_spec_hash(spec.dag_hash())
-        return record and record.installed
-
-    specs = traverse.traverse_nodes(
-        specs,
-        root=False,
-        order="breadth",
-        cover="nodes",
-        deptype=("link", "run"),
-        direction="parents",
-        key=lambda s: s.dag_hash(),
-    )
-
-    return [spec for spec in specs if is_installed(spec)]
+    # Note: dependents are returned in breadth-first order and never include the
+    # matching specs, so they are non-overlapping; In the extreme case of
+    # "spack uninstall --all" we get the entire database as input; in that case we
+    # return an empty list.
+    db = spack.store.STORE.db
+    with db.read_transaction():
+        hashes = db.relatives_hashes(
+            [spec.dag_hash() for spec in specs], direction="parents", deptype=("link", "run")
+        )
+        records = (db.query_local_by_spec_hash(hash_key) for hash_key in hashes)
+        return [record.spec for record in records if record and record.installed]
 
 
 def dependent_environments(
@@ -18,12 +18,18 @@
 provides a cache and a sanity checking mechanism for what is in the
 filesystem.
 """
+import bisect
+import concurrent.futures
 import contextlib
 import datetime
+import functools
+import hashlib
 import os
 import pathlib
+import pickle
 import socket
 import sys
+import threading
 import time
 from typing import (
     Any,
@@ -31,6 +37,7 @@
     Container,
     Dict,
     Generator,
+    Iterable,
     List,
     NamedTuple,
     Optional,
@@ -49,12 +56,13 @@
     pass
 
 import llnl.util.filesystem as fs
+import llnl.util.lang as lang
 import llnl.util.tty as tty
 
 import spack.deptypes as dt
 import spack.hash_types as ht
 import spack.spec
-import spack.traverse as tr
+import spack.util.file_cache
 import spack.util.lock as lk
 import spack.util.spack_json as sjson
 import spack.version as vn
@@ -104,6 +112,14 @@
 #: We store by DAG hash, so we track the dependencies that the DAG hash includes.
 _TRACKED_DEPENDENCIES = ht.dag_hash.depflag
 
+#: The journal is compacted into the index when it would grow larger than this
+#: fraction of the size of the index, since readers that start from scratch
+#: have to replay it on top of the index.
+JOURNAL_COMPACTION_RATIO = 0.25
+
+#: Minimum size in bytes of the journal before it is compacted into the index
+JOURNAL_MIN_COMPACTION_SIZE = 256 * 1024
+
 #: Default list of fields written for each install record
 DEFAULT_INSTALL_RECORD_FIELDS = (
     "spec",
@@ -189,6 +205,9 @@ class InstallRecord:
     actually remove from the database until a spec has no installed
     dependents left.
 
+    Records read from an index build their spec only when it is first
+    accessed, see ``_LazySpecLoader``.
+
     Args:
         spec: spec tracked by the install record
         path: path where the spec has been installed
@@ -211,6 +230,9 @@ def __init__(
         in_buildcache: bool = False,
         origin=None,
     ):
+        # Node dictionary of the spec and its loader, until the spec is built
+        self._node_dict: Optional[Dict[str, Any]] = None
+        self._spec_loader: Optional["_LazySpecLoader"] = None
         self.spec = spec
         self.path = str(path) if path else None
         self.installed = bool(installed)
@@ -221,20 +243,86 @@ def __init__(
         self.in_buildcache = in_buildcache
         self.origin = origin
 
-    def install_type_matches(self, installed):
-        installed = InstallStatuses.canonicalize(installed)
+    def __getstate__(self):
+        # The loader of the spec belongs to the database the record was read into
+        state = self.__dict__.copy()
+        state["_spec_loader"] = None
+        return state
+
+    @property
+    def spec(self) -> "spack.spec.Spec":
+        """Spec tracked by the install record"""
+        if self._spec is None:
+            assert self._spec_loader is not None, "install record without a spec"
+            self._spec_loader.load(self)
+        return self._spec
+
+    @spec.setter
+    def spec(self, spec: "spack.spec.Spec") -> None:
+        self._spec = spec
+        self._node_dict = None
+        self._spec_loader = None
+
+    @property
+    def name(self) -> str:
+        """Name of the package installed, which does not need the spec to be built"""
+        if self._spec is None:
+            assert self._node_dict is not None
+            return self._node_dict["name"]
+        return self._spec.name
+
+    @property
+    def namespace(self) -> Optional[str]:
+        """Namespace of the package installed, which does not need the spec to be built"""
+        if self._spec is None:
+            assert self._node_dict is not None
+            return self._node_dict.get("namespace")
+        return self._spec.namespace
+
+    @property
+    def external(self) -> bool:
+        """Whether the spec is external, which does not need the spec to be built"""
+        if self._spec is None:
+            assert self._node_dict is not None
+            external = self._node_dict.get("external") or {}
+            return bool(external.get("path") or external.get("module"))
+        return self._spec.external
+
+    @property
+    def install_status(self) -> InstallStatus:
+        """Whether the spec is installed, deprecated, or missing"""
         if self.installed:
-            return InstallStatuses.INSTALLED in installed
+            return InstallStatuses.INSTALLED
         elif self.deprecated_for:
-            return InstallStatuses.DEPRECATED in installed
+            return InstallStatuses.DEPRECATED
         else:
-            return InstallStatuses.MISSING in installed
+            return InstallStatuses.MISSING
+
+    def install_type_matches(self, installed):
+        installed = InstallStatuses.canonicalize(installed)
+        return self.install_status in installed
+
+    def dependency_hashes(self) -> List[Tuple[str, dt.DepFlag]]:
+        """DAG hashes and dependency types of the direct dependencies, which does not
+        need the spec to be built"""
+        if self._spec is None:
+            assert self._node_dict is not None and self._spec_loader is not None
+            reader = self._spec_loader.spec_reader
+            return [
+                (dhash, dt.canonicalize(dtypes))
+                for _, dhash, dtypes, _, _ in reader.dependencies_from_node_dict(self._node_dict)
+            ]
+        return [
+            (edge.spec.dag_hash(), edge.depflag) for edge in self._spec.edges_to_dependencies()
+        ]
 
     def to_dict(self, include_fields=DEFAULT_INSTALL_RECORD_FIELDS):
         rec_dict = {}
 
         for field_name in include_fields:
-            if field_name == "spec":
+            if field_name == "spec" and self._spec is None:
+                rec_dict.update({"spec": self._node_dict})
+            elif field_name == "spec":
                 rec_dict.update({"spec": self.spec.node_dict_with_hashes()})
             elif field_name == "deprecated_for" and self.deprecated_for:
                 rec_dict.update({"deprecated_for": self.deprecated_for})
@@ -261,6 +349,272 @@ def from_dict(cls, spec, dictionary):
         return InstallRecord(spec, **d)
 
 
+class _LazySpecLoader:
+    """Builds the specs of the install records read from an index when they are
+    first accessed.
+
+    Reading an index only decodes its JSON. When the spec of a record is first
+    needed, the loader builds it together with the specs of all its dependencies
+    not built yet, connects them, and marks them concrete, like reading the whole
+    index would. Queries touching a few records therefore do not pay for building
+    the specs of the whole store.
+
+    The dependents of a spec built by the loader are built the first time they are
+    read, e.g. when traversing parents, see ``Database._build_dependents()``.
+    """
+
+    def __init__(
+        self,
+        db: "Database",
+        spec_reader: Type["spack.spec.SpecfileReaderBase"],
+        data: Dict[str, InstallRecord],
+    ):
+        """
+        Args:
+            db: database the records were read into
+            spec_reader: reader for the specfile format of the index
+            data: install records of the database, by DAG hash
+        """
+        self.db = db
+        self.spec_reader = spec_reader
+        self.data = data
+        # Specs may be needed by different threads, e.g. during installs
+        self.lock = threading.Lock()
+
+    def _dependency_spec(self, hash_key: str) -> Optional["spack.spec.Spec"]:
+        # The local database comes first, then upstreams in order, like in
+        # Database.query_by_spec_hash()
+        if hash_key in self.data:
+            return self.data[hash_key].spec
+        record = self.db._upstream_record(hash_key)[1]
+        return record.spec if record is not None else None
+
+    def load(self, record: InstallRecord) -> None:
+        """Build the spec of a record, and of its dependencies not built yet."""
+        with self.lock, lang.disable_gc():
+            # Another thread may have built it in the meantime
+            if record._spec is not None:
+                return
+
+            new_specs: Dict[str, Tuple[InstallRecord, "spack.spec.Spec", List[Any]]] = {}
+            stack = [record]
+            while stack:
+                rec = stack.pop()
+                hash_key = rec._node_dict[ht.dag_hash.name]
+                if hash_key in new_specs:
+                    continue
+                try:
+                    spec = self.spec_reader.from_node_dict(rec._node_dict)
+                    dependencies = self.spec_reader.dependencies_from_node_dict(rec._node_dict)
+                except Exception as e:
+                    raise CorruptDatabaseError(
+                        f"Invalid record in Spack database: hash: {hash_key}, cause: "
+                        f"{type(e).__name__}: {e}",
+                        self.db._index_path,
+                    ) from e
+                new_specs[hash_key] = (rec, spec, dependencies)
+                for _, dhash, _, _, _ in dependencies:
+                    dep_rec = self.data.get(dhash)
+                    if dep_rec is not None and dep_rec._spec_loader is self:
+                        stack.append(dep_rec)
+
+            for rec, spec, dependencies in new_specs.values():
+                for _, dhash, dtypes, _, virtuals in dependencies:
+                    if dhash in new_specs:
+                        child = new_specs[dhash][1]
+                    else:
+                        child = self._dependency_spec(dhash)
+                    # Missing dependencies were reported when reading the index
+                    if child is not None:
+                        spec._add_dependency(
+                            child, depflag=dt.canonicalize(dtypes), virtuals=virtuals
+                        )
+
+            # Mark specs concrete once all their dependencies are connected, so that
+            # no hash is cached prematurely.
+            for hash_key, (rec, spec, _) in new_specs.items():
+                spec._mark_root_concrete()
+                spec._complete_dependents = functools.partial(self.db._build_dependents, hash_key)
+                rec.spec = spec
+
+
+#: Indexed attributes of an install record: name, namespace, explicit, install status
+_IndexEntry = Tuple[str, Optional[str], bool, InstallStatus]
+
+
+class _RecordIndex:
+    """Secondary indexes of the install records of a database, by package name,
+    namespace, explicit flag, install status, and DAG hash prefix, together with
+    the edges between the records in both directions.
+
+    The database invalidates the records it adds, changes or removes, and they are
+    indexed again before the next lookup. The whole index is rebuilt if the records
+    of the database are replaced, e.g. when the index file is read again.
+    """
+
+    def __init__(self) -> None:
+        self._reset(None)
+
+    def _reset(self, data: Optional[Dict[str, InstallRecord]]) -> None:
+        #: Records indexed, by DAG hash
+        self.data = data
+        #: Indexed attributes of each record
+        self.entries: Dict[str, _IndexEntry] = {}
+        #: Position of each record in the database, to return keys in that order
+        self.order: Dict[str, int] = {}
+        self.by_name: Dict[str, Dict[str, None]] = {}
+        self.by_namespace: Dict[Optional[str], Dict[str, None]] = {}
+        self.by_explicit: Dict[bool, Dict[str, None]] = {True: {}, False: {}}
+        self.by_status: Dict[InstallStatus, Dict[str, None]] = {
+            status: {} for status in InstallStatuses.canonicalize(any)
+        }
+        #: Sorted DAG hashes, for prefix lookups, or None if to be sorted again
+        self.sorted_hashes: Optional[List[str]] = None
+        #: Keys of the records to index again
+        self.stale: Set[str] = set()
+        #: Dependency types of the edges to the direct dependencies of each record
+        self.dependencies: Dict[str, Dict[str, dt.DepFlag]] = {}
+        #: Dependency types of the edges from the direct dependents of each record,
+        #: including records of upstream databases
+        self.dependents: Dict[str, Dict[str, dt.DepFlag]] = {}
+
+    def invalidate(self, key: str) -> None:
+        """Index the record with this key again, or remove it from the index if it was
+        removed from the database, before the next lookup."""
+        self.stale.add(key)
+
+    def _add_edges(self, key: str, rec: InstallRecord) -> None:
+        # The dependencies of a record never change, since they are part of its hash
+        if key in self.dependencies:
+            return
+        self.dependencies[key] = {}
+        for dhash, depflag in rec.dependency_hashes():
+            self.dependencies[key][dhash] = self.dependencies[key].get(dhash, 0) | depflag
+            dependents = self.dependents.setdefault(dhash, {})
+            dependents[key] = dependents.get(key, 0) | depflag
+
+    def _remove_edges(self, key: str) -> None:
+        for dhash in self.dependencies.pop(key, {}):
+            dependents = self.dependents[dhash]
+            del dependents[key]
+            if not dependents:
+                del self.dependents[dhash]
+
+    def _add(self, key: str, rec: InstallRecord) -> None:
+        self._add_edges(key, rec)
+        entry = (rec.name, rec.namespace, bool(rec.explicit), rec.install_status)
+        self.entries[key] = entry
+        if key not in self.order:
+            self.order[key] = len(self.order)
+            self.sorted_hashes = None
+        name, namespace, explicit, status = entry
+        self.by_name.setdefault(name, {})[key] = None
+        self.by_namespace.setdefault(namespace, {})[key] = None
+        self.by_explicit[explicit][key] = None
+        self.by_status[status][key] = None
+
+    def _remove(self, key: str) -> None:
+        name, namespace, explicit, status = self.entries.pop(key)
+        del self.by_name[name][key]
+        if not self.by_name[name]:
+            del self.by_name[name]
+        del self.by_namespace[namespace][key]
+        if not self.by_namespace[namespace]:
+            del self.by_namespace[namespace]
+        del self.by_explicit[explicit][key]
+        del self.by_status[status][key]
+
+    def update(self, data: Dict[str, InstallRecord]) -> None:
+        """Bring the index up to date with the records of a database."""
+        if data is not self.data:
+            self._reset(data)
+            for key, rec in data.items():
+                self._add(key, rec)
+            return
+
+        for key in self.stale:
+            if key in self.entries:
+                self._remove(key)
+            if key in data:
+                self._add(key, data[key])
+            else:
+                self._remove_edges(key)
+                self.order.pop(key, None)
+                self.sorted_hashes = None
+        self.stale.clear()
+
+    def hashes_with_prefix(self, prefix: str) -> List[str]:
+        """DAG hashes of the records starting with a prefix, in database order."""
+        if self.sorted_hashes is None:
+            self.sorted_hashes = sorted(self.entries)
+        start = bisect.bisect_left(self.sorted_hashes, prefix)
+        keys = []
+        for key in self.sorted_hashes[start:]:
+            if not key.startswith(prefix):
+                break
+            keys.append(key)
+        keys.sort(key=self.order.__getitem__)
+        return keys
+
+    def relatives(self, keys: Iterable[str], direction: str, deptype: dt.DepFlag) -> List[str]:
+        """Keys of the direct relatives of some records, through edges with some of
+        the dependency types given.
+
+        Args:
+            keys: keys of the records
+            direction: either "parents" or "children"
+            deptype: follow only the edges with these dependency types
+        """
+        edges = self.dependents if direction == "parents" else self.dependencies
+        return [
+            relative
+            for key in keys
+            for relative, depflag in edges.get(key, {}).items()
+            if depflag & deptype
+        ]
+
+    def select(
+        self,
+        name: Optional[str] = None,
+        namespace: Optional[str] = None,
+        hash_prefix: Optional[str] = None,
+        explicit=any,
+        installed=any,
+        hashes: Optional[Container[str]] = None,
+    ) -> Optional[List[str]]:
+        """Keys of the records that may match the arguments, in database order.
+
+        Return:
+            The candidate keys, or None if the arguments do not narrow down the
+            records to look at
+        """
+        buckets: List[Container[str]] = []
+        if name is not None:
+            buckets.append(self.by_name.get(name, {}))
+        if namespace is not None:
+            # Records without a namespace satisfy queries with any namespace
+            buckets.append(
+                {**self.by_namespace.get(None, {}), **self.by_namespace.get(namespace, {})}
+            )
+        if hash_prefix is not None:
+            buckets.append(dict.fromkeys(self.hashes_with_prefix(hash_prefix)))
+        if explicit is not any:
+            buckets.append(self.by_explicit[bool(explicit)])
+        statuses = InstallStatuses.canonicalize(installed)
+        if len(statuses) == 1:
+            buckets.append(self.by_status[statuses[0]])
+        if hashes is not None:
+            buckets.append({key: None for key in hashes if key in self.entries})
+
+        if not buckets:
+            return None
+
+        smallest = min(buckets, key=len)  # type: ignore[arg-type]
+        keys = [key for key in smallest if all(key in b for b in buckets if b is not smallest)]
+        keys.sort(key=self.order.__getitem__)
+        return keys
+
+
 class ForbiddenLockError(SpackError):
     """Raised when an upstream DB attempts to acquire a lock"""
 
@@ -322,6 +676,28 @@ def __reduce__(self):
         """
 
 
+class ReindexStats(NamedTuple):
+    """Data class reporting on a reindex of a database
+
+    Args:
+        prefixes: number of install prefixes found in the directory layout
+        read: number of spec files read and parsed
+        reused: number of specs reused from the previous index, whose spec file
+            did not change since it was written
+        seconds: time taken to reindex the database
+    """
+
+    prefixes: int
+    read: int
+    reused: int
+    seconds: float
+
+
+#: Function called with the number of spec files processed, and the total number
+#: of spec files, while reindexing a database
+ReindexProgress = Callable[[int, int], None]
+
+
 class LockConfiguration(NamedTuple):
     """Data class to configure locks in Database objects
 
@@ -597,6 +973,7 @@ def __init__(
         upstream_dbs: Optional[List["Database"]] = None,
         is_upstream: bool = False,
         lock_cfg: LockConfiguration = DEFAULT_LOCK_CFG,
+        journal: bool = False,
     ) -> None:
         """Database for Spack installations.
 
@@ -616,6 +993,8 @@ def __init__(
             is_upstream: whether this repository is an upstream.
             lock_cfg: configuration for the locks to be used by this repository.
                 Relevant only if the repository is not an upstream.
+            journal: whether write transactions append the records they change to a
+                journal, instead of rewriting the whole index.
         """
         self.root = root
         self.database_directory = os.path.join(self.root, _DB_DIRNAME)
@@ -625,6 +1004,9 @@ def __init__(
         self._verifier_path = os.path.join(self.database_directory, "index_verifier")
         self._lock_path = os.path.join(self.database_directory, "lock")
 
+        # Changes made since index.json was last written, see _write_journal
+        self._journal_path = os.path.join(self.database_directory, "index_journal.jsonl")
+
         # Create needed directories and files
         if not is_upstream and not os.path.exists(self.database_directory):
             fs.mkdirp(self.database_directory)
@@ -662,6 +1044,11 @@ def __init__(
         self._installed_prefixes: Set[str] = set()
 
         self.upstream_dbs = list(upstream_dbs) if upstream_dbs else []
+        # Upstream database and record of each hash, and the state of the upstream
+        # databases it was computed from
+        self._upstream_view: Optional[
+            Tuple[List[Any], Dict[str, Tuple["Database", InstallRecord]]]
+        ] = None
 
         # whether there was an error at the start of a read transaction
         self._error = None
@@ -674,6 +1061,18 @@ def __init__(
         self._write_transaction_impl = lk.WriteTransaction
         self._read_transaction_impl = lk.ReadTransaction
 
+        self.journal = journal
+        # Size of the part of the journal already read
+        self._journal_offset = 0
+        # Seconds between full writes of the index while batching writes, or None
+        self._flush_interval: Optional[float] = None
+        self._last_flush = 0.0
+        # Keys of the records changed since the last write, in the order they were
+        # changed, or None if changes were not tracked and the index must be written
+        self._changed_keys: Optional[Dict[str, None]] = {}
+        # Secondary indexes of the records, for queries
+        self._index = _RecordIndex()
+
     def write_transaction(self):
         """Get a write lock context manager for use in a `with` block."""
         return self._write_transaction_impl(self.lock, acquire=self._read, release=self._write)
@@ -682,6 +1081,183 @@ def read_transaction(self):
         """Get a read lock context manager for use in a `with` block."""
         return self._read_transaction_impl(self.lock, acquire=self._read)
 
+    @contextlib.contextmanager
+    def batched_writes(self, flush_interval: float):
+        """Context manager that batches the writes of the index.
+
+        Instead of rewriting ``index.json`` in every write transaction, the records
+        changed are appended to the journal next to it, which any process reading
+        the database replays on top of the index. The index is rewritten, and the
+        journal emptied, at most every ``flush_interval`` seconds, and when leaving
+        the context unless the database is always journaled.
+
+        If Spack is killed in the meantime, no record is lost: the journal is
+        replayed by readers until the next write of the index includes it.
+
+        Args:
+            flush_interval: minimum number of seconds between writes of the index.
+                Writes are not batched if this is not positive.
+        """
+        if flush_interval <= 0 or self.is_upstream or self._flush_interval is not None:
+            yield
+            return
+
+        self._flush_interval = flush_interval
+        self._last_flush = time.time()
+        try:
+            yield
+        finally:
+            self._flush_interval = None
+            if not self.journal and os.path.exists(self._journal_path):
+                self.compact()
+
+    def compact(self):
+        """Rewrite the whole index, including the changes in the journal, and empty
+        the journal."""
+        with self.write_transaction():
+            self._changed_keys = None
+
+    def _changed(self, key: str) -> None:
+        """Record that the install record with this key was added, changed or removed.
+
+        Does no locking.
+        """
+        if self._changed_keys is not None:
+            self._changed_keys[key] = None
+        self._index.invalidate(key)
+
+    def _must_compact(self, journal_size: int) -> bool:
+        """Whether the journal, if it grows to ``journal_size`` bytes, has to be
+        compacted into the index instead."""
+        if not self.journal:
+            # Writes are batched
+            return time.time() - self._last_flush >= self._flush_interval
+
+        try:
+            index_size = os.stat(self._index_path).st_size
+        except OSError:
+            return True
+        limit = max(JOURNAL_MIN_COMPACTION_SIZE, JOURNAL_COMPACTION_RATIO * index_size)
+        return journal_size > limit
+
+    def _write_journal(self, keys: Dict[str, None]) -> bool:
+        """Append the changes to some records to the journal.
+
+        There is an entry for each record: ``{"op": "add", "key": ..., "record": ...}``
+        for records that were added or changed, which replaces any existing record
+        with the same key, and ``{"op": "remove", "key": ...}`` for records that were
+        removed. Records are added after their dependencies.
+
+        Does no locking.
+
+        Return:
+            ``False``, without writing anything, if the journal has to be compacted
+            into the index instead
+        """
+        if not os.path.isfile(self._index_path):
+            return False
+
+        lines = [
+            sjson.dump({"op": "remove", "key": key}) + "\n"  # type: ignore[operator]
+            for key in keys
+            if key not in self._data
+        ]
+        # Follow the order of the records in memory, where records added since the
+        # index was read come after their dependencies
+        for key, rec in self._data.items():
+            if key in keys:
+                entry = {
+                    "op": "add",
+                    "key": key,
+                    "record": rec.to_dict(include_fields=self.record_fields),
+                }
+                lines.append(sjson.dump(entry) + "\n")  # type: ignore[operator]
+
+        data = "".join(lines).encode("utf-8")
+        if self._must_compact(self._journal_offset + len(data)):
+            return False
+
+        # A single write, so that a reader never sees a partial entry unless
+        # Spack is killed while writing it.
+        with open(self._journal_path, "ab") as f:
+            # Drop the partial entry left by an interrupted write, if any, which
+            # would otherwise be completed by the first of these entries. The
+            # journal was read up to its last complete entry in this transaction.
+            if os.fstat(f.fileno()).st_size > self._journal_offset:
+                f.truncate(self._journal_offset)
+            f.write(data)
+            self._journal_offset = f.tell()
+        return True
+
+    def _read_journal(self):
+        """Replay the entries of the journal not yet read on top of the in-memory
+        database.
+
+        Does not do any locking.
+        """
+        try:
+            f = open(self._journal_path, "rb")
+        except FileNotFoundError:
+            self._journal_offset = 0
+            return
+
+        with f:
+            if os.fstat(f.fileno()).st_size < self._journal_offset:
+                self._journal_offset = 0
+            f.seek(self._journal_offset)
+
+            spec_reader = reader(_DB_VERSION)
+            for line in f:
+                # Stop at a partial line, left by an interrupted write
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = sjson.load(line.decode("utf-8"))
+                    self._replay_journal_entry(spec_reader, entry)
+                except MissingDependenciesError:
+                    raise
+                except Exception as e:
+                    raise CorruptDatabaseError(
+                        f"Invalid journal entry in Spack database: {type(e).__name__}: {e}",
+                        self._journal_path,
+                    ) from e
+                self._journal_offset += len(line)
+
+    def _replay_journal_entry(self, spec_reader, entry):
+        """Add, update or remove a record according to an entry of the journal.
+
+        Does not do any locking.
+        """
+        hash_key = entry["key"]
+        self._index.invalidate(hash_key)
+        record = self._data.get(hash_key)
+        if record is not None and record.installed and not record.external:
+            self._installed_prefixes.discard(record.path)
+
+        if entry["op"] == "remove":
+            if record is not None:
+                del self._data[hash_key]
+                if record._spec is not None:
+                    record.spec.detach(deptype=_TRACKED_DEPENDENCIES)
+            return
+
+        rec = entry["record"]
+        if record is not None:
+            # Keep the existing spec, which other records depend on.
+            for field_name, value in vars(InstallRecord.from_dict(None, rec)).items():
+                if not field_name.startswith("_"):
+                    setattr(record, field_name, value)
+        else:
+            installs = {hash_key: rec}
+            spec = self._read_spec_from_dict(spec_reader, hash_key, installs)
+            record = InstallRecord.from_dict(spec, rec)
+            self._data[hash_key] = record
+            self._assign_dependencies(spec_reader, hash_key, installs, self._data)
+            spec._mark_root_concrete()
+
+        if record.installed and not record.external:
+            self._installed_prefixes.add(record.path)
+
     def _write_to_file(self, stream):
         """Write out the database in JSON format to the stream passed
         as argument.
@@ -734,14 +1310,35 @@ def _read_spec_from_dict(self, spec_reader, hash_key, installs, hash=ht.dag_hash
         # Build spec from dict first.
         return spec_reader.from_node_dict(spec_dict)
 
+    def _upstream_record(
+        self, hash_key: str
+    ) -> Tuple[Optional["Database"], Optional[InstallRecord]]:
+        """Return the first upstream database with a record for a hash, and the record.
+
+        Looks up a merged view of the upstream databases, computed again when one of
+        them is read again. Does no locking.
+        """
+        state = [(db._data, db._journal_offset, len(db._data)) for db in self.upstream_dbs]
+        view = self._upstream_view
+        if (
+            view is None
+            or len(view[0]) != len(state)
+            or not all(old[0] is new[0] and old[1:] == new[1:] for old, new in zip(view[0], state))
+        ):
+            merged: Dict[str, Tuple[Database, InstallRecord]] = {}
+            # Earlier upstreams take precedence
+            for db in reversed(self.upstream_dbs):
+                merged.update((key, (db, record)) for key, record in db._data.items())
+            self._upstream_view = (state, merged)
+
+        return self._upstream_view[1].get(hash_key, (None, None))
+
     def db_for_spec_hash(self, hash_key):
         with self.read_transaction():
             if hash_key in self._data:
                 return self
 
-        for db in self.upstream_dbs:
-            if hash_key in db._data:
-                return db
+        return self._upstream_record(hash_key)[0]
 
     def query_by_spec_hash(
         self, hash_key: str, data: Optional[Dict[str, InstallRecord]] = None
@@ -759,10 +1356,8 @@ def query_by_spec_hash(
             with self.read_transaction():
                 if hash_key in self._data:
                     return False, self._data[hash_key]
-        for db in self.upstream_dbs:
-            if hash_key in db._data:
-                return True, db._data[hash_key]
-        return False, None
+        db, record = self._upstream_record(hash_key)
+        return db is not None, record
 
     def query_local_by_spec_hash(self, hash_key):
         """Get a spec by hash in the local database
@@ -798,30 +1393,161 @@ def _assign_dependencies(self, spec_reader, hash_key, installs, data):
                 child = record.spec if record else None
 
                 if not child:
-                    msg = "Missing dependency not in database: " "%s needs %s-%s" % (
-                        spec.cformat("{name}{/hash:7}"),
-                        dname,
-                        dhash[:7],
-                    )
-                    if self._fail_when_missing_deps:
-                        raise MissingDependenciesError(msg)
-                    tty.warn(msg)
+                    self._missing_dependency(spec.cformat("{name}{/hash:7}"), dname, dhash)
                     continue
 
                 spec._add_dependency(child, depflag=dt.canonicalize(dtypes), virtuals=virtuals)
 
-    def _read_from_file(self, filename):
-        """Fill database from file, do not maintain old data.
-        Translate the spec portions from node-dict form to spec form.
+    def _missing_dependency(self, dependent: str, dname: str, dhash: str) -> None:
+        """Report that a dependency of a record is not in the database."""
+        msg = f"Missing dependency not in database: {dependent} needs {dname}-{dhash[:7]}"
+        if self._fail_when_missing_deps:
+            raise MissingDependenciesError(msg)
+        tty.warn(msg)
+
+    def _invalid_record(self, hash_key: str, error: Exception) -> "CorruptDatabaseError":
+        return CorruptDatabaseError(
+            f"Invalid record in Spack database: hash: {hash_key}, cause: "
+            f"{type(error).__name__}: {error}",
+            self._index_path,
+        )
+
+    def _read_records(self, spec_reader, installs):
+        """Read install records from an index of the current version, without
+        building their specs, which ``_LazySpecLoader`` does when needed.
 
         Does not do any locking.
         """
+        data: Dict[str, InstallRecord] = {}
+        installed_prefixes = set()
+        loader = _LazySpecLoader(self, spec_reader, data)
+        for hash_key, rec in installs.items():
+            try:
+                node_dict = rec["spec"]
+                node_dict[ht.dag_hash.name] = hash_key
+                record = InstallRecord.from_dict(None, rec)
+                record._node_dict, record._spec_loader = node_dict, loader
+                data[hash_key] = record
+
+                if record.installed and not record.external:
+                    installed_prefixes.add(record.path)
+            except Exception as e:
+                raise self._invalid_record(hash_key, e) from e
+
+        self._check_dependencies(spec_reader, data)
+        return data, installed_prefixes
+
+    def _check_dependencies(self, spec_reader, data: Dict[str, InstallRecord]) -> None:
+        """Report the dependencies of records whose specs are not built that are not in
+        the database or its upstreams. Does not do any locking."""
+        for hash_key, record in data.items():
+            try:
+                dependencies = spec_reader.dependencies_from_node_dict(record._node_dict)
+                for dname, dhash, _, _, _ in dependencies:
+                    _, dep_record = self.query_by_spec_hash(dhash, data=data)
+                    if dep_record is None:
+                        self._missing_dependency(f"{record.name}/{hash_key[:7]}", dname, dhash)
+            except MissingDependenciesError:
+                raise
+            except Exception as e:
+                raise self._invalid_record(hash_key, e) from e
+
+    def _read_from_records(
+        self,
+        data: Dict[str, InstallRecord],
+        installed_prefixes: Set[str],
+        check_dependencies: bool = True,
+    ) -> None:
+        """Fill the database with install records read from an index of the current
+        version, whose specs are not built, e.g. records unpickled from a cache.
+
+        Does not do any locking.
+        """
+        spec_reader = reader(_DB_VERSION)
+        loader = _LazySpecLoader(self, spec_reader, data)
+        for record in data.values():
+            record._spec_loader = loader
+        if check_dependencies:
+            self._check_dependencies(spec_reader, data)
+        self._data, self._installed_prefixes = data, installed_prefixes
+
+    def _build_dependents(self, hash_key: str) -> None:
+        """Build the specs of the records depending directly on a hash, in this database
+        and in its upstreams, which connects them to the spec of the hash. Called the
+        first time the dependents of the spec are read.
+
+        Does not do any locking, since the spec was built from the records in memory, and
+        upstream databases cannot be locked.
+        """
+        keys = self._relatives_hashes([hash_key], "parents", False, dt.ALL)
+        with lang.disable_gc():
+            for key in keys:
+                if key in self._data:
+                    self._data[key].spec
+                    continue
+                record = self._upstream_record(key)[1]
+                if record is not None:
+                    # Their own dependents may be in this database too
+                    self._connect_dependents([record.spec])
+
+    def _connect_dependents(self, specs: Iterable["spack.spec.Spec"]) -> None:
+        """Build the dependents of specs of the upstream databases from this database,
+        whose records may depend on them, the first time they are read."""
+        for spec in specs:
+            spec._complete_dependents = functools.partial(self._build_dependents, spec.dag_hash())
+
+    def load_all_specs(self) -> None:
+        """Build the specs of all the install records not built yet, in this database
+        and its upstreams.
+
+        Specs are otherwise built lazily when first needed after the index is read.
+        """
+        with self.read_transaction():
+            records = list(self._data.values())
+        for db in self.upstream_dbs:
+            records.extend(db._data.values())
+        with lang.disable_gc():
+            for record in records:
+                record.spec
+
+    def _load_index(self, filename: str) -> Any:
+        """Return the decoded JSON data of an index file. Does not do any locking."""
         try:
             with open(filename, "r") as f:
-                fdata = sjson.load(f)
+                return sjson.load(f)
         except Exception as e:
             raise CorruptDatabaseError("error parsing database:", str(e)) from e
 
+    def _index_stamp(self) -> Optional[List[Any]]:
+        """Return the verifier, modification time and size of the index file, which
+        change whenever it is written, or None if there is no index file."""
+        try:
+            stat = os.stat(self._index_path)
+        except OSError:
+            return None
+        verifier = ""
+        if _use_uuid:
+            try:
+                with open(self._verifier_path, "r") as f:
+                    verifier = f.read()
+            except OSError:
+                pass
+        return [verifier, stat.st_mtime_ns, stat.st_size]
+
+    def _read_from_file(self, filename):
+        """Fill database from file, do not maintain old data.
+        Translate the spec portions from node-dict form to spec form.
+
+        Does not do any locking.
+        """
+        # The records of an index stay alive, so collections while reading it are wasted
+        with lang.disable_gc():
+            self._read_from_data(self._load_index(filename))
+
+    def _read_from_data(self, fdata: Any) -> None:
+        """Fill database from the decoded JSON data of an index file, like
+        ``_read_from_file``. Does not do any locking.
+        """
         if fdata is None:
             return
 
@@ -857,13 +1583,13 @@ def check(cond, msg):
 
         spec_reader = reader(version)
 
-        def invalid_record(hash_key, error):
-            return CorruptDatabaseError(
-                f"Invalid record in Spack database: hash: {hash_key}, cause: "
-                f"{type(error).__name__}: {error}",
-                self._index_path,
-            )
+        if version == _DB_VERSION:
+            self._data, self._installed_prefixes = self._read_records(spec_reader, installs)
+            return
 
+        # Older indexes are read eagerly, and are rewritten in the current format
+        # by the next write.
+        #
         # Build up the database in three passes:
         #
         #   1. Read in all specs without dependencies.
@@ -890,7 +1616,7 @@ def invalid_record(hash_key, error):
                 if not spec.external and "installed" in rec and rec["installed"]:
                     installed_prefixes.add(rec["path"])
             except Exception as e:
-                raise invalid_record(hash_key, e) from e
+                raise self._invalid_record(hash_key, e) from e
 
         # Pass 2: Assign dependencies once all specs are created.
         for hash_key in data:
@@ -899,7 +1625,7 @@ def invalid_record(hash_key, error):
             except MissingDependenciesError:
                 raise
             except Exception as e:
-                raise invalid_record(hash_key, e) from e
+                raise self._invalid_record(hash_key, e) from e
 
         # Pass 3: Mark all specs concrete.  Specs representing real
         # installations must be explicitly marked.
@@ -912,10 +1638,24 @@ def invalid_record(hash_key, error):
         self._data = data
         self._installed_prefixes = installed_prefixes
 
-    def reindex(self, directory_layout):
+    def reindex(
+        self,
+        directory_layout,
+        jobs: Optional[int] = None,
+        incremental: bool = False,
+        progress: Optional[ReindexProgress] = None,
+    ) -> ReindexStats:
         """Build database index from scratch based on a directory layout.
 
         Locks the DB if it isn't locked already.
+
+        Args:
+            directory_layout: layout of the install prefixes
+            jobs: maximum number of threads looking for and reading spec files, by
+                default that of ``concurrent.futures.ThreadPoolExecutor``
+            incremental: reuse the specs of the current index whose spec file was not
+                modified since the index was last written, instead of reading them
+            progress: function called as spec files are processed
         """
         if self.is_upstream:
             raise UpstreamDatabaseLockingError("Cannot reindex an upstream database")
@@ -926,6 +1666,8 @@ def _read_suppress_error():
             try:
                 if os.path.isfile(self._index_path):
                     self._read_from_file(self._index_path)
+                    self._journal_offset = 0
+                    self._read_journal()
             except CorruptDatabaseError as e:
                 self._error = e
                 self._data = {}
@@ -940,10 +1682,19 @@ def _read_suppress_error():
                 tty.warn("Spack database was corrupt. Will rebuild. Error was:", str(self._error))
                 self._error = None
 
+            # Spec files modified after the index was last written are read again
+            since = None
+            if incremental and self._data:
+                paths = [p for p in (self._index_path, self._journal_path) if os.path.isfile(p)]
+                since = max((os.stat(p).st_mtime for p in paths), default=None)
+
             old_data = self._data
             old_installed_prefixes = self._installed_prefixes
+            self._changed_keys = None
             try:
-                self._construct_from_directory_layout(directory_layout, old_data)
+                return self._construct_from_directory_layout(
+                    directory_layout, old_data, jobs=jobs, since=since, progress=progress
+                )
             except BaseException:
                 # If anything explodes, restore old data, skip write.
                 self._data = old_data
@@ -971,13 +1722,38 @@ def _construct_entry_from_directory_layout(
         if deprecator:
             self._deprecate(spec, deprecator)
 
-    def _construct_from_directory_layout(self, directory_layout, old_data):
+    def _construct_from_directory_layout(
+        self,
+        directory_layout,
+        old_data,
+        jobs: Optional[int] = None,
+        since: Optional[float] = None,
+        progress: Optional[ReindexProgress] = None,
+    ) -> ReindexStats:
         # Read first the `spec.yaml` files in the prefixes. They should be
         # considered authoritative with respect to DB reindexing, as
         # entries in the DB may be corrupted in a way that still makes
         # them readable. If we considered DB entries authoritative
         # instead, we would perpetuate errors over a reindex.
-        with directory_layout.disable_upstream_check():
+        start = time.perf_counter()
+        stats = {"read": 0, "reused": 0}
+        old_by_prefix = {rec.path: rec for rec in old_data.values() if rec.path}
+
+        def read_spec(path):
+            # Runs in a worker thread: looking up and reading spec files is mostly
+            # waiting for the file system
+            if since is not None:
+                rec = old_by_prefix.get(os.path.dirname(os.path.dirname(path)))
+                if rec is not None and os.stat(path).st_mtime < since:
+                    return rec.spec, False
+            return directory_layout.read_spec(path), True
+
+        def read_deprecated_specs(paths):
+            return directory_layout.read_spec(paths[0]), directory_layout.read_spec(paths[1])
+
+        with directory_layout.disable_upstream_check(), concurrent.futures.ThreadPoolExecutor(
+            max_workers=jobs
+        ) as executor:
             # Initialize data in the reconstructed DB
             self._data = {}
             self._installed_prefixes = set()
@@ -985,15 +1761,28 @@ def _construct_from_directory_layout(self, directory_layout, old_data):
             # Start inspecting the installed prefixes
             processed_specs = set()
 
-            for spec in directory_layout.all_specs():
+            spec_files = directory_layout.all_spec_files(map_fn=executor.map)
+            deprecated_spec_files = directory_layout.all_deprecated_spec_files(map_fn=executor.map)
+            total = len(spec_files) + len(deprecated_spec_files)
+
+            # Results are merged serially, in the sorted order of the spec files, so
+            # that the database does not depend on the order reads complete in
+            for i, (spec, read) in enumerate(executor.map(read_spec, spec_files), 1):
+                stats["read" if read else "reused"] += 1
                 self._construct_entry_from_directory_layout(directory_layout, old_data, spec)
                 processed_specs.add(spec)
+                if progress:
+                    progress(i, total)
 
-            for spec, deprecator in directory_layout.all_deprecated_specs():
+            deprecated_specs = executor.map(read_deprecated_specs, deprecated_spec_files)
+            for i, (spec, deprecator) in enumerate(deprecated_specs, len(spec_files) + 1):
+                stats["read"] += 2
                 self._construct_entry_from_directory_layout(
                     directory_layout, old_data, spec, deprecator
                 )
                 processed_specs.add(spec)
+                if progress:
+                    progress(i, total)
 
             for key, entry in old_data.items():
                 # We already took care of this spec using
@@ -1027,6 +1816,13 @@ def _construct_from_directory_layout(self, directory_layout, old_data):
 
             self._check_ref_counts()
 
+        return ReindexStats(
+            prefixes=len(spec_files),
+            read=stats["read"],
+            reused=stats["reused"],
+            seconds=time.perf_counter() - start,
+        )
+
     def _check_ref_counts(self):
         """Ensure consistency of reference counts in the DB.
 
@@ -1065,8 +1861,13 @@ def _write(self, type, value, traceback):
         database *may* be left in an inconsistent state.  It will be consistent
         after the start of the next transaction, when it read from disk again.
 
+        If the database is journaled, or writes are batched, only the records changed
+        are appended to the journal, until the journal is compacted into the index.
+
         This routine does no locking.
         """
+        changed_keys, self._changed_keys = self._changed_keys, {}
+
         # Do not write if exceptions were raised
         if type is not None:
             # A failure interrupted a transaction, so we should record that
@@ -1075,6 +1876,14 @@ def _write(self, type, value, traceback):
             self._state_is_inconsistent = True
             return
 
+        if changed_keys is not None and (self.journal or self._flush_interval is not None):
+            # Without an index, other processes and upstream users can't find the
+            # database, so it is written even if nothing changed
+            if os.path.isfile(self._index_path) and (
+                not changed_keys or self._write_journal(changed_keys)
+            ):
+                return
+
         temp_file = self._index_path + (".%s.%s.temp" % (socket.getfqdn(), os.getpid()))
 
         # Write a temporary database file them move it into place
@@ -1088,6 +1897,12 @@ def _write(self, type, value, traceback):
                     new_verifier = str(uuid.uuid4())
                     f.write(new_verifier)
                     self.last_seen_verifier = new_verifier
+
+            # The journal was read in the transaction, and is now in the index
+            if os.path.exists(self._journal_path):
+                os.remove(self._journal_path)
+            self._journal_offset = 0
+            self._last_flush = time.time()
         except BaseException as e:
             tty.debug(e)
             # Clean up temp file if something goes wrong.
@@ -1109,12 +1924,16 @@ def _read(self):
                 self.last_seen_verifier = current_verifier
                 # Read from file if a database exists
                 self._read_from_file(self._index_path)
+                self._journal_offset = 0
             elif self._state_is_inconsistent:
                 self._read_from_file(self._index_path)
+                self._journal_offset = 0
                 self._state_is_inconsistent = False
-            return
         elif self.is_upstream:
             tty.warn("upstream not found: {0}".format(self._index_path))
+            return
+
+        self._read_journal()
 
     def _add(
         self,
@@ -1217,6 +2036,7 @@ def _add(
                 new_spec._add_dependency(record.spec, depflag=dep.depflag, virtuals=dep.virtuals)
                 if not upstream:
                     record.ref_count += 1
+                    self._changed(dkey)
 
             # Mark concrete once everything is built, and preserve
             # the original hashes of concrete specs.
@@ -1230,6 +2050,7 @@ def _add(
             self._data[key].installation_time = _now()
 
         self._data[key].explicit = explicit
+        self._changed(key)
 
     @_autospec
     def add(self, spec, directory_layout, explicit=False):
@@ -1258,6 +2079,8 @@ def _get_matching_spec_key(self, spec, **kwargs):
     def get_record(self, spec, **kwargs):
         key = self._get_matching_spec_key(spec, **kwargs)
         upstream, record = self.query_by_spec_hash(key)
+        if upstream and record is not None:
+            self._connect_dependents([record.spec])
         return record
 
     def _decrement_ref_count(self, spec):
@@ -1270,6 +2093,7 @@ def _decrement_ref_count(self, spec):
 
         rec = self._data[key]
         rec.ref_count -= 1
+        self._changed(key)
 
         if rec.ref_count == 0 and not rec.installed:
             del self._data[key]
@@ -1285,11 +2109,13 @@ def _increment_ref_count(self, spec):
 
         rec = self._data[key]
         rec.ref_count += 1
+        self._changed(key)
 
     def _remove(self, spec):
         """Non-locking version of remove(); does real work."""
         key = self._get_matching_spec_key(spec)
         rec = self._data[key]
+        self._changed(key)
 
         # This install prefix is now free for other specs to use, even if the
         # spec is only marked uninstalled.
@@ -1366,6 +2192,7 @@ def _deprecate(self, spec, deprecator):
         spec_rec.deprecated_for = deprecator_key
         spec_rec.installed = False
         self._data[spec_key] = spec_rec
+        self._changed(spec_key)
 
     @_autospec
     def mark(self, spec, key, value):
@@ -1374,8 +2201,9 @@ def mark(self, spec, key, value):
             return self._mark(spec, key, value)
 
     def _mark(self, spec, key, value):
-        record = self._data[self._get_matching_spec_key(spec)]
-        setattr(record, key, value)
+        spec_key = self._get_matching_spec_key(spec)
+        setattr(self._data[spec_key], key, value)
+        self._changed(spec_key)
 
     @_autospec
     def deprecate(self, spec, deprecator):
@@ -1397,15 +2225,9 @@ def installed_relatives(
 
         relatives = set()
         for spec in self.query(spec):
-            if transitive:
-                to_add = spec.traverse(direction=direction, root=False, deptype=deptype)
-            elif direction == "parents":
-                to_add = spec.dependents(deptype=deptype)
-            else:  # direction == 'children'
-                to_add = spec.dependencies(deptype=deptype)
-
-            for relative in to_add:
-                hash_key = relative.dag_hash()
+            for hash_key in self.relatives_hashes(
+                [spec.dag_hash()], direction=direction, transitive=transitive, deptype=deptype
+            ):
                 upstream, record = self.query_by_spec_hash(hash_key)
                 if not record:
                     reltype = "Dependent" if direction == "parents" else "Dependency"
@@ -1422,9 +2244,62 @@ def installed_relatives(
                 if not record.installed:
                     continue
 
-                relatives.add(relative)
+                relatives.add(record.spec)
         return relatives
 
+    def relatives_hashes(
+        self,
+        hashes: Iterable[str],
+        direction: str = "parents",
+        transitive: bool = True,
+        deptype: Union[dt.DepFlag, dt.DepTypes] = dt.ALL,
+    ) -> List[str]:
+        """Return the DAG hashes of the specs related to some specs, in breadth-first
+        order, without building any spec.
+
+        Edges are looked up in the reverse-dependency index of this database and of
+        its upstreams, so the related specs may not be installed, or not be in any
+        database if it is inconsistent.
+
+        Args:
+            hashes: DAG hashes of the specs to start from, which are never returned
+            direction: either "parents" for dependents or "children" for dependencies
+            transitive: whether to return indirect relatives too
+            deptype: follow only the edges with these dependency types
+        """
+        if direction not in ("parents", "children"):
+            raise ValueError("Invalid direction: %s" % direction)
+
+        if not isinstance(deptype, dt.DepFlag):
+            deptype = dt.canonicalize(deptype)
+        with self.read_transaction():
+            return self._relatives_hashes(hashes, direction, transitive, deptype)
+
+    def _relatives_hashes(
+        self, hashes: Iterable[str], direction: str, transitive: bool, deptype: dt.DepFlag
+    ) -> List[str]:
+        """Implementation of relatives_hashes(). Does not do any locking."""
+        indexes = []
+        for db in [self, *self.upstream_dbs]:
+            db._index.update(db._data)
+            indexes.append(db._index)
+
+        # Local dependents may depend on upstream specs, and the dependencies of
+        # upstream specs are in the upstream databases
+        visited = dict.fromkeys(hashes)
+        result: List[str] = []
+        queue = list(visited)
+        while queue:
+            new_keys: Dict[str, None] = {}
+            for index in indexes:
+                new_keys.update(dict.fromkeys(index.relatives(queue, direction, deptype)))
+            queue = [key for key in new_keys if key not in visited]
+            visited.update(dict.fromkeys(queue))
+            result.extend(queue)
+            if not transitive:
+                break
+        return result
+
     @_autospec
     def installed_extensions_for(self, extendee_spec):
         """Returns the specs of all packages that extend the given spec"""
@@ -1443,10 +2318,11 @@ def _get_by_hash_local(self, dag_hash, default=None, installed=any):
 
         # check if hash is a prefix of some installed (or previously
         # installed) spec.
+        self._index.update(self._data)
         matches = [
-            record.spec
-            for h, record in self._data.items()
-            if h.startswith(dag_hash) and record.install_type_matches(installed)
+            self._data[h].spec
+            for h in self._index.hashes_with_prefix(dag_hash)
+            if self._data[h].install_type_matches(installed)
         ]
         if matches:
             return matches
@@ -1510,6 +2386,8 @@ def get_by_hash(self, dag_hash, default=None, installed=any):
         for upstream_db in self.upstream_dbs:
             spec = upstream_db._get_by_hash_local(dag_hash, default=default, installed=installed)
             if spec is not None:
+                if spec is not default:
+                    self._connect_dependents(spec)
                 return spec
 
         return default
@@ -1546,59 +2424,81 @@ def _query(
                 else:
                     return []
 
-        # Abstract specs require more work -- currently we test
-        # against everything.
+        # Abstract specs require more work -- we test the records that the
+        # indexes could not rule out.
         results = []
         start_date = start_date or datetime.datetime.min
         end_date = end_date or datetime.datetime.max
 
-        # save specs whose name doesn't match for last, to avoid a virtual check
-        deferred = []
-
-        for key, rec in self._data.items():
-            if hashes is not None and rec.spec.dag_hash() not in hashes:
-                continue
+        def selected(key, rec):
+            if hashes is not None and key not in hashes:
+                return False
 
             if origin and not (origin == rec.origin):
-                continue
+                return False
 
             if not rec.install_type_matches(installed):
-                continue
+                return False
 
             if in_buildcache is not any and rec.in_buildcache != in_buildcache:
-                continue
+                return False
 
             if explicit is not any and rec.explicit != explicit:
-                continue
+                return False
 
-            if known is not any and known(rec.spec.name):
-                continue
+            if known is not any and known(rec.name):
+                return False
 
             if start_date or end_date:
                 inst_date = datetime.datetime.fromtimestamp(rec.installation_time)
                 if not (start_date < inst_date < end_date):
-                    continue
+                    return False
 
-            if query_spec is any:
-                results.append(rec.spec)
-                continue
+            return True
 
-            # check anon specs and exact name matches first
-            if not query_spec.name or rec.spec.name == query_spec.name:
-                if rec.spec.satisfies(query_spec):
-                    results.append(rec.spec)
+        self._index.update(self._data)
+        if query_spec is any:
+            keys = self._index.select(explicit=explicit, installed=installed, hashes=hashes)
+            return [
+                self._data[key].spec
+                for key in (self._data if keys is None else keys)
+                if selected(key, self._data[key])
+            ]
 
-            # save potential virtual matches for later, but not if we already found a match
-            elif not results:
-                deferred.append(rec.spec)
+        # check anon specs and exact name matches first
+        matcher = spack.spec.SpecMatcher(query_spec)
+        keys = self._index.select(
+            name=query_spec.name or None,
+            namespace=query_spec.namespace,
+            hash_prefix=query_spec.abstract_hash,
+            explicit=explicit,
+            installed=installed,
+            hashes=hashes,
+        )
+        for key in self._data if keys is None else keys:
+            rec = self._data[key]
+            if (not query_spec.name or rec.name == query_spec.name) and selected(key, rec):
+                if matcher(rec.spec):
+                    results.append(rec.spec)
 
         # Checking for virtuals is expensive, so we save it for last and only if needed.
-        # If we get here, we didn't find anything in the DB that matched by name.
-        # If we did fine something, the query spec can't be virtual b/c we matched an actual
+        # If we did find something, the query spec can't be virtual b/c we matched an actual
         # package installation, so skip the virtual check entirely. If we *didn't* find anything,
-        # check all the deferred specs *if* the query is virtual.
-        if not results and query_spec is not any and deferred and query_spec.virtual:
-            results = [spec for spec in deferred if spec.satisfies(query_spec)]
+        # check the specs with other names *if* the query is virtual. Their specs are only built
+        # if the query is virtual.
+        if not results and query_spec.name and query_spec.virtual:
+            keys = self._index.select(
+                namespace=query_spec.namespace,
+                hash_prefix=query_spec.abstract_hash,
+                explicit=explicit,
+                installed=installed,
+                hashes=hashes,
+            )
+            for key in self._data if keys is None else keys:
+                rec = self._data[key]
+                if rec.name != query_spec.name and selected(key, rec):
+                    if matcher(rec.spec):
+                        results.append(rec.spec)
 
         return results
 
@@ -1628,6 +2528,8 @@ def query(self, *args, **kwargs):
             # have permissions to do this and the upstream DBs won't know about
             # us anyway (so e.g. they should never uninstall specs)
             upstream_results.extend(upstream_db._query(*args, **kwargs) or [])
+        # Upstream specs may have dependents in this database
+        self._connect_dependents(upstream_results)
 
         local_results = set(self.query_local(*args, **kwargs))
 
@@ -1685,12 +2587,11 @@ def root(key, record):
             return key in root_hashes if root_hashes is not None else record.explicit
 
         with self.read_transaction():
-            roots = [rec.spec for key, rec in self._data.items() if root(key, rec)]
-            needed = set(id(spec) for spec in tr.traverse_nodes(roots, deptype=deptype))
+            roots = [key for key, rec in self._data.items() if root(key, rec)]
+            needed = set(roots)
+            needed.update(self.relatives_hashes(roots, direction="children", deptype=deptype))
             return [
-                rec.spec
-                for rec in self._data.values()
-                if id(rec.spec) not in needed and rec.installed
+                rec.spec for key, rec in self._data.items() if key not in needed and rec.installed
             ]
 
     def update_explicit(self, spec, explicit):
@@ -1710,6 +2611,98 @@ def update_explicit(self, spec, explicit):
                 status = "explicit" if explicit else "implicit"
                 tty.debug(message.format(status, s=spec))
                 rec.explicit = explicit
+                self._changed(spec.dag_hash())
+
+
+class UpstreamIndexCache:
+    """Local copy of the install records read from the indexes of upstream databases.
+
+    Upstream indexes are often on shared file systems, and decoding them is paid by
+    every command. This cache keeps, for each upstream, a pickle of the install
+    records read from its index, whose specs are not built, after the verifier,
+    modification time and size of the index. Opening an upstream whose index did not
+    change then costs a ``stat``, reading its verifier, and unpickling its records,
+    which is faster than decoding the JSON index and creating the records. Only the
+    entries of the upstreams whose index changed are written again.
+    """
+
+    def __init__(self, file_cache: spack.util.file_cache.FileCache):
+        """
+        Args:
+            file_cache: cache where the records are stored
+        """
+        self.file_cache = file_cache
+
+    @staticmethod
+    def _key(db: Database) -> str:
+        return f"upstream-indexes/{hashlib.sha256(db.root.encode()).hexdigest()[:32]}.pickle"
+
+    @staticmethod
+    def _header(stamp: List[Any]) -> Tuple[Any, ...]:
+        # Records pickled by another version of Spack may not be compatible
+        return (spack.spack_version, str(_DB_VERSION), stamp)
+
+    def _load(
+        self, key: str, stamp: List[Any]
+    ) -> Optional[Tuple[Dict[str, InstallRecord], Set[str]]]:
+        """Return the records cached for an index with this stamp, and the prefixes
+        of the installed ones, or None if there are none."""
+        try:
+            if not self.file_cache.init_entry(key):
+                return None
+            with self.file_cache.read_transaction(key, binary=True) as f:
+                # The header is checked before unpickling the records
+                if pickle.load(f) != self._header(stamp):
+                    return None
+                with lang.disable_gc():
+                    return pickle.load(f)
+        except Exception as e:
+            tty.debug(f"Ignoring the cache of an upstream index: {e}")
+            return None
+
+    def _store(self, key: str, stamp: List[Any], db: Database) -> None:
+        # Indexes of older versions are read eagerly, and are not cached
+        if any(record._spec is not None for record in db._data.values()):
+            return
+        try:
+            with self.file_cache.write_transaction(key, binary=True) as (_, f):
+                pickle.dump(self._header(stamp), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(
+                    (db._data, db._installed_prefixes), f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+        except Exception as e:
+            tty.debug(f"Cannot cache the index of an upstream: {e}")
+
+    def read(self, dbs: List[Database]) -> None:
+        """Read upstream databases, from the cache if their index did not change since
+        it was cached, and cache the records of the indexes that changed.
+
+        Args:
+            dbs: the upstream databases, which must not be locked
+        """
+        changed = False
+        # Deeper upstreams come first, since records may depend on them
+        for db in reversed(dbs):
+            stamp = db._index_stamp()
+            if stamp is None:
+                # Warns that the upstream was not found
+                db._read()
+                changed = True
+                continue
+
+            key = self._key(db)
+            cached = self._load(key, stamp)
+            db.last_seen_verifier = stamp[0]
+            if cached is None:
+                db._read_from_file(db._index_path)
+                self._store(key, stamp, db)
+                changed = True
+            else:
+                # Dependencies were checked when the records were cached, unless a
+                # deeper upstream changed since
+                db._read_from_records(*cached, check_dependencies=changed)
+            db._journal_offset = 0
+            db._read_journal()
 
 
 class UpstreamDatabaseLockingError(SpackError):
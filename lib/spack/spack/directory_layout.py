@@ -270,29 +270,49 @@ def ensure_installed(self, spec):
                 "Spec file in %s does not match hash!" % spec_file_path
             )
 
-    def all_specs(self):
+    def _glob(self, path_elems, map_fn):
+        # Look for matches under the entries at the top of the layout separately, so
+        # that map_fn can do it concurrently on slow file systems
+        entries = [e for e in sorted(os.listdir(self.root)) if not e.startswith(".")]
+        patterns = [
+            os.path.join(self.root, glob.escape(entry), *path_elems[1:]) for entry in entries
+        ]
+        return sorted(path for paths in map_fn(glob.glob, patterns) for path in paths)
+
+    def all_spec_files(self, map_fn=map):
+        """Paths of the spec files of all the install prefixes, sorted.
+
+        Args:
+            map_fn: function like ``map`` used to look for spec files under the entries at
+                the top of the layout, e.g. ``Executor.map`` to look concurrently
+        """
         if not os.path.isdir(self.root):
             return []
 
-        specs = []
+        spec_files = []
         for _, path_scheme in self.projections.items():
             path_elems = ["*"] * len(path_scheme.split(posixpath.sep))
             # NOTE: Does not validate filename extension; should happen later
             path_elems += [self.metadata_dir, "spec.json"]
-            pattern = os.path.join(self.root, *path_elems)
-            spec_files = glob.glob(pattern)
-            if not spec_files:  # we're probably looking at legacy yaml...
+            projection_files = self._glob(path_elems, map_fn)
+            if not projection_files:  # we're probably looking at legacy yaml...
                 path_elems += [self.metadata_dir, "spec.yaml"]
-                pattern = os.path.join(self.root, *path_elems)
-                spec_files = glob.glob(pattern)
-            specs.extend([self.read_spec(s) for s in spec_files])
-        return specs
+                projection_files = self._glob(path_elems, map_fn)
+            spec_files.extend(projection_files)
+        return spec_files
 
-    def all_deprecated_specs(self):
+    def all_deprecated_spec_files(self, map_fn=map):
+        """Paths of the spec files of all the deprecated specs, sorted, each paired with
+        the path of the spec file of its deprecator.
+
+        Args:
+            map_fn: function like ``map`` used to look for spec files under the entries at
+                the top of the layout, e.g. ``Executor.map`` to look concurrently
+        """
         if not os.path.isdir(self.root):
             return []
 
-        deprecated_specs = set()
+        spec_files = []
         for _, path_scheme in self.projections.items():
             path_elems = ["*"] * len(path_scheme.split(posixpath.sep))
             # NOTE: Does not validate filename extension; should happen later
@@ -301,15 +321,20 @@ def all_deprecated_specs(self):
                 self.deprecated_dir,
                 "*_spec.*",
             ]  # + self.spec_file_name]
-            pattern = os.path.join(self.root, *path_elems)
-            spec_files = glob.glob(pattern)
             get_depr_spec_file = lambda x: os.path.join(
                 os.path.dirname(os.path.dirname(x)), self.spec_file_name
             )
-            deprecated_specs |= set(
-                (self.read_spec(s), self.read_spec(get_depr_spec_file(s))) for s in spec_files
-            )
-        return deprecated_specs
+            spec_files.extend((s, get_depr_spec_file(s)) for s in self._glob(path_elems, map_fn))
+        return spec_files
+
+    def all_specs(self):
+        return [self.read_spec(s) for s in self.all_spec_files()]
+
+    def all_deprecated_specs(self):
+        return set(
+            (self.read_spec(s), self.read_spec(depr_s))
+            for s, depr_s in self.all_deprecated_spec_files()
+        )
 
     def specs_by_hash(self):
         by_hash = {}
@@ -19,6 +19,7 @@
 from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import llnl.util.filesystem as fs
+import llnl.util.lang as lang
 import llnl.util.tty as tty
 import llnl.util.tty.color as clr
 from llnl.util.link_tree import ConflictingSpecsError
@@ -530,14 +531,21 @@ def __init__(
         self.projections = projections
         self.select = select
         self.exclude = exclude
+        # Compiled on first use, since they are checked against every spec in the view
+        self._select_matchers: Optional[List[spack.spec.SpecMatcher]] = None
+        self._exclude_matchers: Optional[List[spack.spec.SpecMatcher]] = None
         self.link_type = view_func_parser(link_type)
         self.link = link
 
     def select_fn(self, spec):
-        return any(spec.satisfies(s) for s in self.select)
+        if self._select_matchers is None:
+            self._select_matchers = [spack.spec.SpecMatcher(s) for s in self.select]
+        return any(matcher(spec) for matcher in self._select_matchers)
 
     def exclude_fn(self, spec):
-        return not any(spec.satisfies(e) for e in self.exclude)
+        if self._exclude_matchers is None:
+            self._exclude_matchers = [spack.spec.SpecMatcher(e) for e in self.exclude]
+        return not any(matcher(spec) for matcher in self._exclude_matchers)
 
     def update_root(self, new_path):
         self.raw_root = new_path
@@ -1806,10 +1814,11 @@ def get_one_by_hash(self, dag_hash):
 
     def all_matching_specs(self, *specs: spack.spec.Spec) -> List[Spec]:
         """Returns all concretized specs in the environment satisfying any of the input specs"""
+        matchers = [spack.spec.SpecMatcher(t) for t in specs]
         return [
             s
             for s in traverse.traverse_nodes(self.concrete_roots(), key=traverse.by_dag_hash)
-            if any(s.satisfies(t) for t in specs)
+            if any(matcher(s) for matcher in matchers)
         ]
 
     @spack.repo.autospec
@@ -1955,8 +1964,9 @@ def _to_lockfile_dict(self):
 
     def _read_lockfile(self, file_or_json):
         """Read a lockfile from a file or from a raw string."""
-        lockfile_dict = sjson.load(file_or_json)
-        self._read_lockfile_dict(lockfile_dict)
+        with lang.disable_gc():
+            lockfile_dict = sjson.load(file_or_json)
+            self._read_lockfile_dict(lockfile_dict)
         return lockfile_dict["_meta"]["lockfile-version"]
 
     def _read_lockfile_dict(self, d):
@@ -0,0 +1,113 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Store-wide history of the time taken to install packages.
+
+Every install, from sources or from a binary cache, appends a record with the
+phases measured by its ``spack.util.timer.Timer`` to a JSON lines file next
+to the install database. Unlike the ``install_times.json`` file in each
+prefix, the history survives uninstalls, and can be queried to find slow
+packages or build time regressions, e.g. with ``spack stats``.
+"""
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import llnl.util.filesystem as fs
+import llnl.util.tty as tty
+
+import spack.spec
+import spack.util.spack_json as sjson
+import spack.util.timer
+
+#: Name of the install history file, in the directory of the install database
+HISTORY_FILENAME = "install_history.jsonl"
+
+
+class InstallHistory:
+    """Append-only record of the install times of the packages in a store.
+
+    Each record is a single line of JSON, written with a single ``write`` to a
+    file opened in append mode, so that concurrent installs do not need to
+    take a lock to add records. Readers skip lines that cannot be parsed, e.g.
+    the last one while it is being written.
+    """
+
+    def __init__(self, root_dir: str):
+        """
+        Args:
+            root_dir: directory of the history file, usually the database directory
+        """
+        self.path = os.path.join(root_dir, HISTORY_FILENAME)
+
+    def add(self, spec: "spack.spec.Spec", timer: spack.util.timer.BaseTimer, cache: bool) -> None:
+        """Append the install times of a spec to the history.
+
+        Args:
+            spec: the concrete spec that was installed
+            timer: the timer that measured the phases of the install
+            cache: ``True`` if the spec was installed from a binary cache
+        """
+        data = timer.write_json(out=None)
+        if data is None:
+            return
+
+        record = {
+            "name": spec.name,
+            "version": str(spec.version),
+            "hash": spec.dag_hash(),
+            "cache": cache,
+            "time": time.time(),
+            "total": data["total"],
+            "phases": data["phases"],
+        }
+        fs.mkdirp(os.path.dirname(self.path))
+        line = sjson.dump(record) + "\n"  # type: ignore[operator]
+        with open(self.path, "a") as f:
+            f.write(line)
+
+    def records(self, name: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate over the records in the history, oldest first.
+
+        Args:
+            name: only return the records of the package with this name
+        """
+        try:
+            f = open(self.path)
+        except FileNotFoundError:
+            return
+
+        with f:
+            for lineno, line in enumerate(f, 1):
+                try:
+                    record = sjson.load(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict) or "name" not in record or "total" not in record:
+                    tty.debug(f"{self.path}:{lineno}: skipping malformed install record")
+                    continue
+                if name is None or record["name"] == name:
+                    yield record
+
+    def clear(self) -> None:
+        """Remove all the records from the history."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def phase_seconds(records: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Average time spent in each phase over some install records.
+
+    Args:
+        records: records of installs of the same package
+
+    Return:
+        The mean number of seconds spent in each phase, keyed by phase path
+    """
+    totals: Dict[str, float] = {}
+    for record in records:
+        for phase in record.get("phases", []):
+            path = phase.get("path") or phase["name"]
+            totals[path] = totals.get(path, 0.0) + phase["seconds"]
+    return {path: seconds / len(records) for path, seconds in totals.items()}
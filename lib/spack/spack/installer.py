@@ -26,18 +26,22 @@
 installations of packages in a Spack instance.
 """
 
+import concurrent.futures
+import contextlib
 import copy
 import glob
 import heapq
 import io
 import itertools
+import multiprocessing.connection
 import os
 import shutil
 import sys
+import threading
 import time
 from collections import defaultdict
 from gzip import GzipFile
-from typing import Dict, Iterator, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 import llnl.util.filesystem as fs
 import llnl.util.lock as lk
@@ -57,12 +61,14 @@
 import spack.mirror
 import spack.package_base
 import spack.package_prefs as prefs
+import spack.relocate
 import spack.repo
 import spack.spec
 import spack.store
 import spack.util.executable
 import spack.util.path
 import spack.util.timer as timer
+from spack.util.cpus import determine_number_of_jobs
 from spack.util.environment import EnvironmentModifications, dump_environment
 from spack.util.executable import which
 
@@ -91,6 +97,16 @@
 #: queue invariants).
 STATUS_REMOVED = "removed"
 
+#: Maximum number of threads downloading sources and binaries ahead of the builds
+MAX_PREFETCH_THREADS = 4
+
+#: Seconds to wait for the stage of a package to prefetch, if it is in use
+PREFETCH_LOCK_TIMEOUT = 1.0
+
+#: Estimated install time, in seconds, of packages that were never installed
+#: before, when no other package in the install has a recorded install time
+DEFAULT_INSTALL_TIME = 60.0
+
 
 def _write_timer_json(pkg, timer, cache):
     extra_attributes = {"name": pkg.name, "cache": cache, "hash": pkg.spec.dag_hash()}
@@ -99,7 +115,61 @@ def _write_timer_json(pkg, timer, cache):
             timer.write_json(timelog, extra_attributes=extra_attributes)
     except Exception as e:
         tty.debug(str(e))
-        return
+
+    try:
+        spack.store.STORE.install_history.add(pkg.spec, timer, cache)
+    except Exception as e:
+        tty.debug(f"Failed to record the install times of {pkg.name}: {str(e)}")
+
+
+def estimate_install_times(specs: Iterable["spack.spec.Spec"]) -> Dict[str, float]:
+    """
+    Estimate how long installing each spec will take, from the install times
+    recorded in the install history of the store for the same package names.
+
+    Times of builds from sources are preferred to those of installs from
+    binary caches. Specs of packages never installed before are estimated
+    to take the average time of the others, or ``DEFAULT_INSTALL_TIME``,
+    while specs that are already installed take no time.
+
+    Args:
+        specs: the concrete specs to be installed
+
+    Return:
+        The estimated install time, in seconds, keyed by package id
+    """
+    specs = list(specs)
+    names = set(spec.name for spec in specs)
+
+    # Recorded times per package name, split by builds from sources and binaries
+    recorded: Dict[str, Tuple[List[float], List[float]]] = {}
+    try:
+        for record in spack.store.STORE.install_history.records():
+            if record["name"] in names:
+                total, cache = float(record["total"]), bool(record.get("cache", False))
+                recorded.setdefault(record["name"], ([], []))[int(cache)].append(total)
+    except (OSError, ValueError, TypeError) as e:
+        tty.debug(f"Failed to read the install history: {str(e)}")
+
+    by_name: Dict[str, float] = {}
+    for name, (from_source, from_cache) in recorded.items():
+        times = from_source or from_cache
+        by_name[name] = sum(times) / len(times)
+
+    fallback = sum(by_name.values()) / len(by_name) if by_name else DEFAULT_INSTALL_TIME
+
+    estimates: Dict[str, float] = {}
+    db = spack.store.STORE.db
+    with db.read_transaction():
+        for spec in specs:
+            pkg_id = package_id(spec.package)
+            # Look up records by hash, without building their specs
+            record = db.query_local_by_spec_hash(spec.dag_hash())
+            if (record and record.installed) or spec.external or spec.installed_upstream:
+                estimates[pkg_id] = 0.0
+            else:
+                estimates[pkg_id] = by_name.get(spec.name, fallback)
+    return estimates
 
 
 class InstallAction:
@@ -382,7 +452,10 @@ def _print_timer(pre: str, pkg_id: str, timer: timer.BaseTimer) -> None:
 
 
 def _install_from_cache(
-    pkg: "spack.package_base.PackageBase", explicit: bool, unsigned: Optional[bool] = False
+    pkg: "spack.package_base.PackageBase",
+    explicit: bool,
+    unsigned: Optional[bool] = False,
+    download_result: Optional[dict] = None,
 ) -> bool:
     """
     Install the package from binary cache
@@ -392,15 +465,33 @@ def _install_from_cache(
         explicit: ``True`` if installing the package was explicitly
             requested by the user, otherwise, ``False``
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
+        download_result: binary package already downloaded for the package, if any
 
     Return: ``True`` if the package was extract from binary cache, ``False`` otherwise
     """
     t = timer.Timer()
     installed_from_cache = _try_install_from_binary_cache(
-        pkg, explicit, unsigned=unsigned, timer=t
+        pkg, explicit, unsigned=unsigned, timer=t, download_result=download_result
     )
     if not installed_from_cache:
         return False
+    _complete_install_from_cache(pkg, explicit, t)
+    return True
+
+
+def _complete_install_from_cache(
+    pkg: "spack.package_base.PackageBase", explicit: bool, t: timer.Timer
+) -> None:
+    """
+    Report the installation of a package extracted from a binary cache, and
+    run its post-install hooks.
+
+    Args:
+        pkg: the package installed from the binary cache
+        explicit: ``True`` if installing the package was explicitly
+            requested by the user, otherwise, ``False``
+        t: timer tracking the binary install phases of the package
+    """
     t.stop()
 
     pkg_id = package_id(pkg)
@@ -410,7 +501,6 @@ def _install_from_cache(
     _print_timer(pre=_log_prefix(pkg.name), pkg_id=pkg_id, timer=t)
     _print_installed_pkg(pkg.spec.prefix)
     spack.hooks.post_install(pkg.spec, explicit)
-    return True
 
 
 def _process_external_package(pkg: "spack.package_base.PackageBase", explicit: bool) -> None:
@@ -460,6 +550,7 @@ def _process_binary_cache_tarball(
     unsigned: Optional[bool],
     mirrors_for_spec: Optional[list] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    download_result: Optional[dict] = None,
 ) -> bool:
     """
     Process the binary cache tarball.
@@ -471,26 +562,61 @@ def _process_binary_cache_tarball(
         mirrors_for_spec: Optional list of concrete specs and mirrors
         obtained by calling binary_distribution.get_mirrors_for_spec().
         timer: timer to keep track of binary install phases.
+        download_result: binary package already downloaded, if any
 
     Return:
         bool: ``True`` if the package was extracted from binary cache,
             else ``False``
     """
-    with timer.measure("fetch"):
-        download_result = binary_distribution.download_tarball(
-            pkg.spec, unsigned, mirrors_for_spec
-        )
-
-        if download_result is None:
+    with spack.util.path.filter_padding():
+        if not _extract_binary_cache_tarball(
+            pkg, unsigned, mirrors_for_spec, timer=timer, download_result=download_result
+        ):
             return False
 
+        with timer.measure("install"):
+            pkg.installed_from_binary_cache = True
+            spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=explicit)
+            return True
+
+
+def _extract_binary_cache_tarball(
+    pkg: "spack.package_base.PackageBase",
+    unsigned: Optional[bool],
+    mirrors_for_spec: Optional[list] = None,
+    timer: timer.BaseTimer = timer.NULL_TIMER,
+    download_result: Optional[dict] = None,
+) -> bool:
+    """
+    Download, if needed, the binary cache tarball of the package, and extract
+    and relocate it in the package prefix, without registering the package in
+    the database.
+
+    Args:
+        pkg: the package being installed
+        unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
+        mirrors_for_spec: Optional list of concrete specs and mirrors
+        obtained by calling binary_distribution.get_mirrors_for_spec().
+        timer: timer to keep track of binary install phases.
+        download_result: binary package already downloaded, if any
+
+    Return:
+        bool: ``True`` if the package was extracted from binary cache,
+            else ``False``
+    """
+    if download_result is None:
+        with timer.measure("fetch"):
+            download_result = binary_distribution.download_tarball(
+                pkg.spec, unsigned, mirrors_for_spec
+            )
+
+            if download_result is None:
+                return False
+
     tty.msg(f"Extracting {package_id(pkg)} from binary cache")
 
-    with timer.measure("install"), spack.util.path.filter_padding():
+    with timer.measure("install"):
         binary_distribution.extract_tarball(pkg.spec, download_result, force=False, timer=timer)
-
-        pkg.installed_from_binary_cache = True
-        spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=explicit)
         return True
 
 
@@ -499,6 +625,7 @@ def _try_install_from_binary_cache(
     explicit: bool,
     unsigned: Optional[bool] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    download_result: Optional[dict] = None,
 ) -> bool:
     """
     Try to extract the package from binary cache.
@@ -508,7 +635,13 @@ def _try_install_from_binary_cache(
         explicit: the package was explicitly requested by the user
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
         timer: timer to keep track of binary install phases.
+        download_result: binary package already downloaded, if any
     """
+    if download_result is not None:
+        return _process_binary_cache_tarball(
+            pkg, explicit, unsigned, timer=timer, download_result=download_result
+        )
+
     # Early exit if no binary mirrors are configured.
     if not spack.mirror.MirrorCollection(binary=True):
         return False
@@ -993,6 +1126,17 @@ def __init__(
             pkg_id for pkg_id in self.dependencies if pkg_id not in installed
         )
 
+        # Estimated time to install the package and, one after the other, the
+        # dependents on the longest path to a root. Among tasks whose
+        # dependencies are installed, those on the critical path go first.
+        self.critical_path = 0.0
+
+        # The build process of the task, or its install from a binary cache,
+        # while it is being installed concurrently with other packages.
+        self.process: Optional[Union["spack.build_environment.BuildProcess", "BinaryInstall"]] = (
+            None
+        )
+
         # Ensure key sequence-related properties are updated accordingly.
         self.attempts = 0
         self._update()
@@ -1094,9 +1238,9 @@ def cache_only(self) -> bool:
             return self.request.install_args.get("dependencies_cache_only", _cache_only)
 
     @property
-    def key(self) -> Tuple[int, int]:
-        """The key is the tuple (# uninstalled dependencies, sequence)."""
-        return (self.priority, self.sequence)
+    def key(self) -> Tuple[int, float, int]:
+        """The key is the tuple (# uninstalled dependencies, -critical path, sequence)."""
+        return (self.priority, -self.critical_path, self.sequence)
 
     def next_attempt(self, installed) -> "BuildTask":
         """Create a new, updated task for the next installation attempt."""
@@ -1112,6 +1256,246 @@ def priority(self):
         return len(self.uninstalled_deps)
 
 
+class BinaryInstall:
+    """
+    Downloads, extracts and relocates the binary package of a package in a
+    thread, so that several packages can be installed from binary caches at
+    the same time.
+
+    It has the same interface as ``spack.build_environment.BuildProcess``, so
+    that the installer can wait on binary installs and builds from sources
+    alike. Registering the package in the database is left to the caller,
+    once the binary install is complete.
+    """
+
+    def __init__(
+        self,
+        pkg: "spack.package_base.PackageBase",
+        unsigned: Optional[bool],
+        mirrors_for_spec: Optional[list] = None,
+        download_result: Optional[dict] = None,
+    ):
+        """
+        Args:
+            pkg: the package to be installed from a binary cache
+            unsigned: if ``True`` or ``False`` override the mirror signature
+                verification defaults
+            mirrors_for_spec: concrete specs and mirrors providing the package
+            download_result: binary package already downloaded, if any
+        """
+        self.pkg = pkg
+        self.unsigned = unsigned
+        self.mirrors_for_spec = mirrors_for_spec
+        self.download_result = download_result
+        self.timer = timer.Timer()
+        self.thread: Optional[threading.Thread] = None
+        self.read_pipe = None
+        self._extracted = False
+        self._error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        """Start the thread installing the package."""
+        self.read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
+        self.thread = threading.Thread(target=self._run, args=(write_pipe,), daemon=True)
+        self.thread.start()
+
+    def _run(self, write_pipe) -> None:
+        # Path padding is not filtered from the output here, since the filter
+        # is global and other threads may be installing at the same time.
+        try:
+            with spack.build_environment.busy_helper_thread():
+                self._extracted = _extract_binary_cache_tarball(
+                    self.pkg,
+                    self.unsigned,
+                    self.mirrors_for_spec,
+                    timer=self.timer,
+                    download_result=self.download_result,
+                )
+        except BaseException as e:
+            self._error = e
+        finally:
+            write_pipe.send(None)
+            write_pipe.close()
+
+    def terminate(self) -> None:
+        """
+        Wait for the thread to finish, since extraction cannot be safely
+        interrupted, and remove the prefix of the package since it will not
+        be registered in the database.
+        """
+        if self.thread is not None:
+            self.thread.join()
+            if self._extracted:
+                shutil.rmtree(self.pkg.spec.prefix, ignore_errors=True)
+
+    def complete(self) -> bool:
+        """
+        Wait for the thread to finish and report its outcome.
+
+        Return:
+            ``True`` if the package was extracted from binary cache, else ``False``
+        """
+        assert self.thread is not None, "the binary install has not been started"
+        self.thread.join()
+        self.read_pipe.close()
+        if self._error is not None:
+            raise self._error
+        return self._extracted
+
+
+def _prefetch_sources(pkg: "spack.package_base.PackageBase") -> None:
+    """Download the sources of the package to its stage, which also stores them in
+    the local source cache for the build to use.
+
+    Args:
+        pkg: the package whose sources are downloaded
+    """
+    if not pkg.has_code or pkg.manual_download:
+        return
+
+    # Leave versions requiring a confirmation from the user to the build itself
+    version_info = pkg.versions.get(pkg.version)
+    if version_info is None or version_info.get("deprecated", False):
+        return
+
+    # Hold the stage locks, so that the stage is not used by another process, or
+    # cleaned, while downloading. Leave the package to whoever is staging it already.
+    with contextlib.ExitStack() as stack:
+        try:
+            for stage in pkg.stage:
+                stack.enter_context(stage.locked(timeout=PREFETCH_LOCK_TIMEOUT))
+        except lk.LockTimeoutError:
+            tty.debug(f"Not prefetching {pkg.name}: its stage is in use")
+            return
+        pkg.do_fetch()
+
+
+def _prefetch(
+    pkg: "spack.package_base.PackageBase",
+    use_cache: bool,
+    cache_only: bool,
+    unsigned: Optional[bool],
+) -> Optional[dict]:
+    """Download the binary package for the package if it is available in a binary
+    mirror, otherwise its sources.
+
+    Args:
+        pkg: the package being prefetched
+        use_cache: whether the package may be installed from a binary cache
+        cache_only: whether the package may only be installed from a binary cache
+        unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
+
+    Return:
+        The result of ``binary_distribution.download_tarball`` if a binary was
+        downloaded, ``None`` otherwise
+    """
+    with spack.build_environment.busy_helper_thread():
+        if use_cache and spack.mirror.MirrorCollection(binary=True):
+            matches = binary_distribution.get_mirrors_for_spec(pkg.spec, index_only=True)
+            if matches:
+                download_result = binary_distribution.download_tarball(pkg.spec, unsigned, matches)
+                if download_result is not None:
+                    return download_result
+
+        if not cache_only:
+            _prefetch_sources(pkg)
+        return None
+
+
+class Prefetcher:
+    """
+    Downloads, in a bounded pool of threads, the binaries or the sources of the
+    next packages queued for installation, so that the network is used while
+    other packages are being built.
+
+    A build waits for the prefetch of its package, if any, to complete before
+    it uses the package's stage, or the binary package that was downloaded.
+    """
+
+    def __init__(self, max_packages: int):
+        """
+        Args:
+            max_packages: maximum number of packages downloaded ahead of their build
+        """
+        self.max_packages = max_packages
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_packages, MAX_PREFETCH_THREADS)
+        )
+        self.futures: Dict[str, concurrent.futures.Future] = {}
+
+    def prefetch(self, tasks: Iterable[BuildTask]) -> None:
+        """
+        Start downloading the packages of the given build tasks, in order,
+        without exceeding the maximum number of packages downloaded ahead.
+
+        Args:
+            tasks: the next build tasks to be processed
+        """
+        tasks = list(tasks)
+
+        # Discard downloads for tasks that are not coming up anymore, e.g.
+        # because the package failed or was installed by another process, so
+        # that they don't count against the maximum. The ones still running are
+        # cleaned up when they complete.
+        upcoming = set(task.pkg_id for task in tasks)
+        for pkg_id in [pkg_id for pkg_id in self.futures if pkg_id not in upcoming]:
+            future = self.futures.pop(pkg_id)
+            future.cancel()
+            future.add_done_callback(self._discard)
+
+        for task in tasks:
+            if len(self.futures) >= self.max_packages:
+                break
+            spec = task.pkg.spec
+            if task.pkg_id in self.futures or spec.external or spec.installed_upstream:
+                continue
+            if spec.installed:
+                continue
+            unsigned = task.request.install_args.get("unsigned")
+            self.futures[task.pkg_id] = self.executor.submit(
+                _prefetch, task.pkg, task.use_cache, task.cache_only, unsigned
+            )
+
+    def result(self, task: BuildTask) -> Optional[dict]:
+        """
+        Wait for the prefetch of the package of the task, if any.
+
+        Failures are only reported in debug mode, since the build will
+        attempt the download again.
+
+        Args:
+            task: the build task about to be installed
+
+        Return:
+            The binary package downloaded for the task, if any
+        """
+        future = self.futures.pop(task.pkg_id, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            tty.debug(f"Failed to prefetch {task.pkg_id}: {str(e)}")
+            return None
+
+    def shutdown(self) -> None:
+        """Cancel pending downloads, and clean up the ones that were not used."""
+        for future in self.futures.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        for future in self.futures.values():
+            self._discard(future)
+        self.futures.clear()
+
+    @staticmethod
+    def _discard(future: concurrent.futures.Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        download_result = future.result()
+        if download_result is not None:
+            binary_distribution._delete_staged_downloads(download_result)
+
+
 class PackageInstaller:
     """
     Class for managing the install process for a Spack instance based on a
@@ -1158,6 +1542,19 @@ def __init__(self, installs: List[Tuple["spack.package_base.PackageBase", dict]]
         # fast then that option applies to all build requests.
         self.fail_fast = False
 
+        # Maximum number of packages built at the same time by this process
+        self.max_active_tasks: int = spack.config.get("config:concurrent_packages", 1)
+
+        # Build tasks whose build process is running, keyed on the package's unique id
+        self.active_tasks: Dict[str, BuildTask] = {}
+
+        # Whether binary packages can be installed in threads, see _can_install_binaries_in_threads
+        self._binaries_in_threads: Optional[bool] = None
+
+        # Downloads of the packages coming up next in the queue, if enabled
+        prefetch_packages: int = spack.config.get("config:prefetch_packages", 0)
+        self.prefetcher = Prefetcher(prefetch_packages) if prefetch_packages > 0 else None
+
     def __repr__(self) -> str:
         """Returns a formal representation of the package installer."""
         rep = f"{self.__class__.__name__}("
@@ -1638,16 +2035,148 @@ def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
         Perform the installation of the requested spec and/or dependency
         represented by the build task.
 
+        If the build process of the task has already been started (see
+        ``_start_build_process``), this only waits for it to complete.
+
+        Args:
+            task: the installation build task for a package
+            install_status: the installation status for the package"""
+        if task.process is not None:
+            process, task.process = task.process, None
+            self._complete_build(task, process.complete)
+            return
+
+        if not self._prepare_build(task, install_status):
+            return
+
+        pkg, install_args = task.pkg, task.request.install_args
+        self._complete_build(
+            task,
+            lambda: spack.build_environment.start_build_process(pkg, build_process, install_args),
+        )
+
+    def _start_build_process(self, task: BuildTask, install_status: InstallStatus) -> None:
+        """
+        Start installing the package represented by the build task from a
+        binary cache in a thread, or start the child process building it from
+        sources, without waiting for either.
+
+        The binary install or build process, if any, is stored in the task and
+        is waited for by a later call to ``_complete_binary_install`` or
+        ``_install_task`` respectively.
+
         Args:
             task: the installation build task for a package
             install_status: the installation status for the package"""
+        if self._prepare_build(task, install_status, background=True):
+            self._start_source_build(task)
+
+    def _start_source_build(self, task: BuildTask) -> None:
+        """
+        Start the child process building the package of the build task from sources.
+
+        Args:
+            task: the installation build task for a package"""
+        task.process = spack.build_environment.BuildProcess(
+            task.pkg, build_process, task.request.install_args
+        )
+        task.process.start()
+
+    def _can_install_binaries_in_threads(self) -> bool:
+        """
+        Determine if binary packages can be extracted and relocated in threads.
+
+        Relocation may have to bootstrap ``patchelf``, which temporarily swaps
+        the global configuration, so this is done upfront in the main thread.
+
+        Return:
+            ``True`` if binary packages can be installed in threads, ``False`` otherwise
+        """
+        if self._binaries_in_threads is None:
+            try:
+                spack.relocate._patchelf()
+                self._binaries_in_threads = True
+            except Exception as e:
+                tty.debug(f"Installing binary packages one at a time: {str(e)}")
+                self._binaries_in_threads = False
+        return self._binaries_in_threads
+
+    def _start_binary_install(self, task: BuildTask, download_result: Optional[dict]) -> bool:
+        """
+        Start installing the package of the build task from a binary cache in
+        a thread, if a binary package is available for it.
+
+        Args:
+            task: the installation build task for a package
+            download_result: binary package already downloaded for the package, if any
+
+        Return:
+            ``True`` if the binary install was started, ``False`` otherwise
+        """
+        pkg = task.pkg
+        matches = None
+        if download_result is None:
+            tty.debug(f"Searching for binary cache of {task.pkg_id}")
+            matches = binary_distribution.get_mirrors_for_spec(pkg.spec, index_only=True)
+            if not matches:
+                return False
+
+        unsigned: Optional[bool] = task.request.install_args.get("unsigned")
+        task.process = BinaryInstall(pkg, unsigned, matches, download_result)
+        task.process.start()
+        return True
+
+    def _complete_binary_install(self, task: BuildTask) -> None:
+        """
+        Wait for the binary install of the package of the build task to
+        complete, and register the package as installed. If no binary package
+        could be downloaded, start building the package from sources instead.
+
+        Args:
+            task: the installation build task for a package
+        """
+        pkg, pkg_id = task.pkg, task.pkg_id
+        binary_install, task.process = task.process, None
+        assert isinstance(binary_install, BinaryInstall)
+
+        if binary_install.complete():
+            # Registering in the main thread, once all dependencies are
+            # installed, keeps database updates in topological order.
+            pkg.installed_from_binary_cache = True
+            spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=task.explicit)
+            _complete_install_from_cache(pkg, task.explicit, binary_install.timer)
+            if task.compiler:
+                self._add_compiler_package_to_config(pkg)
+            return
+
+        if task.cache_only:
+            raise InstallError("No binary found when cache-only was specified", pkg=pkg)
+
+        tty.msg(f"No binary for {pkg_id} found: installing from source")
+        if self._prepare_source_build(task):
+            self._start_source_build(task)
+
+    def _prepare_build(
+        self, task: BuildTask, install_status: InstallStatus, background: bool = False
+    ) -> bool:
+        """
+        Install the package represented by the build task from a binary cache
+        if possible, otherwise prepare it to be built from sources.
+
+        Args:
+            task: the installation build task for a package
+            install_status: the installation status for the package
+            background: start installing the package from a binary cache in a
+                thread, if possible, instead of waiting for the install
+
+        Return:
+            ``True`` if the package has to be built from sources, ``False`` otherwise
+        """
 
         explicit = task.explicit
         install_args = task.request.install_args
         cache_only = task.cache_only
         use_cache = task.use_cache
-        tests = install_args.get("tests", False)
-        assert isinstance(tests, (bool, list))  # make mypy happy.
         unsigned: Optional[bool] = install_args.get("unsigned")
 
         pkg, pkg_id = task.pkg, task.pkg_id
@@ -1656,48 +2185,90 @@ def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
         task.start = task.start or time.time()
         task.status = STATUS_INSTALLING
 
+        # Pick up the binary package or the sources downloaded ahead, if any
+        download_result = self.prefetcher.result(task) if self.prefetcher else None
+
         # Use the binary cache if requested
         if use_cache:
-            if _install_from_cache(pkg, explicit, unsigned):
+            # Only consider installing binaries in threads if there may be any,
+            # to avoid bootstrapping patchelf otherwise.
+            binaries_in_threads = (
+                background
+                and (
+                    download_result is not None or bool(spack.mirror.MirrorCollection(binary=True))
+                )
+                and self._can_install_binaries_in_threads()
+            )
+            if binaries_in_threads:
+                if self._start_binary_install(task, download_result):
+                    return False
+            elif _install_from_cache(pkg, explicit, unsigned, download_result):
                 self._update_installed(task)
                 if task.compiler:
                     self._add_compiler_package_to_config(pkg)
-                return
-            elif cache_only:
+                return False
+
+            if cache_only:
                 raise InstallError("No binary found when cache-only was specified", pkg=pkg)
             else:
                 tty.msg(f"No binary for {pkg_id} found: installing from source")
 
+        return self._prepare_source_build(task)
+
+    def _prepare_source_build(self, task: BuildTask) -> bool:
+        """
+        Prepare the package represented by the build task to be built from sources.
+
+        Args:
+            task: the installation build task for a package
+
+        Return:
+            ``True`` if the package has to be built from sources, ``False`` otherwise
+        """
+        install_args = task.request.install_args
+        tests = install_args.get("tests", False)
+        assert isinstance(tests, (bool, list))  # make mypy happy.
+        pkg = task.pkg
+
         pkg.run_tests = tests if isinstance(tests, bool) else pkg.name in tests
 
         # hook that allows tests to inspect the Package before installation
         # see unit_test_check() docs.
         if not pkg.unit_test_check():
-            return
+            return False
 
         # Injecting information to know if this installation request is the root one
         # to determine in BuildProcessInstaller whether installation is explicit or not
         install_args["is_root"] = task.is_root
 
-        try:
-            self._setup_install_dir(pkg)
+        self._setup_install_dir(pkg)
+
+        # Create stage object now and let it be serialized for the child process. That
+        # way monkeypatch in tests works correctly.
+        pkg.stage
+
+        return True
 
-            # Create stage object now and let it be serialized for the child process. That
-            # way monkeypatch in tests works correctly.
-            pkg.stage
+    def _complete_build(self, task: BuildTask, build: Callable[[], bool]) -> None:
+        """
+        Wait for the package of the build task to be built from sources and
+        register it as installed.
 
-            # Create a child process to do the actual installation.
+        Args:
+            task: the installation build task for a package
+            build: function returning the result of the child process doing
+                the actual installation"""
+        pkg = task.pkg
+        try:
             # Preserve verbosity settings across installs.
-            spack.package_base.PackageBase._verbose = spack.build_environment.start_build_process(
-                pkg, build_process, install_args
-            )
+            spack.package_base.PackageBase._verbose = build()
             # Currently this is how RPATH-like behavior is achieved on Windows, after install
             # establish runtime linkage via Windows Runtime link object
             # Note: this is a no-op on non Windows platforms
             pkg.windows_establish_runtime_linkage()
             # Note: PARENT of the build process adds the new package to
             # the database, so that we don't need to re-read from file.
-            spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=explicit)
+            spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=task.explicit)
 
             # If a compiler, ensure it is added to the configuration
             if task.compiler:
@@ -1709,6 +2280,48 @@ def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
             tty.debug(f"{pid}{str(e)}")
             tty.debug(f"Package stage directory: {pkg.stage.source_path}")
 
+    def _wait_for_active_tasks(self) -> List[BuildTask]:
+        """
+        Block until at least one of the active binary installs or build
+        processes finishes.
+
+        Return:
+            The build tasks whose binary install or build process finished,
+            removed from the active tasks.
+        """
+        pipes = {task.process.read_pipe: task for task in self.active_tasks.values()}  # type: ignore[union-attr] # noqa: E501
+        done = [pipes[pipe] for pipe in multiprocessing.connection.wait(list(pipes))]
+        for task in done:
+            del self.active_tasks[task.pkg_id]
+        return sorted(done, key=lambda t: t.pkg_id)
+
+    def _terminate_active_tasks(self) -> None:
+        """Terminate the build processes still running, e.g. on a fatal error, and wait
+        for the binary installs in progress."""
+        for pkg_id, task in self.active_tasks.items():
+            if task.process is not None:
+                tty.debug(f"Terminating the build process of {pkg_id}")
+                task.process.terminate()
+                task.process = None
+        self.active_tasks.clear()
+
+    def _must_wait(self) -> bool:
+        """
+        Determine if the installer has to wait for an active build to finish
+        before it can process the next build task.
+
+        Return:
+            True if all build slots are in use, or if the next build task
+            still depends on packages being built, False otherwise
+        """
+        if not self.active_tasks:
+            return False
+        return (
+            not self.build_pq
+            or len(self.active_tasks) >= self.max_active_tasks
+            or not self._next_is_pri0()
+        )
+
     def _next_is_pri0(self) -> bool:
         """
         Determine if the next build task has priority 0
@@ -1721,6 +2334,16 @@ def _next_is_pri0(self) -> bool:
         task = self.build_pq[0][1]
         return task.priority == 0
 
+    def _next_tasks(self, count: int) -> List[BuildTask]:
+        """
+        Return, without removing them, the next build tasks to be processed.
+
+        Args:
+            count: maximum number of build tasks to return
+        """
+        queued = (entry for entry in self.build_pq if entry[1].status != STATUS_REMOVED)
+        return [task for _, task in heapq.nsmallest(count, queued)]
+
     def _pop_task(self) -> Optional[BuildTask]:
         """
         Remove and return the lowest priority build task.
@@ -1953,6 +2576,35 @@ def _init_queue(self) -> None:
                 for dependent_id in dependents.difference(task.dependents):
                     task.add_dependent(dependent_id)
 
+        self._prioritize_critical_path()
+
+    def _prioritize_critical_path(self) -> None:
+        """
+        Compute the critical path of every build task from the estimated
+        install times of the packages, and requeue the tasks accordingly, so
+        that long builds on which many packages depend are started early.
+        """
+        tasks = self.build_tasks
+        estimates = estimate_install_times(task.pkg.spec for task in tasks.values())
+
+        critical_paths: Dict[str, float] = {}
+
+        def _critical_path(pkg_id: str) -> float:
+            if pkg_id not in critical_paths:
+                dependents = tasks[pkg_id].dependents
+                critical_paths[pkg_id] = estimates[pkg_id] + max(
+                    (_critical_path(d) for d in dependents if d in tasks), default=0.0
+                )
+            return critical_paths[pkg_id]
+
+        for pkg_id, task in tasks.items():
+            task.critical_path = _critical_path(pkg_id)
+            tty.debug(f"Critical path of {pkg_id}: {task.critical_path:.1f}s", level=2)
+
+        # The keys of the queued tasks have changed, so rebuild the heap.
+        self.build_pq = [(task.key, task) for _, task in self.build_pq]
+        heapq.heapify(self.build_pq)
+
     def _install_action(self, task: BuildTask) -> int:
         """
         Determine whether the installation should be overwritten (if it already
@@ -1993,9 +2645,7 @@ def install(self) -> None:
         """Install the requested package(s) and or associated dependencies."""
 
         self._init_queue()
-        fail_fast_err = "Terminating after first install failure"
-        single_explicit_spec = len(self.build_requests) == 1
-        failed_explicits = []
+        failed_explicits: List[Tuple["spack.package_base.PackageBase", str, str]] = []
 
         install_status = InstallStatus(len(self.build_pq))
 
@@ -2005,13 +2655,97 @@ def install(self) -> None:
             enabled=sys.stdout.isatty() and tty.msg_enabled() and not tty.is_debug()
         )
 
-        while self.build_pq:
+        # Packages built concurrently share a single jobserver, sized to the
+        # number of build jobs, so that they do not oversubscribe the node.
+        jobs = determine_number_of_jobs(parallel=True) if self.max_active_tasks > 1 else 1
+
+        # Installed packages are registered in the database in batches, if requested.
+        flush_interval = spack.config.get("config:db_flush_interval", 0)
+        try:
+            with spack.store.STORE.db.batched_writes(flush_interval):
+                with spack.build_environment.shared_jobserver(jobs):
+                    self._process_queue(install_status, term_status, failed_explicits)
+        except BaseException:
+            # Do not leave builds running in the background of a failed install.
+            self._terminate_active_tasks()
+            raise
+        finally:
+            if self.prefetcher:
+                self.prefetcher.shutdown()
+
+        # Cleanup, which includes releasing all of the read locks
+        self._cleanup_all_tasks()
+
+        # Ensure we properly report if one or more explicit specs failed
+        # or were not installed when should have been.
+        missing = [
+            (request.pkg, request.pkg_id)
+            for request in self.build_requests
+            if request.install_args.get("install_package") and request.pkg_id not in self.installed
+        ]
+
+        if failed_explicits or missing:
+            for _, pkg_id, err in failed_explicits:
+                tty.error(f"{pkg_id}: {err}")
+
+            for _, pkg_id in missing:
+                tty.error(f"{pkg_id}: Package was not installed")
+
+            if len(failed_explicits) > 0:
+                pkg = failed_explicits[0][0]
+                ids = [pkg_id for _, pkg_id, _ in failed_explicits]
+                tty.debug(
+                    "Associating installation failure with first failed "
+                    f"explicit package ({ids[0]}) from {', '.join(ids)}"
+                )
+
+            elif len(missing) > 0:
+                pkg = missing[0][0]
+                ids = [pkg_id for _, pkg_id in missing]
+                tty.debug(
+                    "Associating installation failure with first "
+                    f"missing package ({ids[0]}) from {', '.join(ids)}"
+                )
+
+            raise InstallError(
+                "Installation request failed.  Refer to reported errors for failing package(s).",
+                pkg=pkg,
+            )
+
+    def _process_queue(
+        self,
+        install_status: InstallStatus,
+        term_status: TermStatusLine,
+        failed_explicits: List[Tuple["spack.package_base.PackageBase", str, str]],
+    ) -> None:
+        """Process build tasks until the queue is empty and no build is active.
+
+        Args:
+            install_status: the installation status of the packages
+            term_status: the terminal status line
+            failed_explicits: list collecting the explicit packages that failed
+                to install, along with their id and error message
+        """
+        fail_fast_err = "Terminating after first install failure"
+        while self.build_pq or self.active_tasks:
+            if self.prefetcher:
+                self.prefetcher.prefetch(self._next_tasks(self.prefetcher.max_packages))
+
+            # Complete the builds that have finished, when we cannot start a
+            # new one, since that will likely unblock tasks of their dependents.
+            if self._must_wait():
+                for task in self._wait_for_active_tasks():
+                    self._run_install_action(task, install_status, failed_explicits)
+                continue
+
             task = self._pop_task()
             if task is None:
                 continue
 
-            install_args = task.request.install_args
-            keep_prefix = install_args.get("keep_prefix")
+            # The task has to wait for its dependencies still being built.
+            if task.priority != 0 and self.active_tasks:
+                self._push_task(task)
+                continue
 
             pkg, pkg_id, spec = task.pkg, task.pkg_id, task.pkg.spec
             install_status.next_pkg(pkg)
@@ -2136,120 +2870,121 @@ def install(self) -> None:
             # Proceed with the installation since we have an exclusive write
             # lock on the package.
             install_status.set_term_title(f"Installing {pkg.name}")
-            try:
-                action = self._install_action(task)
+            self._run_install_action(task, install_status, failed_explicits)
 
-                if action == InstallAction.INSTALL:
-                    self._install_task(task, install_status)
-                elif action == InstallAction.OVERWRITE:
-                    # spack.store.STORE.db is not really a Database object, but a small
-                    # wrapper -- silence mypy
-                    OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
+    def _run_install_action(
+        self,
+        task: BuildTask,
+        install_status: InstallStatus,
+        failed_explicits: List[Tuple["spack.package_base.PackageBase", str, str]],
+    ) -> None:
+        """
+        Install the package of a write locked build task, or complete its
+        installation once its build process has finished, and handle the
+        outcome.
 
-                self._update_installed(task)
+        When packages are built concurrently, the build process of the task
+        is started and tracked in the active tasks instead of waited for.
 
-                # If we installed then we should keep the prefix
-                stop_before_phase = getattr(pkg, "stop_before_phase", None)
-                last_phase = getattr(pkg, "last_phase", None)
-                keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
+        Args:
+            task: the build task for the package
+            install_status: the installation status for the package
+            failed_explicits: list collecting the explicit packages that failed
+                to install, along with their id and error message
+        """
+        fail_fast_err = "Terminating after first install failure"
+        single_explicit_spec = len(self.build_requests) == 1
+        keep_prefix = task.request.install_args.get("keep_prefix")
+        pkg, pkg_id = task.pkg, task.pkg_id
+        action = InstallAction.INSTALL
 
-            except KeyboardInterrupt as exc:
-                # The build has been terminated with a Ctrl-C so terminate
-                # regardless of the number of remaining specs.
-                tty.error(
-                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
-                )
-                raise
+        try:
+            if task.process is None:
+                action = self._install_action(task)
 
-            except binary_distribution.NoChecksumException as exc:
-                if task.cache_only:
-                    raise
+            if action == InstallAction.INSTALL:
+                if isinstance(task.process, BinaryInstall):
+                    self._complete_binary_install(task)
+                elif task.process is None and self.max_active_tasks > 1:
+                    self._start_build_process(task, install_status)
+                else:
+                    self._install_task(task, install_status)
 
-                # Checking hash on downloaded binary failed.
-                tty.error(
-                    f"Failed to install {pkg.name} from binary cache due "
-                    f"to {str(exc)}: Requeueing to install from source."
-                )
-                # this overrides a full method, which is ugly.
-                task.use_cache = False  # type: ignore[misc]
-                self._requeue_task(task, install_status)
-                continue
+                if task.process is not None:
+                    # Keep the prefix of the package being installed, until
+                    # its binary install or build process completes.
+                    keep_prefix = True
+                    self.active_tasks[pkg_id] = task
+                    return
+            elif action == InstallAction.OVERWRITE:
+                # spack.store.STORE.db is not really a Database object, but a small
+                # wrapper -- silence mypy
+                OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
 
-            except (Exception, SystemExit) as exc:
-                self._update_failed(task, True, exc)
-
-                # Best effort installs suppress the exception and mark the
-                # package as a failure.
-                if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
-                    exc.printed = True  # type: ignore[union-attr]
-                    # SpackErrors can be printed by the build process or at
-                    # lower levels -- skip printing if already printed.
-                    # TODO: sort out this and SpackError.print_context()
-                    tty.error(
-                        f"Failed to install {pkg.name} due to "
-                        f"{exc.__class__.__name__}: {str(exc)}"
-                    )
-                # Terminate if requested to do so on the first failure.
-                if self.fail_fast:
-                    raise InstallError(f"{fail_fast_err}: {str(exc)}", pkg=pkg)
-
-                # Terminate at this point if the single explicit spec has
-                # failed to install.
-                if single_explicit_spec and task.explicit:
-                    raise
+            self._update_installed(task)
 
-                # Track explicit spec id and error to summarize when done
-                if task.explicit:
-                    failed_explicits.append((pkg, pkg_id, str(exc)))
+            # If we installed then we should keep the prefix
+            stop_before_phase = getattr(pkg, "stop_before_phase", None)
+            last_phase = getattr(pkg, "last_phase", None)
+            keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
 
-            finally:
-                # Remove the install prefix if anything went wrong during
-                # install.
-                if not keep_prefix and not action == InstallAction.OVERWRITE:
-                    pkg.remove_prefix()
+        except KeyboardInterrupt as exc:
+            # The build has been terminated with a Ctrl-C so terminate
+            # regardless of the number of remaining specs.
+            tty.error(
+                f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+            )
+            raise
 
-            # Perform basic task cleanup for the installed spec to
-            # include downgrading the write to a read lock
-            self._cleanup_task(pkg)
+        except binary_distribution.NoChecksumException as exc:
+            if task.cache_only:
+                raise
 
-        # Cleanup, which includes releasing all of the read locks
-        self._cleanup_all_tasks()
+            # Checking hash on downloaded binary failed.
+            tty.error(
+                f"Failed to install {pkg.name} from binary cache due "
+                f"to {str(exc)}: Requeueing to install from source."
+            )
+            # this overrides a full method, which is ugly.
+            task.use_cache = False  # type: ignore[misc]
+            self._requeue_task(task, install_status)
+            return
 
-        # Ensure we properly report if one or more explicit specs failed
-        # or were not installed when should have been.
-        missing = [
-            (request.pkg, request.pkg_id)
-            for request in self.build_requests
-            if request.install_args.get("install_package") and request.pkg_id not in self.installed
-        ]
+        except (Exception, SystemExit) as exc:
+            self._update_failed(task, True, exc)
 
-        if failed_explicits or missing:
-            for _, pkg_id, err in failed_explicits:
-                tty.error(f"{pkg_id}: {err}")
+            # Best effort installs suppress the exception and mark the
+            # package as a failure.
+            if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
+                exc.printed = True  # type: ignore[union-attr]
+                # SpackErrors can be printed by the build process or at
+                # lower levels -- skip printing if already printed.
+                # TODO: sort out this and SpackError.print_context()
+                tty.error(
+                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+                )
+            # Terminate if requested to do so on the first failure.
+            if self.fail_fast:
+                raise InstallError(f"{fail_fast_err}: {str(exc)}", pkg=pkg)
 
-            for _, pkg_id in missing:
-                tty.error(f"{pkg_id}: Package was not installed")
+            # Terminate at this point if the single explicit spec has
+            # failed to install.
+            if single_explicit_spec and task.explicit:
+                raise
 
-            if len(failed_explicits) > 0:
-                pkg = failed_explicits[0][0]
-                ids = [pkg_id for _, pkg_id, _ in failed_explicits]
-                tty.debug(
-                    "Associating installation failure with first failed "
-                    f"explicit package ({ids[0]}) from {', '.join(ids)}"
-                )
+            # Track explicit spec id and error to summarize when done
+            if task.explicit:
+                failed_explicits.append((pkg, pkg_id, str(exc)))
 
-            elif len(missing) > 0:
-                pkg = missing[0][0]
-                ids = [pkg_id for _, pkg_id in missing]
-                tty.debug(
-                    "Associating installation failure with first "
-                    f"missing package ({ids[0]}) from {', '.join(ids)}"
-                )
+        finally:
+            # Remove the install prefix if anything went wrong during
+            # install.
+            if not keep_prefix and not action == InstallAction.OVERWRITE:
+                pkg.remove_prefix()
 
-            raise InstallError(
-                "Installation request failed.  Refer to reported errors for failing package(s).",
-                pkg=pkg,
-            )
+        # Perform basic task cleanup for the installed spec to
+        # include downgrading the write to a read lock
+        self._cleanup_task(pkg)
 
 
 class BuildProcessInstaller:
@@ -160,6 +160,13 @@ def dependencies(spec, request="all"):
     return [d for d in deps if not (d in seen or seen_add(d))]
 
 
+@memoized
+def _spec_matcher(constraint: str) -> spack.spec.SpecMatcher:
+    """Return a matcher for a constraint in the configuration of module files, compiled
+    once for all the specs it is checked against."""
+    return spack.spec.SpecMatcher(constraint)
+
+
 def merge_config_rules(configuration, spec):
     """Parses the module specific part of a configuration and returns a
     dictionary containing the actions to be performed on the spec passed as
@@ -177,7 +184,7 @@ def merge_config_rules(configuration, spec):
     # evaluated in order of appearance in the module file
     spec_configuration = copy.deepcopy(configuration.get("all", {}))
     for constraint, action in configuration.items():
-        if spec.satisfies(constraint):
+        if _spec_matcher(constraint)(spec):
             if hasattr(constraint, "override") and constraint.override:
                 spec_configuration = {}
             update_dictionary_extending_lists(spec_configuration, copy.deepcopy(action))
@@ -489,8 +496,8 @@ def excluded(self):
         conf = self.module.configuration(self.name)
 
         # Compute the list of matching include / exclude rules, and whether excluded as implicit
-        include_matches = [x for x in conf.get("include", []) if spec.satisfies(x)]
-        exclude_matches = [x for x in conf.get("exclude", []) if spec.satisfies(x)]
+        include_matches = [x for x in conf.get("include", []) if _spec_matcher(x)(spec)]
+        exclude_matches = [x for x in conf.get("exclude", []) if _spec_matcher(x)(spec)]
         excluded_as_implicit = not self.explicit and conf.get("exclude_implicits", False)
 
         def debug_info(line_header, match_list):
@@ -990,7 +997,7 @@ def write(self, overwrite=False):
         self.update_module_hiddenness()
 
     def update_module_defaults(self):
-        if any(self.spec.satisfies(default) for default in self.conf.defaults):
+        if any(_spec_matcher(default)(self.spec) for default in self.conf.defaults):
             # This spec matches a default, it needs to be symlinked to default
             # Symlink to a tmp location first and move, so that existing
             # symlinks do not cause an error.
@@ -1069,7 +1076,7 @@ def remove(self):
                 pass
 
     def remove_module_defaults(self):
-        if not any(self.spec.satisfies(default) for default in self.conf.defaults):
+        if not any(_spec_matcher(default)(self.spec) for default in self.conf.defaults):
             return
 
         # This spec matches a default, symlink needs to be removed as we remove the module
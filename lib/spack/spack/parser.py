@@ -58,6 +58,7 @@
 expansion when it is the first character in an id typed on the command line.
 """
 import enum
+import functools
 import json
 import pathlib
 import re
@@ -237,6 +238,37 @@ def __eq__(self, other):
 ALL_TOKENS = re.compile("|".join(TOKEN_REGEXES))
 #: Regex to analyze an invalid text
 ANALYSIS_REGEX = re.compile("|".join(ERROR_HANDLING_REGEXES))
+#: Token kinds by the name of their group in ``ALL_TOKENS``
+TOKEN_KINDS = {str(token): token for token in TokenType}
+#: Regex to match the most common spec strings, which are just a package name
+PACKAGE_NAME = re.compile(IDENTIFIER)
+
+#: Tokens that can follow the name of a node, and are parsed as part of it
+NODE_OPTION_TOKENS = frozenset(
+    (
+        TokenType.COMPILER,
+        TokenType.COMPILER_AND_VERSION,
+        TokenType.VERSION_HASH_PAIR,
+        TokenType.GIT_VERSION,
+        TokenType.VERSION,
+        TokenType.BOOL_VARIANT,
+        TokenType.PROPAGATED_BOOL_VARIANT,
+        TokenType.KEY_VALUE_PAIR,
+        TokenType.PROPAGATED_KEY_VALUE_PAIR,
+        TokenType.DAG_HASH,
+    )
+)
+
+#: Maximum number of spec strings whose specs are kept by ``parse_one_cached``
+PARSE_CACHE_SIZE = 16384
+
+#: Matches the spec strings that are not cached, since parsing them depends on the
+#: state of Spack: those with spec files, with the reserved names of operating systems
+#: and targets of the host platform, and with git versions, which get a lookup attached
+NOT_CACHEABLE = re.compile(
+    rf"\.(?:json|yaml)|\b(?:default_os|default_target|frontend|fe|backend|be)\b"
+    rf"|git\.|{GIT_HASH}"
+)
 
 
 def tokenize(text: str) -> Iterator[Token]:
@@ -246,6 +278,11 @@ def tokenize(text: str) -> Iterator[Token]:
         SpecTokenizationError: if we can't tokenize anymore, but didn't reach the
             end of the input text.
     """
+    # Fast path for a package name, which is the only token ALL_TOKENS would match
+    if PACKAGE_NAME.fullmatch(text):
+        yield Token(TokenType.UNQUALIFIED_PACKAGE_NAME, text, 0, len(text))
+        return
+
     scanner = ALL_TOKENS.scanner(text)  # type: ignore[attr-defined]
     match: Optional[Match] = None
     for match in iter(scanner.match, None):
@@ -256,9 +293,7 @@ def tokenize(text: str) -> Iterator[Token]:
         )
         assert match is not None, msg
         assert match.lastgroup is not None, msg
-        yield Token(
-            TokenType.__members__[match.lastgroup], match.group(), match.start(), match.end()
-        )
+        yield Token(TOKEN_KINDS[match.lastgroup], match.group(), match.start(), match.end())
 
     if match is None and not text:
         # We just got an empty string
@@ -305,13 +340,13 @@ class SpecParser:
 
     def __init__(self, literal_str: str):
         self.literal_str = literal_str
-        self.ctx = TokenContext(filter(lambda x: x.kind != TokenType.WS, tokenize(literal_str)))
+        self.ctx = TokenContext(t for t in tokenize(literal_str) if t.kind is not TokenType.WS)
 
     def tokens(self) -> List[Token]:
         """Return the entire list of token from the initial text. White spaces are
         filtered out.
         """
-        return list(filter(lambda x: x.kind != TokenType.WS, tokenize(self.literal_str)))
+        return [t for t in tokenize(self.literal_str) if t.kind is not TokenType.WS]
 
     def next_spec(
         self, initial_spec: Optional["spack.spec.Spec"] = None
@@ -405,7 +440,7 @@ def parse(
         elif self.ctx.accept(TokenType.FILENAME):
             return FileParser(self.ctx).parse(initial_spec)
 
-        while True:
+        while self.ctx.next_token and self.ctx.next_token.kind in NODE_OPTION_TOKENS:
             if self.ctx.accept(TokenType.COMPILER):
                 if self.has_compiler:
                     raise spack.spec.DuplicateCompilerSpecError(
@@ -559,6 +594,31 @@ def parse(text: str) -> List["spack.spec.Spec"]:
     return SpecParser(text).all_specs()
 
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_one_cached(text: str) -> "spack.spec.Spec":
+    return parse_one_or_raise(text)
+
+
+def parse_one_cached(text: str) -> Optional["spack.spec.Spec"]:
+    """Parse exactly one spec from text, like ``parse_one_or_raise``, and keep the spec
+    in a LRU cache, since the same strings are parsed many times, e.g. the ``when=``
+    arguments of directives, or the requirements in configuration.
+
+    The spec returned is shared by all the callers, so it must be copied, and never
+    modified. Errors are not cached.
+
+    Args:
+        text (str): text to be parsed
+
+    Return:
+        The parsed spec, or None if the text is not cached, since it is blank, or parsing
+        it depends on the state of Spack (see ``NOT_CACHEABLE``)
+    """
+    if not text.strip() or NOT_CACHEABLE.search(text):
+        return None
+    return _parse_one_cached(text)
+
+
 def parse_one_or_raise(
     text: str, initial_spec: Optional["spack.spec.Spec"] = None
 ) -> "spack.spec.Spec":
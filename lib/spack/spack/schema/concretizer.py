@@ -9,6 +9,16 @@
 """
 from typing import Any, Dict
 
+#: Settings of an on disk cache of the solver
+solver_cache = {
+    "type": "object",
+    "properties": {
+        "enable": {"type": "boolean"},
+        "entry_limit": {"type": "integer", "minimum": 0},
+        "size_limit": {"type": "number", "minimum": 0},
+    },
+}
+
 properties: Dict[str, Any] = {
     "concretizer": {
         "type": "object",
@@ -34,6 +44,10 @@
                     "strategy": {"type": "string", "enum": ["none", "minimal", "full"]}
                 },
             },
+            "solver_threads": {"type": "integer", "minimum": 1},
+            "package_facts_processes": {"type": "integer", "minimum": 1},
+            "concretization_cache": solver_cache,
+            "package_facts_cache": solver_cache,
         },
     }
 }
@@ -6,16 +6,32 @@
 import collections.abc
 import copy
 import enum
+import hashlib
 import itertools
+import multiprocessing
 import os
 import pathlib
 import pprint
 import re
 import sys
+import tempfile
 import types
 import typing
 import warnings
-from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import archspec.cpu
 
@@ -37,9 +53,12 @@
 import spack.parser
 import spack.platforms
 import spack.repo
+import spack.solver.cache
 import spack.spec
 import spack.store
+import spack.target
 import spack.util.crypto
+import spack.util.parallel
 import spack.util.path
 import spack.util.timer
 import spack.variant
@@ -86,8 +105,31 @@
 )
 
 
+#: Configurations of the threads of the solver, when ``concretizer:solver_threads`` is more
+#: than one. Each entry is a name, a preset of clasp, and the options set on top of it. Thread
+#: ``i`` uses the entry ``i``, so the first thread always searches with the default
+#: configuration of Spack, and there are at most as many threads as entries.
+SOLVER_PORTFOLIO: List[Tuple[str, str, str]] = [
+    ("tweety-usc", "tweety", "--heuristic=Domain --opt-strategy=usc,one"),
+    ("trendy-usc", "trendy", "--heuristic=Domain --opt-strategy=usc,one"),
+    ("tweety-bb", "tweety", "--heuristic=Domain --opt-strategy=bb,dec"),
+    ("handy-usc", "handy", "--heuristic=Domain --opt-strategy=usc,one"),
+    ("crafty-bb", "crafty", "--heuristic=Domain --opt-strategy=bb,hier"),
+    ("jumpy-usc", "jumpy", "--heuristic=Domain --opt-strategy=usc,k,4"),
+    ("frumpy-usc", "frumpy", "--heuristic=Domain --opt-strategy=usc,pmres"),
+    ("tweety-oll", "tweety", "--heuristic=Domain --opt-strategy=usc,oll"),
+]
+
+#: Global options of the "tweety" preset. In a portfolio, global options are only read from
+#: the first configuration.
+PORTFOLIO_GLOBAL_OPTIONS = "--eq=3 --trans-ext=dynamic"
+
+
 def default_clingo_control():
     """Return a control object with the default settings used in Spack"""
+    threads = min(spack.config.get("concretizer:solver_threads", 1), len(SOLVER_PORTFOLIO))
+    if threads > 1:
+        return portfolio_clingo_control(threads)
     control = clingo().Control()
     control.configuration.configuration = "tweety"
     control.configuration.solver.heuristic = "Domain"
@@ -95,6 +137,54 @@ def default_clingo_control():
     return control
 
 
+def portfolio_text(portfolio: List[Tuple[str, str, str]]) -> str:
+    """Return a portfolio in the format of the configuration files of clasp."""
+    lines = []
+    for idx, (name, preset, options) in enumerate(portfolio):
+        if idx == 0:
+            options = f"{PORTFOLIO_GLOBAL_OPTIONS} {options}"
+        lines.append(f"[{name}]({preset}): {options}\n")
+    return "".join(lines)
+
+
+def portfolio_clingo_control(threads: int, portfolio: Optional[List[Tuple[str, str, str]]] = None):
+    """Return a control object whose threads compete for the optimum, each searching with
+    a configuration of the portfolio.
+
+    Arguments:
+        threads: number of threads of the solver, at most one per configuration
+        portfolio: configurations of the threads, by default ``SOLVER_PORTFOLIO``
+    """
+    portfolio = portfolio or SOLVER_PORTFOLIO
+    # Additional threads would search again with the first configurations
+    threads = min(threads, len(portfolio))
+    control = clingo().Control([f"--parallel-mode={threads},compete"])
+    # clasp reads portfolios only from files, as soon as the configuration is set
+    with tempfile.NamedTemporaryFile("w", suffix=".port", delete=False) as f:
+        f.write(portfolio_text(portfolio))
+    try:
+        control.configuration.configuration = f.name
+    finally:
+        os.remove(f.name)
+    return control
+
+
+def winning_configuration(control, portfolio: Optional[List[Tuple[str, str, str]]] = None) -> str:
+    """Return the configuration of the thread that found the last model of a solve.
+
+    Arguments:
+        control: control object after a solve
+        portfolio: configurations of the threads, by default ``SOLVER_PORTFOLIO`` if there
+            are more than one
+    """
+    threads = int(control.configuration.solve.parallel_mode.split(",")[0])
+    if threads == 1 and portfolio is None:
+        return control.configuration.configuration
+    winner = int(control.statistics["summary"]["winner"])
+    portfolio = portfolio or SOLVER_PORTFOLIO
+    return f"{portfolio[winner][0]} (thread {winner} of {threads})"
+
+
 class Provenance(enum.IntEnum):
     """Enumeration of the possible provenances of a version."""
 
@@ -740,50 +830,62 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
             return Result(specs), None, None
         timer.stop("setup")
 
-        timer.start("load")
-        # Add the problem instance
-        self.control.add("base", [], asp_problem)
-        # Load the file itself
-        parent_dir = os.path.dirname(__file__)
-        self.control.load(os.path.join(parent_dir, "concretize.lp"))
-        self.control.load(os.path.join(parent_dir, "heuristic.lp"))
-        if spack.config.CONFIG.get("concretizer:duplicates:strategy", "none") != "none":
-            self.control.load(os.path.join(parent_dir, "heuristic_separate.lp"))
-        self.control.load(os.path.join(parent_dir, "os_compatibility.lp"))
-        self.control.load(os.path.join(parent_dir, "display.lp"))
-        if not setup.concretize_everything:
-            self.control.load(os.path.join(parent_dir, "when_possible.lp"))
-        timer.stop("load")
+        programs = self.logic_programs(setup)
 
-        # Grounding is the first step in the solve -- it turns our facts
-        # and first-order logic rules into propositional logic.
-        timer.start("ground")
-        self.control.ground([("base", [])])
-        timer.stop("ground")
+        # The same input always gives the same answer, so if it is cached we can skip
+        # grounding and solving
+        cache = spack.solver.cache.concretization_cache() if control is None else None
+        cache_key, cached_answer = None, None
+        if cache is not None:
+            timer.start("cache")
+            cache_key = cache.key(asp_problem, programs, self.cache_settings(setup))
+            cached_answer = cache.fetch(cache_key)
+            timer.stop("cache")
 
-        # With a grounded program, we can run the solve.
         result = Result(specs)
         models = []  # stable models if things go well
         cores = []  # unsatisfiable cores if they do not
 
-        def on_model(model):
-            models.append((model.cost, model.symbols(shown=True, terms=True)))
+        if cached_answer is not None:
+            result.satisfiable = True
+            models.append((cached_answer["cost"], [parse_term(s) for s in cached_answer["model"]]))
+            nmodels = cached_answer["nmodels"]
 
-        solve_kwargs = {
-            "assumptions": setup.assumptions,
-            "on_model": on_model,
-            "on_core": cores.append,
-        }
-
-        if clingo_cffi():
-            solve_kwargs["on_unsat"] = cores.append
-
-        timer.start("solve")
-        solve_result = self.control.solve(**solve_kwargs)
-        timer.stop("solve")
-
-        # once done, construct the solve result
-        result.satisfiable = solve_result.satisfiable
+        else:
+            timer.start("load")
+            # Add the problem instance
+            self.control.add("base", [], asp_problem)
+            # Load the logic programs
+            for program in programs:
+                self.control.load(program)
+            timer.stop("load")
+
+            # Grounding is the first step in the solve -- it turns our facts
+            # and first-order logic rules into propositional logic.
+            timer.start("ground")
+            self.control.ground([("base", [])])
+            timer.stop("ground")
+
+            # With a grounded program, we can run the solve.
+            def on_model(model):
+                models.append((model.cost, model.symbols(shown=True, terms=True)))
+
+            solve_kwargs = {
+                "assumptions": setup.assumptions,
+                "on_model": on_model,
+                "on_core": cores.append,
+            }
+
+            if clingo_cffi():
+                solve_kwargs["on_unsat"] = cores.append
+
+            timer.start("solve")
+            solve_result = self.control.solve(**solve_kwargs)
+            timer.stop("solve")
+
+            # once done, construct the solve result
+            result.satisfiable = solve_result.satisfiable
+            nmodels = len(models)
 
         if result.satisfiable:
             # get the best model
@@ -794,6 +896,15 @@ def on_model(model):
             error_handler = ErrorHandler(best_model)
             error_handler.raise_if_errors()
 
+            if cache_key is not None and cached_answer is None:
+                answer = {
+                    "cost": list(min_cost),
+                    "model": [str(symbol) for symbol in best_model],
+                    "nmodels": nmodels,
+                }
+                cache.store(cache_key, answer)
+                cache.cleanup()
+
             # build specs from spec attributes in the model
             spec_attrs = [(name, tuple(rest)) for name, *rest in extract_args(best_model, "attr")]
             answers = builder.build_specs(spec_attrs)
@@ -806,7 +917,7 @@ def on_model(model):
             result.criteria = build_criteria_names(min_cost, criteria_args)
 
             # record the number of models the solver considered
-            result.nmodels = len(models)
+            result.nmodels = nmodels
 
             # record the possible dependencies in the solve
             result.possible_dependencies = setup.pkgs
@@ -821,7 +932,12 @@ def on_model(model):
 
         if output.stats:
             print("Statistics:")
-            pprint.pprint(self.control.statistics)
+            if cached_answer is not None:
+                print("The answer was read from the concretization cache")
+            else:
+                pprint.pprint(self.control.statistics)
+                if result.satisfiable:
+                    print(f"Winning configuration: {winning_configuration(self.control)}")
 
         if result.unsolved_specs and setup.concretize_everything:
             unsolved_str = Result.format_unsolved(result.unsolved_specs)
@@ -832,6 +948,30 @@ def on_model(model):
 
         return result, timer, self.control.statistics
 
+    def logic_programs(self, setup: "SpackSolverSetup") -> List[str]:
+        """Return the paths of the logic programs to be loaded with the problem."""
+        parent_dir = os.path.dirname(__file__)
+        names = ["concretize.lp", "heuristic.lp"]
+        if spack.config.CONFIG.get("concretizer:duplicates:strategy", "none") != "none":
+            names.append("heuristic_separate.lp")
+        names.extend(["os_compatibility.lp", "display.lp"])
+        if not setup.concretize_everything:
+            names.append("when_possible.lp")
+        return [os.path.join(parent_dir, name) for name in names]
+
+    def cache_settings(self, setup: "SpackSolverSetup") -> List[Any]:
+        """Return what the answer of a solve depends on, besides the problem and the
+        logic programs, for the key of the concretization cache."""
+        configuration = self.control.configuration
+        solvers = [configuration.solver[idx] for idx in range(len(configuration.solver))]
+        return [
+            clingo().__version__,
+            configuration.solve.parallel_mode,
+            {key: getattr(configuration.asp, key) for key in configuration.asp.keys},
+            *({key: getattr(solver, key) for key in solver.keys} for solver in solvers),
+            setup.assumptions,
+        ]
+
 
 class ConcreteSpecsByHash(collections.abc.Mapping):
     """Mapping containing concrete specs keyed by DAG hash.
@@ -907,7 +1047,27 @@ class SpackSolverSetup:
     """Class to set up and run a Spack concretization solve."""
 
     def __init__(self, tests: bool = False):
-        # these are all initialized in setup()
+        self._init_problem()
+
+        # Caches to optimize the setup phase of the solver. They are kept across calls to
+        # setup, e.g. by solve_in_rounds, since they depend only on their keys.
+        self.package_facts_cache: Optional[spack.solver.cache.SolverCache] = None
+        self._package_facts_settings: Optional[str] = None
+        self._package_facts_stored = False
+        self._package_facts_by_key: Dict[str, "PackageFacts"] = {}
+        self._concrete_spec_clauses: Dict[str, Tuple[List[AspFunction], Tuple[Set, ...]]] = {}
+        self._version_constraint_facts: Dict[
+            Tuple[str, Any], Tuple[FrozenSet[GitOrStandardVersion], List[str]]
+        ] = {}
+
+        # whether to add installed/binary hashes to the solve
+        self.tests = tests
+
+        # If False allows for input specs that are not solved
+        self.concretize_everything = True
+
+    def _init_problem(self) -> None:
+        """Initialize the state of a single problem, which each call to setup starts anew."""
         self.gen: "ProblemInstanceBuilder" = ProblemInstanceBuilder()
         self.possible_virtuals: Set[str] = set()
 
@@ -924,6 +1084,7 @@ def __init__(self, tests: bool = False):
         self.version_constraints: Set = set()
         self.target_constraints: Set = set()
         self.default_targets: List = []
+        self.target_specs_cache = None
         self.compiler_version_constraints: Set = set()
         self.post_facts: List = []
 
@@ -933,16 +1094,6 @@ def __init__(self, tests: bool = False):
         self._trigger_cache: ConditionSpecCache = collections.defaultdict(dict)
         self._effect_cache: ConditionSpecCache = collections.defaultdict(dict)
 
-        # Caches to optimize the setup phase of the solver
-        self.target_specs_cache = None
-
-        # whether to add installed/binary hashes to the solve
-        self.tests = tests
-
-        # If False allows for input specs that are not solved
-        self.concretize_everything = True
-
-        # Set during the call to setup
         self.pkgs: Set[str] = set()
         self.explicitly_required_namespaces: Dict[str, str] = {}
 
@@ -1087,17 +1238,8 @@ def pkg_rules(self, pkg, tests):
         self.pkg_version_rules(pkg)
         self.gen.newline()
 
-        # variants
-        self.variant_rules(pkg)
-
-        # conflicts
-        self.conflict_rules(pkg)
-
-        # virtuals
-        self.package_provider_rules(pkg)
-
-        # dependencies
-        self.package_dependencies_rules(pkg)
+        # variants, conflicts, virtuals and dependencies
+        self.emit_package_facts(self.package_facts(pkg))
 
         # virtual preferences
         self.virtual_preferences(
@@ -1111,6 +1253,180 @@ def pkg_rules(self, pkg, tests):
         self.trigger_rules()
         self.effect_rules()
 
+    def package_facts(self, pkg) -> "PackageFacts":
+        """Return the facts from the variants, conflicts, provided virtuals and dependencies
+        of a package.
+
+        These facts depend only on the package.py, on the possible virtuals and on whether
+        test dependencies are considered, so they are read from the package facts cache
+        when it is enabled and has them.
+        """
+        key = self.package_facts_key(pkg)
+        # Facts of a previous call, e.g. in an earlier round of solve_in_rounds
+        facts = self._package_facts_by_key.get(key)
+        if facts is not None:
+            return facts
+
+        if self.package_facts_cache is None:
+            facts = self.generate_package_facts(pkg)
+        else:
+            data = self.package_facts_cache.fetch(key)
+            if data is not None:
+                facts = PackageFacts.from_dict(data)
+            else:
+                facts = self.generate_package_facts(pkg)
+                self.package_facts_cache.store(key, facts.to_dict())
+                self._package_facts_stored = True
+
+        self._package_facts_by_key[key] = facts
+        return facts
+
+    def generate_package_facts_in_parallel(self, pkg_names: List[str]) -> None:
+        """Generate in a pool of processes the facts of the packages that are neither in
+        memory nor in the package facts cache, and keep them for ``package_facts``.
+
+        The pool is used only if ``concretizer:package_facts_processes`` allows more than one
+        process. Conditions are numbered from zero in each package, so the problem is the same
+        as the one generated serially.
+        """
+        if _package_facts_processes(len(pkg_names)) < 2:
+            return
+
+        missing: Dict[str, str] = {}
+        for name in pkg_names:
+            key = self.package_facts_key(self.pkg_class(name))
+            if key in self._package_facts_by_key:
+                continue
+            data = None
+            if self.package_facts_cache is not None:
+                data = self.package_facts_cache.fetch(key)
+            if data is not None:
+                self._package_facts_by_key[key] = PackageFacts.from_dict(data)
+            else:
+                missing[name] = key
+
+        processes = _package_facts_processes(len(missing))
+        if processes < 2:
+            return
+
+        names = list(missing)
+        tasks = [
+            (
+                names[i :: 4 * processes],
+                self.tests,
+                self.possible_virtuals,
+                self.explicitly_required_namespaces,
+            )
+            for i in range(4 * processes)
+        ]
+        try:
+            for result in spack.util.parallel.imap_unordered(
+                _generate_package_facts_task, tasks, processes=processes, debug=tty.is_debug()
+            ):
+                for name, data in result:
+                    self._package_facts_by_key[missing[name]] = PackageFacts.from_dict(data)
+                    if self.package_facts_cache is not None:
+                        self.package_facts_cache.store(missing[name], data)
+                        self._package_facts_stored = True
+        except RuntimeError as e:
+            # The facts left are generated serially, which raises the original error
+            tty.debug(f"cannot generate the facts of packages in parallel: {e}")
+
+    def generate_package_facts(self, pkg) -> "PackageFacts":
+        """Generate the facts from the directives of a package, numbering the conditions
+        from zero, and recording what they add to the constraints of the setup."""
+        saved = (
+            self.gen,
+            self._id_counter,
+            self._trigger_cache,
+            self._effect_cache,
+            self.version_constraints,
+            self.target_constraints,
+            self.compiler_version_constraints,
+            self.variant_values_from_specs,
+        )
+        self.gen = RelocatableBlockBuilder()
+        self._id_counter = map(_RelativeId, itertools.count())
+        self._trigger_cache = collections.defaultdict(dict)
+        self._effect_cache = collections.defaultdict(dict)
+        self.version_constraints, self.target_constraints = set(), set()
+        self.compiler_version_constraints, self.variant_values_from_specs = set(), set()
+        try:
+            self.variant_rules(pkg)
+            self.conflict_rules(pkg)
+            self.package_provider_rules(pkg)
+            self.package_dependencies_rules(pkg)
+            self.trigger_rules()
+            self.effect_rules()
+            return PackageFacts(
+                template=self.gen.template(),
+                ids=int(next(self._id_counter)),
+                version_constraints=self.version_constraints,
+                target_constraints=self.target_constraints,
+                compiler_version_constraints=self.compiler_version_constraints,
+                variant_values_from_specs=self.variant_values_from_specs,
+            )
+        finally:
+            (
+                self.gen,
+                self._id_counter,
+                self._trigger_cache,
+                self._effect_cache,
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+                self.variant_values_from_specs,
+            ) = saved
+
+    def emit_package_facts(self, facts: "PackageFacts") -> None:
+        """Add the facts of a package to the problem, numbering their conditions after the
+        ones emitted so far."""
+        first_id = next(self._id_counter)
+        self._id_counter = itertools.count(first_id + facts.ids)
+        self.gen.append(facts.text(first_id))
+        self.version_constraints.update(facts.version_constraints)
+        self.target_constraints.update(facts.target_constraints)
+        self.compiler_version_constraints.update(facts.compiler_version_constraints)
+        self.variant_values_from_specs.update(facts.variant_values_from_specs)
+
+    def package_facts_key(self, pkg) -> str:
+        """Return the key of the facts of a package in the package facts cache."""
+        if self._package_facts_settings is None:
+            # The facts depend on the code generating them, on the host, and on which
+            # names are virtual, e.g. to emit ``node`` or ``virtual_node`` for a dependency
+            modules = [__name__, "spack.directives", "spack.spec", "spack.variant"]
+            self._package_facts_settings = spack.solver.cache.digest(
+                spack.spack_version,
+                spack.platforms.host(),
+                archspec.__version__,
+                *(_module_digest(name) for name in modules),
+                sorted(spack.repo.PATH.provider_index.providers),
+            )
+
+        # Modules of the package and of its base classes, and other packages it uses
+        modules = {cls.__module__ for cls in pkg.__mro__}
+        for value in vars(sys.modules[pkg.__module__]).values():
+            name = getattr(
+                value, "__name__" if isinstance(value, types.ModuleType) else "__module__", None
+            )
+            if isinstance(name, str) and name.startswith(spack.repo.ROOT_PYTHON_NAMESPACE):
+                modules.add(name)
+
+        # Modules of the packages named in directives, since their variants validate the facts
+        for name in _directive_package_names(pkg):
+            if spack.repo.PATH.exists(name) and not spack.repo.PATH.is_virtual(name):
+                modules.update(cls.__module__ for cls in self.pkg_class(name).__mro__)
+
+        with_tests = bool(self.tests) and (isinstance(self.tests, bool) or pkg.name in self.tests)
+        virtuals = sorted(v for v in pkg.provided_virtual_names() if v in self.possible_virtuals)
+        return spack.solver.cache.digest(
+            self._package_facts_settings,
+            pkg.name,
+            *(_module_digest(name) for name in sorted(modules)),
+            with_tests,
+            virtuals,
+        )
+
     def trigger_rules(self):
         """Flushes all the trigger rules collected so far, and clears the cache."""
         self.gen.h2("Trigger conditions")
@@ -1177,7 +1493,7 @@ def variant_rules(self, pkg):
                 union = set()
                 # Encode the disjoint sets in the logic program
                 for sid, s in enumerate(values.sets):
-                    for value in s:
+                    for value in sorted(s):
                         self.gen.fact(
                             fn.pkg_fact(
                                 pkg.name, fn.variant_value_from_disjoint_sets(name, value, sid)
@@ -1326,7 +1642,7 @@ def package_provider_rules(self, pkg):
             self.gen.fact(fn.pkg_fact(pkg.name, fn.possible_provider(vpkg_name)))
 
         for when, provided in pkg.provided.items():
-            for vpkg in provided:
+            for vpkg in sorted(provided):
                 if vpkg.name not in self.possible_virtuals:
                     continue
 
@@ -1342,7 +1658,7 @@ def package_provider_rules(self, pkg):
                 when, name=pkg.name, msg="Virtuals are provided together"
             )
             for set_id, virtuals_together in enumerate(sets_of_virtuals):
-                for name in virtuals_together:
+                for name in sorted(virtuals_together):
                     self.gen.fact(
                         fn.pkg_fact(pkg.name, fn.provided_together(condition_id, set_id, name))
                     )
@@ -1350,7 +1666,9 @@ def package_provider_rules(self, pkg):
 
     def package_dependencies_rules(self, pkg):
         """Translate 'depends_on' directives into ASP logic."""
-        for cond, deps_by_name in sorted(pkg.dependencies.items()):
+        # Specs with dependencies compare by hash, so sort the conditions by their string
+        # to emit the same program in every process
+        for cond, deps_by_name in sorted(pkg.dependencies.items(), key=lambda x: str(x[0])):
             for _, dep in sorted(deps_by_name.items()):
                 depflag = dep.depflag
                 # Skip test dependencies if they're not requested
@@ -2128,11 +2446,19 @@ def generate_possible_compilers(self, specs):
     def define_version_constraints(self):
         """Define what version_satisfies(...) means in ASP logic."""
         for pkg_name, versions in sorted(self.version_constraints):
-            # generate facts for each package constraint and the version
-            # that satisfies it
-            for v in sorted(v for v in self.possible_versions[pkg_name] if v.satisfies(versions)):
-                self.gen.fact(fn.pkg_fact(pkg_name, fn.version_satisfies(versions, v)))
-
+            # generate facts for each package constraint and the version that satisfies it.
+            # They are kept for later calls to setup, e.g. by solve_in_rounds, and generated
+            # again only if the possible versions changed.
+            possible_versions = frozenset(self.possible_versions[pkg_name])
+            cached = self._version_constraint_facts.get((pkg_name, versions))
+            if cached is None or cached[0] != possible_versions:
+                builder = ProblemInstanceBuilder()
+                for v in sorted(v for v in possible_versions if v.satisfies(versions)):
+                    builder.fact(fn.pkg_fact(pkg_name, fn.version_satisfies(versions, v)))
+                cached = (possible_versions, builder.asp_problem)
+                self._version_constraint_facts[(pkg_name, versions)] = cached
+
+            self.gen.asp_problem.extend(cached[1])
             self.gen.newline()
 
     def collect_virtual_constraints(self):
@@ -2220,7 +2546,9 @@ def define_variant_values(self):
         # Tell the concretizer about possible values from specs we saw in
         # spec_clauses(). We might want to order these facts by pkg and name
         # if we are debugging.
-        for pkg, variant, value in self.variant_values_from_specs:
+        for pkg, variant, value in sorted(
+            self.variant_values_from_specs, key=lambda x: (x[0], x[1], str(x[2]))
+        ):
             self.gen.fact(fn.pkg_fact(pkg, fn.variant_possible_value(variant, value)))
 
     def register_concrete_spec(self, spec, possible):
@@ -2243,8 +2571,15 @@ def concrete_specs(self):
         for h, spec in self.reusable_and_possible.items():
             # this indicates that there is a spec like this installed
             self.gen.fact(fn.installed_hash(spec.name, h))
-            # this describes what constraints it imposes on the solve
-            self.impose(h, spec, body=True)
+            # this describes what constraints it imposes on the solve. The same setup can be
+            # used more than once, e.g. by solve_in_rounds, so only new specs are translated
+            if h not in self._concrete_spec_clauses:
+                self._concrete_spec_clauses[h] = self.reusable_spec_clauses(spec)
+            clauses, constraints = self._concrete_spec_clauses[h]
+            for pred in clauses:
+                self.gen.fact(fn.imposed_constraint(h, *pred.args))
+            for current, added in zip(self._constraints(), constraints):
+                current.update(added)
             self.gen.newline()
             # Declare as possible parts of specs that are not in package.py
             # - Add versions to possible versions
@@ -2256,6 +2591,34 @@ def concrete_specs(self):
                 )
                 self.possible_oses.add(dep.os)
 
+    def reusable_spec_clauses(self, spec) -> Tuple[List[AspFunction], Tuple[Set, ...]]:
+        """Return the clauses imposed by a reusable spec, and what they add to the
+        constraints of the setup, in the order of ``_constraints()``."""
+        saved = self._constraints()
+        (
+            self.version_constraints,
+            self.target_constraints,
+            self.compiler_version_constraints,
+            self.variant_values_from_specs,
+        ) = (set(), set(), set(), set())
+        try:
+            return self.spec_clauses(spec, body=True), self._constraints()
+        finally:
+            (
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+                self.variant_values_from_specs,
+            ) = saved
+
+    def _constraints(self) -> Tuple[Set, ...]:
+        return (
+            self.version_constraints,
+            self.target_constraints,
+            self.compiler_version_constraints,
+            self.variant_values_from_specs,
+        )
+
     def define_concrete_input_specs(self, specs, possible):
         # any concrete specs in the input spec list
         for input_spec in specs:
@@ -2282,6 +2645,9 @@ def setup(
             allow_deprecated: if True adds deprecated versions into the solve
         """
         check_packages_exist(specs)
+        # A setup can be used more than once, e.g. by solve_in_rounds, and must generate
+        # the same program as a new one
+        self._init_problem()
 
         node_counter = _create_counter(specs, tests=self.tests)
         self.possible_virtuals = node_counter.possible_virtuals()
@@ -2302,7 +2668,8 @@ def setup(
             if node.namespace is not None:
                 self.explicitly_required_namespaces[node.name] = node.namespace
 
-        self.gen = ProblemInstanceBuilder()
+        self.package_facts_cache = spack.solver.cache.package_facts_cache()
+        self._package_facts_stored = False
 
         if not allow_deprecated:
             self.gen.fact(fn.deprecated_versions_not_allowed())
@@ -2373,12 +2740,16 @@ def setup(
         )
 
         self.gen.h1("Package Constraints")
+        self.generate_package_facts_in_parallel(sorted(self.pkgs))
         for pkg in sorted(self.pkgs):
             self.gen.h2("Package rules: %s" % pkg)
             self.pkg_rules(pkg, tests=self.tests)
             self.gen.h2("Package preferences: %s" % pkg)
             self.preferred_variants(pkg)
 
+        if self.package_facts_cache is not None and self._package_facts_stored:
+            self.package_facts_cache.cleanup()
+
         self.gen.h1("Develop specs")
         # Inject dev_path from environment
         for ds in dev_specs:
@@ -2413,21 +2784,11 @@ def setup(
 
     def internal_errors(self):
         parent_dir = os.path.dirname(__file__)
-
-        def visit(node):
-            if ast_type(node) == clingo().ast.ASTType.Rule:
-                for term in node.body:
-                    if ast_type(term) == clingo().ast.ASTType.Literal:
-                        if ast_type(term.atom) == clingo().ast.ASTType.SymbolicAtom:
-                            name = ast_sym(term.atom).name
-                            if name == "internal_error":
-                                arg = ast_sym(ast_sym(term.atom).arguments[0])
-                                symbol = AspFunction(name)(arg.string)
-                                self.assumptions.append((parse_term(str(symbol)), True))
-                                self.gen.asp_problem.append(f"{{ {symbol} }}.\n")
-
         path = os.path.join(parent_dir, "concretize.lp")
-        parse_files([path], visit)
+        for message in _internal_error_messages(path):
+            symbol = AspFunction("internal_error")(message)
+            self.assumptions.append((parse_term(str(symbol)), True))
+            self.gen.asp_problem.append(f"{{ {symbol} }}.\n")
 
     def define_runtime_constraints(self):
         """Define the constraints to be imposed on the runtimes"""
@@ -2636,6 +2997,174 @@ def value(self) -> str:
         return "".join(self.asp_problem)
 
 
+class _RelativeId(int):
+    """Id of a condition, relative to the first one in a block of facts."""
+
+
+class RelocatableBlockBuilder(ProblemInstanceBuilder):
+    """Builds a block of facts whose condition ids are relative to the first one in the
+    block, so that it can be added anywhere in a problem instance.
+
+    Facts are rendered as clingo would print them, except that relative ids are kept as
+    integers among the text, to be translated by ``PackageFacts.text()``.
+    """
+
+    def fact(self, atom: AspFunction) -> None:
+        self._render(atom)
+        self.asp_problem.append(".\n")
+
+    def _render(self, term: Any) -> None:
+        if isinstance(term, _RelativeId):
+            self.asp_problem.append(int(term))
+        elif isinstance(term, AspFunction):
+            self.asp_problem.append(term.name)
+            if term.args:
+                self.asp_problem.append("(")
+                for i, arg in enumerate(term.args):
+                    if i:
+                        self.asp_problem.append(",")
+                    self._render(arg)
+                self.asp_problem.append(")")
+        elif isinstance(term, int) and not isinstance(term, bool):
+            self.asp_problem.append(str(term))
+        else:
+            self.asp_problem.append(str(clingo().String(str(term))))
+
+    def template(self) -> List[Union[str, int]]:
+        """Return the facts as a list of text, and of relative ids."""
+        result: List[Union[str, int]] = []
+        text: List[str] = []
+        for chunk in self.asp_problem:
+            if isinstance(chunk, str):
+                text.append(chunk)
+            else:
+                result.extend(("".join(text), chunk))
+                text = []
+        result.append("".join(text))
+        return result
+
+
+class PackageFacts(NamedTuple):
+    """Facts generated from the directives of a package, and the constraints they add to
+    the setup, which are emitted after all the packages."""
+
+    #: Text of the facts, with the ids of conditions relative to the first one
+    template: List[Union[str, int]]
+    #: Number of condition ids used by the facts
+    ids: int
+    version_constraints: Set[Tuple[str, vn.VersionList]]
+    target_constraints: Set[spack.target.Target]
+    compiler_version_constraints: Set[spack.spec.CompilerSpec]
+    variant_values_from_specs: Set[Tuple[str, str, Any]]
+
+    def text(self, first_id: int) -> str:
+        """Return the facts, numbering conditions from ``first_id``."""
+        return "".join(x if isinstance(x, str) else str(x + first_id) for x in self.template)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "template": self.template,
+            "ids": self.ids,
+            "version_constraints": sorted([n, str(v)] for n, v in self.version_constraints),
+            "target_constraints": sorted(str(t) for t in self.target_constraints),
+            "compiler_version_constraints": sorted(
+                str(c) for c in self.compiler_version_constraints
+            ),
+            "variant_values_from_specs": sorted(
+                (list(x) for x in self.variant_values_from_specs), key=str
+            ),
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "PackageFacts":
+        return PackageFacts(
+            template=data["template"],
+            ids=data["ids"],
+            version_constraints={(n, vn.VersionList(v)) for n, v in data["version_constraints"]},
+            target_constraints={spack.target.Target(t) for t in data["target_constraints"]},
+            compiler_version_constraints={
+                spack.spec.CompilerSpec(c) for c in data["compiler_version_constraints"]
+            },
+            variant_values_from_specs={tuple(x) for x in data["variant_values_from_specs"]},
+        )
+
+
+#: Minimum number of packages whose facts are generated by each process of the pool
+PACKAGES_PER_PROCESS = 32
+
+
+def _package_facts_processes(npackages: int) -> int:
+    """Return how many processes generate the facts of ``npackages`` packages."""
+    processes = spack.config.get("concretizer:package_facts_processes", 1)
+    if (
+        processes <= 1
+        or multiprocessing.get_start_method() != "fork"
+        or multiprocessing.current_process().daemon
+    ):
+        # Workers must inherit the repositories and configuration of this process, and
+        # daemonic processes cannot have children
+        return 1
+    return min(processes, npackages // PACKAGES_PER_PROCESS)
+
+
+def _generate_package_facts_task(packed_arguments) -> List[Tuple[str, Dict[str, Any]]]:
+    """Generate the facts of some packages in a worker of the pool."""
+    pkg_names, tests, possible_virtuals, explicitly_required_namespaces = packed_arguments
+    setup = SpackSolverSetup(tests=tests)
+    setup.possible_virtuals = possible_virtuals
+    setup.explicitly_required_namespaces = explicitly_required_namespaces
+    return [
+        (name, setup.generate_package_facts(setup.pkg_class(name)).to_dict()) for name in pkg_names
+    ]
+
+
+@llnl.util.lang.memoized
+def _directive_package_names(pkg: Type["spack.package_base.PackageBase"]) -> Tuple[str, ...]:
+    """Return the names of other packages in the specs of the directives of a package, e.g.
+    of its dependencies, or of the packages in the conditions of its conflicts."""
+    specs = list(pkg.provided) + list(pkg.provided_together)
+    for when, deps_by_name in pkg.dependencies.items():
+        specs.append(when)
+        specs.extend(dep.spec for dep in deps_by_name.values())
+    for when, conflict_specs in pkg.conflicts.items():
+        specs.append(when)
+        specs.extend(spack.spec.Spec(conflict_spec) for conflict_spec, _ in conflict_specs)
+    for _, when in pkg.variants.values():
+        specs.extend(when)
+    names = {node.name for spec in specs for node in spec.traverse() if node.name}
+    names.discard(pkg.name)
+    return tuple(sorted(names))
+
+
+@llnl.util.lang.memoized
+def _module_digest(name: str) -> str:
+    """Return a digest of the source of a module, or of its name if it has no file."""
+    path = getattr(sys.modules.get(name), "__file__", None)
+    if not path:
+        return name
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@llnl.util.lang.memoized
+def _internal_error_messages(path: str) -> Tuple[str, ...]:
+    """Return the messages of the internal errors in the rules of a logic program."""
+    messages = []
+
+    def visit(node):
+        if ast_type(node) == clingo().ast.ASTType.Rule:
+            for term in node.body:
+                if ast_type(term) == clingo().ast.ASTType.Literal:
+                    if ast_type(term.atom) == clingo().ast.ASTType.SymbolicAtom:
+                        name = ast_sym(term.atom).name
+                        if name == "internal_error":
+                            arg = ast_sym(ast_sym(term.atom).arguments[0])
+                            messages.append(arg.string)
+
+    parse_files([path], visit)
+    return tuple(messages)
+
+
 class RequirementParser:
     """Parses requirements from package.py files and configuration, and returns rules."""
 
@@ -3458,6 +3987,8 @@ def solve_in_rounds(
         specs = [s.lookup_hash() for s in specs]
         reusable_specs = self._check_input_and_extract_concrete_specs(specs)
         reusable_specs.extend(self._reusable_specs(specs))
+        # The same setup is used in all rounds, so that facts computed in a round are reused
+        # in the next ones, and only specs that become reusable are translated anew
         setup = SpackSolverSetup(tests=tests)
 
         # Tell clingo that we don't have to solve all the inputs at once
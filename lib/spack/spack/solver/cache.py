@@ -0,0 +1,185 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""On disk caches of the solver, stored under the ``misc_cache``."""
+import hashlib
+import os
+import tempfile
+from typing import Any, Iterable, List, Optional, Tuple
+
+from llnl.util import tty
+from llnl.util.filesystem import mkdirp
+
+import spack.caches
+import spack.config
+import spack.util.spack_json as sjson
+
+
+def _write_atomically(path: str, data: Any) -> None:
+    """Write data as JSON to path, so that readers never see a partial file."""
+    mkdirp(os.path.dirname(path))
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            sjson.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def digest(*parts: Any) -> str:
+    """Return a digest of the string representation of the parts."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(str(part).encode())
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class SolverCache:
+    """Cache of JSON data computed by the solver, keyed by a digest of all its input.
+
+    Each entry is a JSON file, whose modification time is updated on every hit. When there
+    are more than ``entry_limit`` entries, or they take more than ``size_limit`` bytes, the
+    least recently used entries are removed by ``cleanup()``.
+    """
+
+    def __init__(self, root: str, entry_limit: int = 1000, size_limit: int = 300 * 2**20):
+        self.root = root
+        self.entry_limit = entry_limit
+        self.size_limit = size_limit
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def fetch(self, key: str) -> Optional[Any]:
+        """Return the data stored under a key, or None if there is none."""
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                data = sjson.load(f)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                tty.debug(f"cannot read the solver cache entry {path}: {e}")
+            return None
+        return data
+
+    def store(self, key: str, data: Any) -> None:
+        """Store data under a key. Call ``cleanup()`` once done storing, to evict entries
+        if the cache is full."""
+        try:
+            _write_atomically(self._path(key), data)
+        except OSError as e:
+            tty.debug(f"cannot write to the solver cache in {self.root}: {e}")
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """Return the last access time, the size and the path of all the entries."""
+        result = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                result.append((stat.st_mtime, stat.st_size, path))
+        return result
+
+    def cleanup(self) -> None:
+        """Remove the least recently used entries, until the cache is within its limits."""
+        entries = sorted(self.entries(), reverse=True)
+        total = 0
+        for count, (_, size, path) in enumerate(entries, start=1):
+            total += size
+            if count > self.entry_limit or total > self.size_limit:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def destroy(self) -> None:
+        """Remove all the entries."""
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ConcretizationCache(SolverCache):
+    """Cache of the answers of the solver.
+
+    The key is computed from the text of the problem generated by the setup, the logic
+    programs loaded next to it, the version of clingo and the settings of the control
+    object, so that a hit gives the same answer the solver would.
+    """
+
+    @staticmethod
+    def key(problem: str, programs: Iterable[str], settings: Iterable[Any]) -> str:
+        """Return the key of a solve.
+
+        Args:
+            problem: the ASP problem generated by the setup
+            programs: paths of the logic programs loaded with the problem
+            settings: anything else the answer depends on, e.g. the clingo version,
+                and the solver configuration
+        """
+        hasher = hashlib.sha256()
+        for setting in settings:
+            hasher.update(str(setting).encode())
+            hasher.update(b"\0")
+        for path in programs:
+            hasher.update(os.path.basename(path).encode())
+            with open(path, "rb") as f:
+                hasher.update(f.read())
+        hasher.update(problem.encode())
+        return hasher.hexdigest()
+
+
+def concretization_cache_location() -> str:
+    """The concretization cache is a directory of the ``misc_cache``."""
+    return os.path.join(spack.caches.misc_cache_location(), "concretization")
+
+
+def package_facts_cache_location() -> str:
+    """The package facts cache is a directory of the ``misc_cache``."""
+    return os.path.join(spack.caches.misc_cache_location(), "package_facts")
+
+
+def _configured_cache(cls, section: str, location: str, entry_limit: int, size_limit: int):
+    config = spack.config.get(f"concretizer:{section}", {})
+    if not config.get("enable", False):
+        return None
+    return cls(
+        location,
+        entry_limit=config.get("entry_limit", entry_limit),
+        size_limit=int(config.get("size_limit", size_limit) * 2**20),
+    )
+
+
+def concretization_cache() -> Optional[ConcretizationCache]:
+    """Return the concretization cache, as configured, or None if it is disabled."""
+    return _configured_cache(
+        ConcretizationCache,
+        "concretization_cache",
+        concretization_cache_location(),
+        entry_limit=1000,
+        size_limit=300,
+    )
+
+
+def package_facts_cache() -> Optional[SolverCache]:
+    """Return the cache of the facts generated from each package, as configured, or None
+    if it is disabled."""
+    return _configured_cache(
+        SolverCache,
+        "package_facts_cache",
+        package_facts_cache_location(),
+        entry_limit=20000,
+        size_limit=500,
+    )
@@ -53,13 +53,15 @@
 import enum
 import io
 import itertools
+import json
 import os
 import pathlib
 import platform
 import re
 import socket
+import sys
 import warnings
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import llnl.path
 import llnl.string
@@ -848,7 +850,7 @@ def constrain(self, other):
 
         Return whether the spec changed.
         """
-        if other.spec and other.spec._concrete:
+        if other._of_concrete_spec():
             for k in self:
                 if k not in other:
                     raise UnsatisfiableCompilerFlagSpecError(self[k], "<absent>")
@@ -872,14 +874,18 @@ def constrain(self, other):
                         )
         return changed
 
+    def _of_concrete_spec(self) -> bool:
+        """Whether these are the compiler flags of a concrete spec."""
+        return self.spec is not None and self.spec._concrete
+
     @staticmethod
     def valid_compiler_flags():
         return _valid_compiler_flags
 
     def copy(self):
         clone = FlagMap(self.spec)
-        for name, compiler_flag in self.items():
-            clone[name] = compiler_flag
+        for name, compiler_flags in self.items():
+            clone[name] = list(compiler_flags)
         return clone
 
     def add_flag(self, flag_type, value, propagation):
@@ -946,6 +952,43 @@ def _sort_by_dep_types(dspec: DependencySpec):
     return dspec.depflag
 
 
+#: Encodes a string to JSON, as ``json.dumps`` does
+_json_string = json.encoder.encode_basestring_ascii  # type: ignore[attr-defined]
+
+
+def _json_value(value: Any) -> str:
+    """Return the JSON text of a value, as ``spack.util.spack_json.dump`` writes it."""
+    if isinstance(value, str):
+        return _json_string(value)
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return "[]"
+        try:
+            # Lists in specs are mostly lists of strings
+            return "[" + ",".join(map(_json_string, value)) + "]"
+        except TypeError:
+            return "[" + ",".join(_json_value(x) for x in value) + "]"
+    return sjson.dump(value)
+
+
+#: JSON text of the dependency types of each dependency flag
+_DEPTYPES_JSON = {flag: _json_value(dt.flag_to_tuple(flag)) for flag in range(dt.ALL + 1)}
+
+
+#: JSON text of targets, by the id of their microarchitecture, which is kept alive here
+_TARGETS_JSON: Dict[int, Tuple[Any, str]] = {}
+
+
+def _target_json(target: spack.target.Target) -> str:
+    """Return the JSON text of a target, which is the same for all the nodes that share
+    its microarchitecture."""
+    uarch = target.microarchitecture
+    cached = _TARGETS_JSON.get(id(uarch))
+    if cached is None or cached[0] is not uarch:
+        cached = _TARGETS_JSON[id(uarch)] = (uarch, _json_value(target.to_dict_or_value()))
+    return cached[1]
+
+
 #: Enum for edge directions
 EdgeDirection = lang.enum(parent=0, child=1)
 
@@ -976,12 +1019,21 @@ def __init__(self, store_by=EdgeDirection.child):
     def __getitem__(self, key):
         return self.edges[key]
 
+    def __contains__(self, key):
+        return key in self.edges
+
     def __iter__(self):
         return iter(self.edges)
 
     def __len__(self):
         return len(self.edges)
 
+    def values(self):
+        return self.edges.values()
+
+    def items(self):
+        return self.edges.items()
+
     def add(self, edge: DependencySpec):
         key = edge.spec.name if self.store_by_child else edge.parent.name
         if key in self.edges:
@@ -1031,8 +1083,12 @@ def select(self, parent=None, child=None, depflag: dt.DepFlag = dt.ALL):
         if not depflag:
             return []
 
-        # Start from all the edges we store
-        selected = (d for d in itertools.chain.from_iterable(self.values()))
+        # Start from all the edges we store, or from the ones stored under the name
+        key = child if self.store_by_child else parent
+        if key:
+            selected = iter(self.edges.get(key, ()))
+        else:
+            selected = itertools.chain.from_iterable(self.edges.values())
 
         # Filter by parent name
         if parent:
@@ -1306,6 +1362,9 @@ class Spec:
     #: Cache for spec's prefix, computed lazily in the corresponding property
     _prefix = None
     abstract_hash = None
+    #: Called the first time the dependents of this spec are read, to add the edges from
+    #: the dependents not built yet, e.g. for the specs built lazily by a database
+    _complete_dependents: Optional[Callable[[], None]] = None
 
     @staticmethod
     def default_arch():
@@ -1341,9 +1400,18 @@ def __init__(
             self._dup(spec_like)
             return
 
+        # Spec strings are parsed once, and their specs copied
+        if isinstance(spec_like, str) and not (
+            normal or concrete or external_path or external_modules
+        ):
+            parsed = spack.parser.parse_one_cached(spec_like)
+            if parsed is not None:
+                self._dup(parsed)
+                return
+
         # init an empty spec that matches anything.
         self.name = None
-        self.versions = vn.VersionList(":")
+        self.versions = vn.any_version.copy()
         self.variants = vt.VariantMap(self)
         self.architecture = None
         self.compiler = None
@@ -1469,6 +1537,9 @@ def edges_from_dependents(self, name=None, depflag: dt.DepFlag = dt.ALL):
             name (str): filter dependents by package name
             depflag: allowed dependency types
         """
+        if self._complete_dependents is not None:
+            complete = self.__dict__.pop("_complete_dependents")
+            complete()
         return [d for d in self._dependents.select(parent=name, depflag=depflag)]
 
     def edges_to_dependencies(self, name=None, depflag: dt.DepFlag = dt.ALL):
@@ -1636,10 +1707,17 @@ def _set_compiler(self, compiler):
 
     def _add_dependency(self, spec: "Spec", *, depflag: dt.DepFlag, virtuals: Tuple[str, ...]):
         """Called by the parser to add another spec as a dependency."""
-        if spec.name not in self._dependencies or not spec.name:
+        if not spec.name:
             self.add_dependency_edge(spec, depflag=depflag, virtuals=virtuals)
             return
 
+        if spec.name not in self._dependencies:
+            # No edge to update, so skip looking for one among all the existing edges
+            edge = DependencySpec(self, spec, depflag=depflag, virtuals=virtuals)
+            self._dependencies.add(edge)
+            spec._dependents.add(edge)
+            return
+
         # Keep the intersection of constraints when a dependency is added multiple times.
         # The only restriction, currently, is keeping the same dependency type
         orig = self._dependencies[spec.name]
@@ -1862,8 +1940,7 @@ def spec_hash(self, hash):
         # this when we move to using package hashing on all specs.
         if hash.override is not None:
             return hash.override(self)
-        node_dict = self.to_node_dict(hash=hash)
-        json_text = sjson.dump(node_dict)
+        json_text = self._node_json(hash)
         # This implements "frankenhashes", preserving the last 7 characters of the
         # original hash when splicing so that we can avoid relocation issues
         out = spack.util.hash.b32_hash(json_text)
@@ -1871,6 +1948,123 @@ def spec_hash(self, hash):
             return out[:-7] + self.build_spec.spec_hash(hash)[-7:]
         return out
 
+    def _node_json(self, hash) -> str:
+        """Return the JSON text of the node dict of this spec, which is hashed to compute
+        its hashes.
+
+        The text is exactly ``sjson.dump(self.to_node_dict(hash=hash))``, but it is written
+        directly from the attributes of the spec, and from the cached hashes of its
+        dependencies, without building the node dict. Any change to ``to_node_dict`` must
+        be reflected here, or the hashes will change.
+
+        Arguments:
+            hash (spack.hash_types.SpecHashDescriptor): type of hash to generate.
+        """
+        out = ['{"name":', _json_value(self.name)]
+
+        if self.versions:
+            if self.versions.concrete:
+                out += (',"version":', _json_string(str(self.versions[0])))
+            else:
+                out += (',"versions":', _json_value([str(v) for v in self.versions]))
+
+        if self.architecture:
+            arch = self.architecture
+            out += (
+                ',"arch":{"platform":',
+                _json_value(arch.platform),
+                ',"platform_os":',
+                _json_value(arch.os),
+                ',"target":',
+                _target_json(arch.target),
+                "}",
+            )
+
+        if self.compiler:
+            versions = self.compiler.versions
+            out += (',"compiler":{"name":', _json_value(self.compiler.name))
+            if versions.concrete:
+                out += (',"version":', _json_string(str(versions[0])), "}")
+            else:
+                out += (',"versions":', _json_value([str(v) for v in versions]), "}")
+
+        if self.namespace:
+            out += (',"namespace":', _json_value(self.namespace))
+
+        params = sorted(v.yaml_entry() for _, v in self.variants.items())
+        params += sorted(
+            self.compiler_flags.yaml_entry(flag_type) for flag_type in self.compiler_flags.keys()
+        )
+        if params:
+            out.append(',"parameters":{')
+            out.append(",".join(_json_string(k) + ":" + _json_value(v) for k, v in params))
+            out.append("}")
+
+        if self.external:
+            out += (
+                ',"external":{"path":',
+                _json_value(self.external_path),
+                ',"module":',
+                _json_value(self.external_modules),
+                ',"extra_attributes":',
+                _json_value(self.extra_attributes),
+                "}",
+            )
+
+        if not self._concrete:
+            out.append(',"concrete":false')
+
+        if "patches" in self.variants:
+            variant = self.variants["patches"]
+            if hasattr(variant, "_patches_in_order_of_appearance"):
+                out += (',"patches":', _json_value(variant._patches_in_order_of_appearance))
+
+        if (
+            self._concrete
+            and hash.package_hash
+            and hasattr(self, "_package_hash")
+            and self._package_hash
+        ):
+            package_hash = self._package_hash
+            if not isinstance(package_hash, str) and isinstance(package_hash, bytes):
+                package_hash = package_hash.decode("utf-8")
+            out += (',"package_hash":', _json_value(package_hash))
+
+        edges = sorted(
+            self._dependencies.select(depflag=hash.depflag),
+            key=lambda x: (x.spec.name, _sort_by_dep_types(x)),
+        )
+        if edges:
+            hash_key = ',"' + hash.name + '":'
+            out.append(',"dependencies":[')
+            out.append(
+                ",".join(
+                    '{"name":'
+                    + _json_string(edge.spec.name)
+                    + hash_key
+                    + _json_string(edge.spec._cached_hash(hash))
+                    + ',"parameters":{"deptypes":'
+                    + _DEPTYPES_JSON[edge.depflag]
+                    + ',"virtuals":'
+                    + _json_value(edge.virtuals)
+                    + "}}"
+                    for edge in edges
+                )
+            )
+            out.append("]")
+
+        if self._build_spec:
+            out += (
+                ',"build_spec":{"name":',
+                _json_value(self.build_spec.name),
+                ',"' + hash.name + '":',
+                _json_value(self.build_spec._cached_hash(hash)),
+                "}",
+            )
+
+        out.append("}")
+        return "".join(out)
+
     def _cached_hash(self, hash, length=None, force=False):
         """Helper function for storing a cached hash on the spec.
 
@@ -2461,20 +2655,19 @@ def from_dict(data):
         Args:
             data: a nested dict/list data structure read from YAML or JSON.
         """
-        # Legacy specfile format
-        if isinstance(data["spec"], list):
-            spec = SpecfileV1.load(data)
-        elif int(data["spec"]["_meta"]["version"]) == 2:
-            spec = SpecfileV2.load(data)
-        elif int(data["spec"]["_meta"]["version"]) == 3:
-            spec = SpecfileV3.load(data)
-        else:
-            spec = SpecfileV4.load(data)
-
-        # Any git version should
-        for s in spec.traverse():
-            s.attach_git_version_lookup()
+        # All the nodes stay alive, so collections while building them would be wasted
+        with lang.disable_gc():
+            # Legacy specfile format
+            if isinstance(data["spec"], list):
+                spec = SpecfileV1.load(data)
+            elif int(data["spec"]["_meta"]["version"]) == 2:
+                spec = SpecfileV2.load(data)
+            elif int(data["spec"]["_meta"]["version"]) == 3:
+                spec = SpecfileV3.load(data)
+            else:
+                spec = SpecfileV4.load(data)
 
+        # Git versions get their lookup attached when each node is read
         return spec
 
     @staticmethod
@@ -2484,8 +2677,9 @@ def from_yaml(stream):
         Args:
             stream: string or file object to read from.
         """
-        data = syaml.load(stream)
-        return Spec.from_dict(data)
+        with lang.disable_gc():
+            data = syaml.load(stream)
+            return Spec.from_dict(data)
 
     @staticmethod
     def from_json(stream):
@@ -2495,8 +2689,9 @@ def from_json(stream):
             stream: string or file object to read from.
         """
         try:
-            data = sjson.load(stream)
-            return Spec.from_dict(data)
+            with lang.disable_gc():
+                data = sjson.load(stream)
+                return Spec.from_dict(data)
         except Exception as e:
             raise sjson.SpackJSONError("error parsing JSON spec:", str(e)) from e
 
@@ -3033,6 +3228,19 @@ def _mark_root_concrete(self, value=True):
         self._normal = value
         self._concrete = value
         self._validate_version()
+        if not value:
+            self._own_node_attributes()
+
+    def _own_node_attributes(self):
+        """Give this spec its own copies of the node attributes it shares with other specs,
+        so that they can be modified in place."""
+        if isinstance(self.architecture, _SharedArchSpec):
+            self.architecture = self.architecture.copy()
+        if isinstance(self.compiler, _SharedCompilerSpec):
+            self.compiler = self.compiler.copy()
+        for attribute in (self.versions, self.compiler_flags, self.variants):
+            if isinstance(attribute, (_SharedVersionList, _SharedFlagMap, _SharedVariantMap)):
+                attribute._detach()
 
     def _validate_version(self):
         # Specs that were concretized with just a git sha as version, without associated
@@ -3537,6 +3745,8 @@ def update_variant_validate(self, variant_name, values):
         if not isinstance(values, tuple):
             values = (values,)
 
+        # Variants shared with other specs are copied before being modified in place
+        self._own_node_attributes()
         pkg_variant, _ = self.package_class.variants[variant_name]
 
         for value in values:
@@ -3621,6 +3831,9 @@ def constrain(self, other, deps=True):
             self.namespace = other.namespace
             changed = True
 
+        # Node attributes shared among concrete specs are copied before being modified
+        self._own_node_attributes()
+
         if self.compiler is not None and other.compiler is not None:
             changed |= self.compiler.constrain(other.compiler)
         elif self.compiler is None:
@@ -3935,11 +4148,22 @@ def satisfies(self, other: Union[str, "Spec"], deps: bool = True) -> bool:
         if not self._dependencies:
             return False
 
+        return self._satisfies_dependencies(
+            other.traverse_edges(root=False, cover="edges"),
+            [SpecMatcher(rhs, deps=False) for rhs in other.traverse(root=False)],
+        )
+
+    def _satisfies_dependencies(
+        self, rhs_edges: Iterable[DependencySpec], rhs_nodes: List["SpecMatcher"]
+    ) -> bool:
+        """Return True if the dependencies of self satisfy the edges and the nodes (without
+        their dependencies) of an abstract DAG, given by its edges and by matchers for its
+        nodes other than the root."""
         # If we arrived here, then rhs is abstract. At the moment we don't care about the edge
         # structure of an abstract DAG, so we check if any edge could satisfy the properties
         # we ask for.
         lhs_edges: Dict[str, Set[DependencySpec]] = collections.defaultdict(set)
-        for rhs_edge in other.traverse_edges(root=False, cover="edges"):
+        for rhs_edge in rhs_edges:
             # If we are checking for ^mpi we need to verify if there is any edge
             if rhs_edge.spec.virtual:
                 rhs_edge.update_virtuals(virtuals=(rhs_edge.spec.name,))
@@ -3975,11 +4199,8 @@ def satisfies(self, other: Union[str, "Spec"], deps: bool = True) -> bool:
                 if not has_virtual:
                     return False
 
-        # Edges have been checked above already, hence deps=False
-        return all(
-            any(lhs.satisfies(rhs, deps=False) for lhs in self.traverse(root=False))
-            for rhs in other.traverse(root=False)
-        )
+        # Edges have been checked above already, hence the matchers ignore dependencies
+        return all(any(rhs(lhs) for lhs in self.traverse(root=False)) for rhs in rhs_nodes)
 
     def virtual_dependencies(self):
         """Return list of any virtual deps in this spec."""
@@ -4055,29 +4276,35 @@ def _dup(self, other, deps: Union[bool, dt.DepTypes, dt.DepFlag] = True, clearde
 
         self._package = None
 
-        # Local node attributes get copied first.
+        # Local node attributes get copied first. The versions, compiler flags and
+        # variants of concrete specs share their contents with their copies, until either
+        # of them is modified. The architectures and compilers read from specfiles are
+        # read-only, and are shared as a whole.
         self.name = other.name
-        self.versions = other.versions.copy()
-        self.architecture = other.architecture.copy() if other.architecture else None
-        self.compiler = other.compiler.copy() if other.compiler else None
+        if isinstance(other.architecture, _SharedArchSpec):
+            self.architecture = other.architecture
+        else:
+            self.architecture = other.architecture.copy() if other.architecture else None
+        if isinstance(other.compiler, _SharedCompilerSpec):
+            self.compiler = other.compiler
+        else:
+            self.compiler = other.compiler.copy() if other.compiler else None
         if cleardeps:
             self._dependents = _EdgeMap(store_by=EdgeDirection.parent)
             self._dependencies = _EdgeMap(store_by=EdgeDirection.child)
-        self.compiler_flags = other.compiler_flags.copy()
-        self.compiler_flags.spec = self
-        self.variants = other.variants.copy()
         self._build_spec = other._build_spec
 
-        # FIXME: we manage _patches_in_order_of_appearance specially here
-        # to keep it from leaking out of spec.py, but we should figure
-        # out how to handle it more elegantly in the Variant classes.
-        for k, v in other.variants.items():
-            patches = getattr(v, "_patches_in_order_of_appearance", None)
-            if patches:
-                self.variants[k]._patches_in_order_of_appearance = patches
-
-        self.variants.spec = self
-        self.external_path = other.external_path
+        if other._concrete:
+            self.versions = _SharedVersionList.copy_of(other.versions)
+            self.compiler_flags = _SharedFlagMap.copy_of(other.compiler_flags, self)
+            self.variants = _SharedVariantMap.copy_of(other.variants, self)
+        else:
+            self.versions = other.versions.copy()
+            self.compiler_flags = other.compiler_flags.copy()
+            self.compiler_flags.spec = self
+            self.variants = _copy_variants(other.variants)
+            self.variants.spec = self
+        self._external_path = other._external_path
         self.external_modules = other.external_modules
         self.extra_attributes = other.extra_attributes
         self.namespace = other.namespace
@@ -4111,23 +4338,42 @@ def _dup(self, other, deps: Union[bool, dt.DepTypes, dt.DepFlag] = True, clearde
         return changed
 
     def _dup_deps(self, other, depflag: dt.DepFlag):
-        def spid(spec):
-            return id(spec)
+        if not other._dependencies:
+            return
+
+        # Visit the edges in the same order as traverse_edges(cover="edges"), so that
+        # the edges of each node in the copy are in the same order as in other. The
+        # edges come from a valid DAG, so they are added without further checks.
+        new_specs = {id(other): self}
+        visited = {id(other)}
+        stack = [iter(traverse.sort_edges(other._dependencies.select()))]
+        while stack:
+            edge = next(stack[-1], None)
+            if edge is None:
+                stack.pop()
+                continue
+
+            child = edge.spec
+            if id(child) not in visited:
+                visited.add(id(child))
+                stack.append(iter(traverse.sort_edges(child._dependencies.select())))
 
-        new_specs = {spid(other): self}
-        for edge in other.traverse_edges(cover="edges", root=False):
             if edge.depflag and not depflag & edge.depflag:
                 continue
 
-            if spid(edge.parent) not in new_specs:
-                new_specs[spid(edge.parent)] = edge.parent.copy(deps=False)
+            new_parent = new_specs.get(id(edge.parent))
+            if new_parent is None:
+                new_parent = new_specs[id(edge.parent)] = edge.parent.copy(deps=False)
 
-            if spid(edge.spec) not in new_specs:
-                new_specs[spid(edge.spec)] = edge.spec.copy(deps=False)
+            new_child = new_specs.get(id(child))
+            if new_child is None:
+                new_child = new_specs[id(child)] = child.copy(deps=False)
 
-            new_specs[spid(edge.parent)].add_dependency_edge(
-                new_specs[spid(edge.spec)], depflag=edge.depflag, virtuals=edge.virtuals
+            new_edge = DependencySpec(
+                new_parent, new_child, depflag=edge.depflag, virtuals=edge.virtuals
             )
+            new_parent._dependencies.add(new_edge)
+            new_child._dependents.add(new_edge)
 
     def copy(self, deps: Union[bool, dt.DepTypes, dt.DepFlag] = True, **kwargs):
         """Make a copy of this spec.
@@ -4966,6 +5212,110 @@ def attach_git_version_lookup(self):
                 v.attach_lookup(spack.version.git_ref_lookup.GitRefLookup(self.fullname))
 
 
+class SpecMatcher:
+    """An abstract spec compiled to be checked against many specs.
+
+    Calling the matcher on a spec is equivalent to ``spec.satisfies(query, deps=deps)``,
+    but what depends only on the query is computed once, and the checks on the name,
+    hash and versions, which rule out most specs, are done first. For concrete specs,
+    it is also equivalent to ``spec.intersects(query, deps=deps)``.
+
+    Example::
+
+        matcher = SpecMatcher("mpileaks@2.3 ^mpich")
+        matching = [s for s in specs if matcher(s)]
+    """
+
+    __slots__ = (
+        "query",
+        "deps",
+        "_dag_hash",
+        "_abstract_hash",
+        "_name",
+        "_namespace",
+        "_versions",
+        "_compiler",
+        "_variants",
+        "_architecture",
+        "_compiler_flags",
+        "_edges",
+        "_nodes",
+    )
+
+    def __init__(self, query: Union[str, Spec], deps: bool = True):
+        """
+        Args:
+            query: spec, or spec string, to be satisfied
+            deps: if True check the dependencies too, if False only the root node
+        """
+        self.query = query = query if isinstance(query, Spec) else Spec(query)
+        self.deps = deps
+        self._dag_hash = query.dag_hash() if query.concrete else None
+        self._abstract_hash = query.abstract_hash
+        self._name = query.name
+        self._namespace = query.namespace
+        self._versions = None if query.versions == vn.any_version else query.versions
+        self._compiler = query.compiler
+        self._variants = query.variants or None
+        self._architecture = query.architecture
+        self._compiler_flags = query.compiler_flags or None
+
+        self._edges: List[DependencySpec] = []
+        self._nodes: List[SpecMatcher] = []
+        if deps and query._dependencies and self._dag_hash is None:
+            self._edges = list(query.traverse_edges(root=False, cover="edges"))
+            self._nodes = [SpecMatcher(rhs, deps=False) for rhs in query.traverse(root=False)]
+
+    def __call__(self, spec: Spec) -> bool:
+        """Return True if the spec satisfies the query."""
+        if self._dag_hash is not None:
+            return spec.concrete and spec.dag_hash() == self._dag_hash
+
+        if self._abstract_hash:
+            compare_hash = spec.dag_hash() if spec.concrete else spec.abstract_hash
+            if not compare_hash or not compare_hash.startswith(self._abstract_hash):
+                return False
+
+        if self._name != spec.name and self._name and spec.name:
+            # Only a virtual query can be satisfied by a spec with another name
+            if not spack.repo.PATH.is_virtual(self._name):
+                return False
+            return spec.satisfies(self.query, deps=self.deps)
+
+        if (
+            self._namespace is not None
+            and spec.namespace is not None
+            and spec.namespace != self._namespace
+        ):
+            return False
+
+        if self._versions is not None and not spec.versions.satisfies(self._versions):
+            return False
+
+        if self._compiler is not None:
+            if spec.compiler is None or not spec.compiler.satisfies(self._compiler):
+                return False
+
+        if self._variants is not None and not spec.variants.satisfies(self._variants):
+            return False
+
+        if self._architecture is not None:
+            if spec.architecture is None or not spec.architecture.satisfies(self._architecture):
+                return False
+
+        if self._compiler_flags is not None:
+            if not spec.compiler_flags.satisfies(self._compiler_flags):
+                return False
+
+        if not self._nodes:
+            return True
+
+        if not spec._dependencies:
+            return False
+
+        return spec._satisfies_dependencies(self._edges, self._nodes)
+
+
 def parse_with_version_concrete(string: str, compiler: bool = False):
     """Same as Spec(string), but interprets @x as @=x"""
     s: Union[CompilerSpec, Spec] = CompilerSpec(string) if compiler else Spec(string)
@@ -5031,6 +5381,214 @@ def reconstruct_virtuals_on_edges(spec):
             edge.update_virtuals([vspec])
 
 
+class _SharedArchSpec(ArchSpec):
+    """Architecture shared among concrete specs, which cannot be modified. Its copies
+    are regular architectures."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f"cannot modify the architecture '{self}', shared among concrete specs"
+        )
+
+    def __reduce__(self):
+        return ArchSpec, ((self.platform, self.os, self.target),)
+
+
+class _SharedCompilerSpec(CompilerSpec):
+    """Compiler shared among concrete specs, which cannot be modified. Its copies are
+    regular compilers."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"cannot modify the compiler '{self}', shared among concrete specs")
+
+    def _add_versions(self, version_list):
+        raise AttributeError(f"cannot modify the compiler '{self}', shared among concrete specs")
+
+    def constrain(self, other: CompilerSpec) -> bool:
+        raise AttributeError(f"cannot modify the compiler '{self}', shared among concrete specs")
+
+    def __reduce__(self):
+        return CompilerSpec.from_dict, (self.to_dict(),)
+
+
+def _detached(name: str):
+    """Return a method of a shared node attribute that copies what it shares with other
+    specs, and then calls the method of the regular class."""
+
+    def method(self, *args, **kwargs):
+        self._detach()
+        return getattr(self, name)(*args, **kwargs)
+
+    return method
+
+
+class _SharedVersionList(vn.VersionList):
+    """Versions of a concrete spec, whose list is shared with its copies. Either of them
+    copies the list before changing it in place, and becomes a regular version list."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def copy_of(versions: vn.VersionList) -> vn.VersionList:
+        if type(versions) is vn.VersionList:
+            _shared(versions, _SharedVersionList)
+        elif type(versions) is not _SharedVersionList:
+            return versions.copy()
+        clone = _SharedVersionList.__new__(_SharedVersionList)
+        clone.versions = versions.versions
+        return clone
+
+    def _detach(self):
+        self.versions = list(self.versions)
+        _shared(self, vn.VersionList)
+
+    add = _detached("add")
+
+
+class _SharedFlagMap(FlagMap):
+    """Compiler flags of a concrete spec, whose flags are shared with its copies. Either
+    of them copies the flags before changing them, and becomes a regular map."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def copy_of(flags: FlagMap, spec: "Spec") -> FlagMap:
+        if type(flags) is FlagMap:
+            _shared(flags, _SharedFlagMap)
+        elif type(flags) is not _SharedFlagMap:
+            clone = flags.copy()
+            clone.spec = spec
+            return clone
+        clone = _SharedFlagMap.__new__(_SharedFlagMap)
+        clone.spec = spec
+        clone.dict = flags.dict
+        return clone
+
+    def _detach(self):
+        self.dict = {name: list(flags) for name, flags in self.dict.items()}
+        _shared(self, FlagMap)
+
+    __setitem__ = _detached("__setitem__")
+    __delitem__ = _detached("__delitem__")
+    constrain = _detached("constrain")
+    add_flag = _detached("add_flag")
+
+
+class _SharedVariantMap(vt.VariantMap):
+    """Variants of a concrete spec, which are shared with its copies. Either of them
+    copies the variants before changing them, and becomes a regular map."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def copy_of(variants: vt.VariantMap, spec: "Spec") -> vt.VariantMap:
+        if type(variants) is vt.VariantMap:
+            _shared(variants, _SharedVariantMap)
+        elif type(variants) is not _SharedVariantMap:
+            clone = _copy_variants(variants)
+            clone.spec = spec
+            return clone
+        clone = _SharedVariantMap.__new__(_SharedVariantMap)
+        clone.spec = spec
+        clone.dict = variants.dict
+        return clone
+
+    def _detach(self):
+        self.dict = _copy_variants(self).dict
+        _shared(self, vt.VariantMap)
+
+    __setitem__ = _detached("__setitem__")
+    __delitem__ = _detached("__delitem__")
+    substitute = _detached("substitute")
+    constrain = _detached("constrain")
+
+
+def _copy_variants(variants: vt.VariantMap) -> vt.VariantMap:
+    """Return a copy of a variant map, with the order of the patches of its variants."""
+    clone = variants.copy()
+
+    # FIXME: we manage _patches_in_order_of_appearance specially here
+    # to keep it from leaking out of spec.py, but we should figure
+    # out how to handle it more elegantly in the Variant classes.
+    for k, v in variants.items():
+        patches = getattr(v, "_patches_in_order_of_appearance", None)
+        if patches:
+            clone[k]._patches_in_order_of_appearance = patches
+
+    return clone
+
+
+def _shared(obj, cls):
+    """Return an object turned into another class with the same slots, e.g. its shared
+    class, or back into its regular class."""
+    object.__setattr__(obj, "__class__", cls)
+    return obj
+
+
+#: Architectures of the concrete specs read from specfiles, by platform, os and target
+_CONCRETE_ARCHITECTURES: Dict[Tuple[str, str, str], _SharedArchSpec] = {}
+
+#: Compilers of the concrete specs read from specfiles, by name and versions
+_CONCRETE_COMPILERS: Dict[Tuple[str, Any, Tuple[str, ...]], _SharedCompilerSpec] = {}
+
+#: Standard versions of the concrete specs read from specfiles, by version string
+_CONCRETE_VERSIONS: Dict[Any, vn.StandardVersion] = {}
+
+
+def _intern(value):
+    """Intern a string read from a specfile, since the same names and values recur
+    in most of the nodes of a DAG."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _concrete_architecture(node) -> ArchSpec:
+    """Return the architecture of a concrete node, shared among all the concrete nodes
+    with the same one, which cannot be modified."""
+    arch = node["arch"]
+    target = arch["target"]
+    key = (
+        arch["platform"],
+        arch["platform_os"],
+        target["name"] if isinstance(target, dict) else target,
+    )
+    try:
+        return _CONCRETE_ARCHITECTURES[key]
+    except KeyError:
+        arch = _shared(ArchSpec.from_dict(node), _SharedArchSpec)
+        return _CONCRETE_ARCHITECTURES.setdefault(key, arch)
+
+
+def _concrete_compiler(node) -> CompilerSpec:
+    """Return the compiler of a concrete node, shared like its architecture."""
+    compiler = node["compiler"]
+    key = (compiler["name"], compiler.get("version"), tuple(compiler.get("versions", ())))
+    try:
+        return _CONCRETE_COMPILERS[key]
+    except KeyError:
+        compiler = _shared(CompilerSpec.from_dict(node), _SharedCompilerSpec)
+        return _CONCRETE_COMPILERS.setdefault(key, compiler)
+
+
+def _concrete_versions(node) -> vn.VersionList:
+    """Return the versions of a concrete node with a single version. Standard versions
+    are immutable, so they are parsed once and shared among the nodes; git versions
+    are not shared, since a lookup is attached to each of them."""
+    string = node["version"]
+    try:
+        version = _CONCRETE_VERSIONS[string]
+    except KeyError:
+        version = vn.Version(string)
+        if isinstance(version, vn.StandardVersion):
+            _CONCRETE_VERSIONS[string] = version
+    versions = vn.VersionList()
+    versions.versions = [version]
+    return versions
+
+
 class SpecfileReaderBase:
     @classmethod
     def from_node_dict(cls, node):
@@ -5040,18 +5598,24 @@ def from_node_dict(cls, node):
         for h in ht.hashes:
             setattr(spec, h.attr, node.get(h.name, None))
 
-        spec.name = name
-        spec.namespace = node.get("namespace", None)
+        spec.name = _intern(name)
+        spec.namespace = _intern(node.get("namespace", None))
+        concrete = node.get("concrete", True)
 
-        if "version" in node or "versions" in node:
+        if concrete and "version" in node:
+            spec.versions = _concrete_versions(node)
+            spec.attach_git_version_lookup()
+        elif "version" in node or "versions" in node:
             spec.versions = vn.VersionList.from_dict(node)
             spec.attach_git_version_lookup()
 
         if "arch" in node:
-            spec.architecture = ArchSpec.from_dict(node)
+            spec.architecture = (
+                _concrete_architecture(node) if concrete else ArchSpec.from_dict(node)
+            )
 
         if "compiler" in node:
-            spec.compiler = CompilerSpec.from_dict(node)
+            spec.compiler = _concrete_compiler(node) if concrete else CompilerSpec.from_dict(node)
         else:
             spec.compiler = None
 
@@ -5080,7 +5644,7 @@ def from_node_dict(cls, node):
                 )
 
         # specs read in are concrete unless marked abstract
-        if node.get("concrete", True):
+        if concrete:
             spec._mark_root_concrete()
 
         if "patches" in node:
@@ -5112,13 +5676,17 @@ def _load(cls, data):
         hash_type = None
         any_deps = False
 
-        # Pass 0: Determine hash type
+        # Pass 0: Determine hash type, and read the dependencies of each node once
+        node_dependencies = []
         for node in nodes:
-            for _, _, _, dhash_type, _ in cls.dependencies_from_node_dict(node):
-                any_deps = True
-                if dhash_type:
-                    hash_type = dhash_type
-                    break
+            dependencies = list(cls.dependencies_from_node_dict(node))
+            node_dependencies.append(dependencies)
+            if hash_type is None:
+                for _, _, _, dhash_type, _ in dependencies:
+                    any_deps = True
+                    if dhash_type:
+                        hash_type = dhash_type
+                        break
 
         if not any_deps:  # If we never see a dependency...
             hash_type = ht.dag_hash.name
@@ -5131,11 +5699,12 @@ def _load(cls, data):
         root_spec_hash = None
 
         # Pass 1: Create a single lookup dictionary by hash
-        for i, node in enumerate(nodes):
+        for i, (node, dependencies) in enumerate(zip(nodes, node_dependencies)):
             node_hash = node[hash_type]
             node_spec = cls.from_node_dict(node)
             hash_dict[node_hash] = node
             hash_dict[node_hash]["node_spec"] = node_spec
+            hash_dict[node_hash]["node_dependencies"] = dependencies
             if i == 0:
                 root_spec_hash = node_hash
 
@@ -5143,13 +5712,16 @@ def _load(cls, data):
             raise spack.error.SpecError("Spec dictionary contains no nodes.")
 
         # Pass 2: Finish construction of all DAG edges (including build specs)
+        depflags: Dict[Tuple[str, ...], dt.DepFlag] = {}
         for node_hash, node in hash_dict.items():
             node_spec = node["node_spec"]
-            for _, dhash, dtype, _, virtuals in cls.dependencies_from_node_dict(node):
+            for _, dhash, dtype, _, virtuals in node.pop("node_dependencies"):
+                # Only a few combinations of dependency types recur in a DAG
+                dtype = tuple(dtype)
+                if dtype not in depflags:
+                    depflags[dtype] = dt.canonicalize(dtype)
                 node_spec._add_dependency(
-                    hash_dict[dhash]["node_spec"],
-                    depflag=dt.canonicalize(dtype),
-                    virtuals=virtuals,
+                    hash_dict[dhash]["node_spec"], depflag=depflags[dtype], virtuals=virtuals
                 )
             if "build_spec" in node.keys():
                 _, bhash, _ = cls.build_spec_from_node_dict(node, hash_type=hash_type)
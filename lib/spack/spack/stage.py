@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 import concurrent.futures
+import contextlib
 import errno
 import getpass
 import glob
@@ -380,6 +381,27 @@ def __exit__(self, exc_type, exc_val, exc_tb):
         if self._lock is not None:
             self._lock.release_write()
 
+    @contextlib.contextmanager
+    def locked(self, timeout: Optional[float] = None):
+        """Context manager holding the lock of the stage, if any, without creating
+        the stage directory or destroying it on exit.
+
+        Args:
+            timeout: seconds to wait for the lock, by default the timeout of the lock
+
+        Raises:
+            llnl.util.lock.LockTimeoutError: if the lock cannot be taken in time
+        """
+        if self._lock is None:
+            yield self
+            return
+
+        self._lock.acquire_write(timeout=timeout)
+        try:
+            yield self
+        finally:
+            self._lock.release_write()
+
     @property
     def expected_archive_files(self):
         """Possible archive file paths."""
@@ -829,6 +851,10 @@ def __enter__(self):
     def __exit__(self, exc_type, exc_val, exc_tb):
         pass
 
+    @contextlib.contextmanager
+    def locked(self, timeout: Optional[float] = None):
+        yield self
+
     def fetch(self, *args, **kwargs):
         tty.debug("No need to fetch for DIY.")
 
@@ -27,10 +27,12 @@
 import llnl.util.lang
 from llnl.util import tty
 
+import spack.caches
 import spack.config
 import spack.database
 import spack.directory_layout
 import spack.error
+import spack.install_history
 import spack.paths
 import spack.spec
 import spack.util.path
@@ -144,7 +146,8 @@ class Store:
     The database is a single file that caches metadata for the entire Spack installation. It
     prevents us from having to spider the install tree to figure out what's there.
 
-    The store is also able to lock installation prefixes, and to mark installation failures.
+    The store is also able to lock installation prefixes, to mark installation failures, and
+    keeps a history of the time taken by the installs.
 
     Args:
         root: path to the root of the install tree
@@ -156,6 +159,8 @@ class Store:
             truncated to this length
         upstreams: optional list of upstream databases
         lock_cfg: lock configuration for the database
+        journal: whether changes to the database are appended to a journal, instead of
+            rewriting its whole index
     """
 
     def __init__(
@@ -166,6 +171,7 @@ def __init__(
         hash_length: Optional[int] = None,
         upstreams: Optional[List[spack.database.Database]] = None,
         lock_cfg: spack.database.LockConfiguration = spack.database.NO_LOCK,
+        journal: bool = False,
     ) -> None:
         self.root = root
         self.unpadded_root = unpadded_root or root
@@ -173,7 +179,10 @@ def __init__(
         self.hash_length = hash_length
         self.upstreams = upstreams
         self.lock_cfg = lock_cfg
-        self.db = spack.database.Database(root, upstream_dbs=upstreams, lock_cfg=lock_cfg)
+        self.journal = journal
+        self.db = spack.database.Database(
+            root, upstream_dbs=upstreams, lock_cfg=lock_cfg, journal=journal
+        )
 
         timeout_format_str = (
             f"{str(lock_cfg.package_timeout)}s" if lock_cfg.package_timeout else "No timeout"
@@ -191,9 +200,19 @@ def __init__(
             root, projections=projections, hash_length=hash_length
         )
 
-    def reindex(self) -> None:
-        """Convenience function to reindex the store DB with its own layout."""
-        return self.db.reindex(self.layout)
+        self.install_history = spack.install_history.InstallHistory(self.db.database_directory)
+
+    def reindex(
+        self,
+        jobs: Optional[int] = None,
+        incremental: bool = False,
+        progress: Optional[spack.database.ReindexProgress] = None,
+    ) -> spack.database.ReindexStats:
+        """Convenience function to reindex the store DB with its own layout.
+
+        See ``spack.database.Database.reindex`` for the arguments.
+        """
+        return self.db.reindex(self.layout, jobs=jobs, incremental=incremental, progress=progress)
 
     def __reduce__(self):
         return Store, (
@@ -203,6 +222,7 @@ def __reduce__(self):
             self.hash_length,
             self.upstreams,
             self.lock_cfg,
+            self.journal,
         )
 
 
@@ -221,7 +241,10 @@ def create(configuration: ConfigurationType) -> Store:
         install_properties["install_tree"]
         for install_properties in configuration.get("upstreams", {}).values()
     ]
-    upstreams = _construct_upstream_dbs_from_install_roots(install_roots)
+    cache = None
+    if install_roots and configuration.get("config:upstream_index_cache", True):
+        cache = spack.database.UpstreamIndexCache(spack.caches.MISC_CACHE)
+    upstreams = _construct_upstream_dbs_from_install_roots(install_roots, cache=cache)
 
     return Store(
         root=root,
@@ -230,6 +253,7 @@ def create(configuration: ConfigurationType) -> Store:
         hash_length=hash_length,
         upstreams=upstreams,
         lock_cfg=spack.database.lock_configuration(configuration),
+        journal=configuration.get("config:db_journal", False),
     )
 
 
@@ -261,7 +285,9 @@ def restore(token):
 
 
 def _construct_upstream_dbs_from_install_roots(
-    install_roots: List[str], _test: bool = False
+    install_roots: List[str],
+    _test: bool = False,
+    cache: Optional[spack.database.UpstreamIndexCache] = None,
 ) -> List[spack.database.Database]:
     accumulated_upstream_dbs: List[spack.database.Database] = []
     for install_root in reversed(install_roots):
@@ -272,9 +298,14 @@ def _construct_upstream_dbs_from_install_roots(
             upstream_dbs=upstream_dbs,
         )
         next_db._fail_when_missing_deps = _test
-        next_db._read()
         accumulated_upstream_dbs.insert(0, next_db)
 
+    if cache is not None:
+        cache.read(accumulated_upstream_dbs)
+    else:
+        for db in reversed(accumulated_upstream_dbs):
+            db._read()
+
     return accumulated_upstream_dbs
 
 
@@ -65,21 +65,28 @@ class PackageInstallContext:
     needs to be transmitted to a child process.
     """
 
-    def __init__(self, pkg):
-        if _SERIALIZE:
+    def __init__(self, pkg, *, serialize_state=_SERIALIZE):
+        """
+        Args:
+            pkg: the package being installed
+            serialize_state: whether the child process is started without a copy of the
+                memory of this one, e.g. with the 'spawn' start method
+        """
+        self.serialize_state = serialize_state
+        if serialize_state:
             self.serialized_pkg = serialize(pkg)
             self.serialized_env = serialize(spack.environment.active_environment())
         else:
             self.pkg = pkg
             self.env = spack.environment.active_environment()
         self.spack_working_dir = spack.main.spack_working_dir
-        self.test_state = TestState()
+        self.test_state = TestState(serialize_state=serialize_state)
 
     def restore(self):
         self.test_state.restore()
         spack.main.spack_working_dir = self.spack_working_dir
-        env = pickle.load(self.serialized_env) if _SERIALIZE else self.env
-        pkg = pickle.load(self.serialized_pkg) if _SERIALIZE else self.pkg
+        env = pickle.load(self.serialized_env) if self.serialize_state else self.env
+        pkg = pickle.load(self.serialized_pkg) if self.serialize_state else self.pkg
         if env:
             spack.environment.activate(env)
         return pkg
@@ -92,15 +99,16 @@ class TestState:
     but this logic is designed to behave the same inside or outside of tests.
     """
 
-    def __init__(self):
-        if _SERIALIZE:
+    def __init__(self, *, serialize_state=_SERIALIZE):
+        self.serialize_state = serialize_state
+        if serialize_state:
             self.config = spack.config.CONFIG
             self.platform = spack.platforms.host
             self.test_patches = store_patches()
             self.store = spack.store.STORE
 
     def restore(self):
-        if _SERIALIZE:
+        if self.serialize_state:
             spack.config.CONFIG = self.config
             spack.repo.PATH = spack.repo.create(self.config)
             spack.platforms.host = self.platform
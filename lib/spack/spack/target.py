@@ -33,6 +33,8 @@ def _impl(self, other):
 
 
 class Target:
+    __slots__ = ("microarchitecture", "module_name")
+
     def __init__(self, name, module_name=None):
         """Target models microarchitectures and their compatibility.
 
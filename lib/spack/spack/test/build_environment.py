@@ -2,10 +2,13 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import contextlib
 import inspect
+import multiprocessing
 import os
 import platform
 import posixpath
+import sys
 
 import pytest
 
@@ -715,3 +718,31 @@ def test_build_system_globals_only_set_on_root_during_build(default_mock_concret
     for depth, spec in root.traverse(depth=True, root=True):
         for variable in build_variables:
             assert hasattr(spec.package.module, variable) == should_be_set(depth)
+
+
+#: Set to True by tests, so it is True in forked children but not in spawned ones
+_set_by_parent = False
+
+
+def _is_forked(pkg, kwargs):
+    return _set_by_parent
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="build processes are not forked"
+)
+@pytest.mark.parametrize("busy", [False, True])
+def test_build_process_is_spawned_while_helper_threads_are_busy(
+    busy, default_mock_concretization, monkeypatch
+):
+    """Tests that build processes are spawned while helper threads are busy, since a forked
+    child would keep the locks they hold forever."""
+    monkeypatch.setattr(sys.modules[__name__], "_set_by_parent", True)
+    pkg = default_mock_concretization("trivial-install-test-package").package
+    process = spack.build_environment.BuildProcess(pkg, _is_forked, {"fake": True})
+    with contextlib.ExitStack() as stack:
+        if busy:
+            stack.enter_context(spack.build_environment.busy_helper_thread())
+        process.start()
+    assert process.complete() is not busy
+    assert spack.build_environment._busy_helper_threads == 0
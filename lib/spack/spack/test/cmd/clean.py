@@ -13,6 +13,7 @@
 import spack.cmd.clean
 import spack.main
 import spack.package_base
+import spack.solver.cache
 import spack.stage
 import spack.store
 
@@ -36,6 +37,10 @@ def __call__(self, *args, **kwargs):
     monkeypatch.setattr(spack.caches.FETCH_CACHE, "destroy", Counter("downloads"), raising=False)
     monkeypatch.setattr(spack.caches.MISC_CACHE, "destroy", Counter("caches"))
     monkeypatch.setattr(spack.store.STORE.failure_tracker, "clear_all", Counter("failures"))
+    monkeypatch.setattr(
+        spack.solver.cache.ConcretizationCache, "destroy", Counter("concretization_cache")
+    )
+    monkeypatch.setattr(spack.solver.cache.SolverCache, "destroy", Counter("package_facts_cache"))
     monkeypatch.setattr(spack.cmd.clean, "remove_python_cache", Counter("python_cache"))
 
     yield counts
@@ -54,6 +59,7 @@ def __call__(self, *args, **kwargs):
         ("-m", ["caches"]),
         ("-f", ["failures"]),
         ("-p", ["python_cache"]),
+        ("-c", ["concretization_cache", "package_facts_cache"]),
         ("-a", all_effects),
         ("", []),
     ],
@@ -64,7 +70,7 @@ def test_function_calls(command_line, effects, mock_calls_for_clean):
 
     # Assert that we called the expected functions the correct
     # number of times
-    for name in ["package"] + all_effects:
+    for name in ["package", "concretization_cache", "package_facts_cache"] + all_effects:
         assert mock_calls_for_clean[name] == (1 if name in effects else 0)
 
 
@@ -55,3 +55,43 @@ def test_reindex_with_deprecated_packages(
 
     assert spack.store.STORE.db.query(installed=any) == all_installed
     assert spack.store.STORE.db.query(installed=True) == non_deprecated
+
+
+def test_reindex_jobs(mock_packages, mock_archive, mock_fetch, install_mockery):
+    install("libelf@0.8.13")
+    install("libdwarf@20130729 ^libelf@0.8.13")
+
+    all_installed = spack.store.STORE.db.query()
+
+    os.remove(spack.store.STORE.db._index_path)
+    out = reindex("--jobs", "2")
+
+    assert spack.store.STORE.db.query() == all_installed
+    assert "Reindexed 2 install prefixes" in out
+    assert "2 spec files read, 0 reused" in out
+
+
+def test_reindex_incremental(mock_packages, mock_archive, mock_fetch, install_mockery):
+    install("libelf@0.8.13")
+    install("libelf@0.8.12")
+
+    all_installed = spack.store.STORE.db.query()
+    index_mtime = os.stat(spack.store.STORE.db._index_path).st_mtime
+    for spec in all_installed:
+        spec_file = spack.store.STORE.layout.spec_file_path(spec)
+        os.utime(spec_file, (index_mtime - 10, index_mtime - 10))
+
+    assert "0 spec files read, 2 reused" in reindex("--incremental")
+    assert spack.store.STORE.db.query() == all_installed
+
+    # Spec files modified after the index was written are read again
+    spec_file = spack.store.STORE.layout.spec_file_path(all_installed[0])
+    later = os.stat(spack.store.STORE.db._index_path).st_mtime + 10
+    os.utime(spec_file, (later, later))
+    assert "1 spec files read, 1 reused" in reindex("--incremental")
+    assert spack.store.STORE.db.query() == all_installed
+
+    # Without an index, all the spec files are read
+    os.remove(spack.store.STORE.db._index_path)
+    assert "2 spec files read, 0 reused" in reindex("--incremental")
+    assert spack.store.STORE.db.query() == all_installed
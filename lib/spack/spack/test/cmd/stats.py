@@ -0,0 +1,90 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import pytest
+
+import spack.spec
+import spack.store
+import spack.util.timer
+from spack.main import SpackCommand
+
+stats = SpackCommand("stats")
+
+
+def _record(name, version, total, cache=False):
+    spec = spack.spec.Spec(f"{name}@={version}")
+    spec._mark_concrete()
+    times = iter([0.0, 0.0, 0.25 * total, total])
+    timer = spack.util.timer.Timer(now=lambda: next(times))
+    with timer.measure("stage"):
+        pass
+    timer.stop()
+    spack.store.STORE.install_history.add(spec, timer, cache)
+
+
+@pytest.fixture()
+def history(mutable_database):
+    spack.store.STORE.install_history.clear()
+    _record("libelf", "0.8.12", 10.0)
+    _record("libelf", "0.8.13", 30.0)
+    _record("libelf", "0.8.13", 30.0, cache=True)
+    _record("mpich", "3.0.4", 100.0)
+    _record("zmpi", "1.0", 1.0, cache=True)
+    yield spack.store.STORE.install_history
+    spack.store.STORE.install_history.clear()
+
+
+def test_stats_slowest(history):
+    lines = stats("slowest").strip().splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ["mpich", "libelf"]
+    assert "0.8.13" in lines[2]
+
+    lines = stats("slowest", "--from-cache", "-n", "1").strip().splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ["libelf"]
+
+
+def test_stats_phases(history):
+    out = stats("phases", "libelf")
+    assert "2 builds from sources" in out
+    assert "stage" in out and "5.000s" in out
+    assert "20.000s" in out
+
+    out = stats("phases", "libelf", "--version", "0.8.12")
+    assert "2.500s" in out
+
+
+def test_stats_regressions(history):
+    out = stats("regressions")
+    assert "libelf" in out and "+200%" in out
+    assert "mpich" not in out
+
+    out = stats("regressions", "--threshold", "300")
+    assert "No build time regressions above 300%" in out
+
+
+def test_stats_regressions_compare_versions(history):
+    """Tests that the latest version is the highest one, not the last one built."""
+    _record("zlib", "1.3", 10.0)
+    _record("zlib", "1.2.13", 30.0)
+    assert "zlib" not in stats("regressions")
+
+    _record("zlib", "1.3.1", 20.0)
+    out = stats("regressions")
+    assert "1.3.1" in out and "+100%" in out
+
+
+def test_stats_cache(history):
+    out = stats("cache")
+    assert "2 of 5 installs from binary caches (40%)" in out
+
+
+def test_stats_malformed_records(history):
+    with open(history.path, "a") as f:
+        f.write('{"name": "trunc')
+    assert len(list(history.records())) == 5
+
+
+def test_stats_no_records(mutable_database):
+    spack.store.STORE.install_history.clear()
+    assert "No install times recorded" in stats("slowest")
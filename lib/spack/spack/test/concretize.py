@@ -23,8 +23,11 @@
 import spack.platforms
 import spack.repo
 import spack.solver.asp
+import spack.solver.cache
+import spack.util.parallel
 import spack.variant as vt
 from spack.concretize import find_spec
+from spack.solver.core import fn
 from spack.spec import CompilerSpec, Spec
 from spack.version import Version, ver
 
@@ -1755,6 +1758,67 @@ def test_best_effort_coconcretize_preferences(self, specs, expected_spec, occura
                 counter += 1
         assert counter == occurances, concrete_specs
 
+    @pytest.mark.only_clingo("Original concretizer cannot concretize in rounds")
+    def test_solve_in_rounds_translates_reusable_specs_once(self, monkeypatch):
+        """Tests that each round of solve_in_rounds translates into facts only the specs that
+        became reusable in the previous round."""
+        spec_clauses = spack.solver.asp.SpackSolverSetup.spec_clauses
+        translated = []
+
+        def _spec_clauses(self, spec, **kwargs):
+            if spec.concrete:
+                translated.append(spec.dag_hash())
+            return spec_clauses(self, spec, **kwargs)
+
+        monkeypatch.setattr(spack.solver.asp.SpackSolverSetup, "spec_clauses", _spec_clauses)
+
+        specs = [
+            Spec("libdwarf@20130729^libelf@0.8.10"),
+            Spec("libdwarf@20130207^libelf@0.8.12"),
+            Spec("libdwarf@20111030"),
+        ]
+        solver = spack.solver.asp.Solver()
+        solver.reuse = False
+        results = list(solver.solve_in_rounds(specs))
+
+        assert len(results) == 3
+        assert translated and len(translated) == len(set(translated))
+
+    @pytest.mark.parametrize(
+        "specs",
+        [
+            [
+                "libdwarf@20130729^libelf@0.8.10",
+                "libdwarf@20130207^libelf@0.8.12",
+                "libdwarf@20111030",
+            ],
+            ["mpileaks^mpich", "mpileaks^zmpi"],
+        ],
+    )
+    @pytest.mark.only_clingo("Original concretizer cannot concretize in rounds")
+    def test_solve_in_rounds_same_program_as_fresh_setup(self, specs, monkeypatch):
+        """Tests that the program of each round of solve_in_rounds, which reuses what the
+        setup computed in earlier rounds, is the same as the one of a new setup."""
+        setup = spack.solver.asp.SpackSolverSetup.setup
+        rounds = []
+
+        def _setup(self, specs, *, reuse=None, allow_deprecated=False):
+            problem = setup(self, specs, reuse=reuse, allow_deprecated=allow_deprecated)
+            rounds.append((list(specs), list(reuse or []), problem))
+            return problem
+
+        monkeypatch.setattr(spack.solver.asp.SpackSolverSetup, "setup", _setup)
+
+        solver = spack.solver.asp.Solver()
+        solver.reuse = False
+        list(solver.solve_in_rounds([Spec(s) for s in specs]))
+        assert len(rounds) > 1
+
+        for round_specs, reuse, problem in rounds:
+            fresh = spack.solver.asp.SpackSolverSetup()
+            fresh.concretize_everything = False
+            assert setup(fresh, round_specs, reuse=reuse) == problem
+
     @pytest.mark.only_clingo("Use case not supported by the original concretizer")
     def test_coconcretize_reuse_and_virtuals(self):
         reusable_specs = []
@@ -2604,3 +2668,259 @@ def test_reusable_externals_different_spec(mock_packages, tmpdir):
         {"mpich": {"externals": [{"spec": "mpich@4.1 +debug", "prefix": tmpdir.strpath}]}},
         local=False,
     )
+
+
+def test_concretization_cache_evicts_least_recently_used(tmp_path):
+    cache = spack.solver.cache.ConcretizationCache(str(tmp_path), entry_limit=2)
+    for age, key in enumerate(["c", "b", "a"]):
+        cache.store(key, {"answer": key})
+        os.utime(cache._path(key), (1000 - age, 1000 - age))
+
+    # Reading an entry makes it the most recently used
+    assert cache.fetch("a") == {"answer": "a"}
+    cache.store("d", {"answer": "d"})
+    cache.cleanup()
+
+    assert cache.fetch("b") is None
+    assert cache.fetch("a") == {"answer": "a"}
+    assert cache.fetch("d") == {"answer": "d"}
+    assert len(cache.entries()) == 2
+
+
+def test_concretization_cache_size_limit(tmp_path):
+    cache = spack.solver.cache.ConcretizationCache(str(tmp_path), size_limit=100)
+    cache.store("old", {"answer": "x" * 60})
+    os.utime(cache._path("old"), (1000, 1000))
+    cache.store("new", {"answer": "y" * 60})
+    cache.cleanup()
+
+    assert cache.fetch("old") is None
+    assert cache.fetch("new") == {"answer": "y" * 60}
+
+    cache.destroy()
+    assert not cache.entries()
+
+
+def test_concretization_cache_skips_solving(mutable_config, mock_packages, tmp_path, monkeypatch):
+    """Tests that concretizing twice the same spec reads the answer from the cache, and
+    gives the same result without grounding."""
+    mutable_config.set("config:misc_cache", str(tmp_path))
+    mutable_config.set("concretizer:concretization_cache", {"enable": True})
+
+    groundings = []
+    default_control = spack.solver.asp.default_clingo_control
+
+    class _CountingControl:
+        def __init__(self):
+            self.control = default_control()
+
+        def __getattr__(self, name):
+            return getattr(self.control, name)
+
+        def ground(self, *args, **kwargs):
+            groundings.append(args)
+            return self.control.ground(*args, **kwargs)
+
+    monkeypatch.setattr(spack.solver.asp, "default_clingo_control", _CountingControl)
+
+    first = Spec("mpileaks").concretized()
+    assert len(groundings) == 1
+
+    second = Spec("mpileaks").concretized()
+    assert len(groundings) == 1
+    assert first.dag_hash() == second.dag_hash()
+    assert len(spack.solver.cache.concretization_cache().entries()) == 1
+
+    # Any change in the input invalidates the cache
+    Spec("mpileaks ^mpich").concretized()
+    assert len(groundings) == 2
+
+
+@pytest.mark.parametrize("spec_str", ["mpileaks", "conditional-variant-pkg@2.0"])
+def test_solver_threads(spec_str, mutable_config, mock_packages, capsys):
+    """Tests that solving with a portfolio of threads finds an optimum with the same score
+    as the default configuration, and reports the configuration that found it."""
+    mutable_config.set("concretizer:concretization_cache", {"enable": False})
+    setup = spack.solver.asp.SpackSolverSetup()
+    driver = spack.solver.asp.PyclingoDriver()
+    expected, _, _ = driver.solve(setup, [Spec(spec_str)])
+
+    mutable_config.set("concretizer:solver_threads", 3)
+    output = spack.solver.asp.OutputConfiguration(
+        timers=False, stats=True, out=None, setup_only=False
+    )
+    result, _, _ = driver.solve(setup, [Spec(spec_str)], output=output)
+
+    solvers = driver.control.configuration.solver
+    portfolio = spack.solver.asp.SOLVER_PORTFOLIO
+    assert [solvers[idx].opt_strategy for idx in range(len(solvers))] == [
+        options.split("=")[-1] for _, _, options in portfolio
+    ]
+    assert result.answers[0][0] == expected.answers[0][0]
+    assert result.specs[0].satisfies(spec_str)
+    assert "Winning configuration: " in capsys.readouterr().out
+
+
+def test_solver_threads_at_most_one_per_configuration(mutable_config):
+    """Tests that there are never more threads than configurations in the portfolio, which
+    would search again with the same configurations."""
+    portfolio = spack.solver.asp.SOLVER_PORTFOLIO
+    mutable_config.set("concretizer:solver_threads", 2 * len(portfolio))
+
+    control = spack.solver.asp.default_clingo_control()
+    assert control.configuration.solve.parallel_mode == f"{len(portfolio)},compete"
+
+
+def test_relocatable_block_renders_like_clingo():
+    """Tests that facts with relative condition ids render as clingo would print them."""
+
+    def _facts(condition_id):
+        return [
+            fn.optimize_for_reuse(),
+            fn.pkg_fact("a-pkg", fn.variant_default_value_from_package_py("x", True)),
+            fn.condition_reason(condition_id(3), 'with "quotes",\\ and\nlines'),
+            fn.imposed_constraint(condition_id(0), "node_version_satisfies", -1),
+        ]
+
+    expected = spack.solver.asp.ProblemInstanceBuilder()
+    for fact in _facts(lambda x: x + 5):
+        expected.fact(fact)
+
+    block = spack.solver.asp.RelocatableBlockBuilder()
+    for fact in _facts(spack.solver.asp._RelativeId):
+        block.fact(fact)
+    facts = spack.solver.asp.PackageFacts(block.template(), 4, set(), set(), set(), set())
+
+    assert facts.text(5) == expected.value()
+
+
+@pytest.mark.parametrize("tests", [False, True])
+def test_package_facts_cache(tests, mutable_config, mock_packages, tmp_path, monkeypatch):
+    """Tests that the setup generates the same problem with and without the package facts
+    cache, and that it doesn't generate facts for packages in the cache."""
+    specs = [
+        Spec("mpileaks"),
+        Spec("conditional-variant-pkg"),
+        Spec("conditional-constrained-dependencies"),
+        Spec("variant-on-dependency-condition-root"),
+        Spec("test-dep-with-imposed-conditions"),
+        Spec("bowtie"),
+        Spec("impossible-concretization"),
+    ]
+
+    def _problem():
+        return spack.solver.asp.SpackSolverSetup(tests=tests).setup(specs)
+
+    expected = _problem()
+
+    mutable_config.set("config:misc_cache", str(tmp_path))
+    mutable_config.set("concretizer:package_facts_cache", {"enable": True})
+    assert _problem() == expected
+    assert spack.solver.cache.package_facts_cache().entries()
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("facts should have been read from the cache")
+
+    monkeypatch.setattr(spack.solver.asp.SpackSolverSetup, "generate_package_facts", _fail)
+    assert _problem() == expected
+
+
+@pytest.fixture()
+def parallel_package_facts(mutable_config, monkeypatch):
+    """Generates the facts of packages with two processes, and returns the number of
+    processes of each pool."""
+    pools = []
+    imap_unordered = spack.util.parallel.imap_unordered
+
+    def _imap_unordered(f, list_of_args, *, processes, **kwargs):
+        pools.append(processes)
+        return imap_unordered(f, list_of_args, processes=processes, **kwargs)
+
+    monkeypatch.setattr(spack.solver.asp, "PACKAGES_PER_PROCESS", 2)
+    monkeypatch.setattr(spack.util.parallel, "imap_unordered", _imap_unordered)
+    mutable_config.set("concretizer:package_facts_processes", 2)
+    return pools
+
+
+def test_package_facts_in_one_process_by_default(mock_packages, config, monkeypatch):
+    """Tests that the facts of packages are generated in this process by default."""
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("no pool of processes should be used")
+
+    monkeypatch.setattr(spack.util.parallel, "imap_unordered", _fail)
+    spack.solver.asp.SpackSolverSetup().setup([Spec("mpileaks")])
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="processes are started with fork on linux")
+@pytest.mark.parametrize("tests", [False, True])
+def test_package_facts_in_parallel(tests, mutable_config, mock_packages, parallel_package_facts):
+    """Tests that the setup generates the same problem when the facts of packages are
+    generated by a pool of processes."""
+    specs = [Spec("mpileaks"), Spec("conditional-constrained-dependencies"), Spec("bowtie")]
+    with spack.config.override("concretizer:package_facts_processes", 1):
+        expected = spack.solver.asp.SpackSolverSetup(tests=tests).setup(specs)
+
+    assert spack.solver.asp.SpackSolverSetup(tests=tests).setup(specs) == expected
+    assert parallel_package_facts == [2]
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="processes are started with fork on linux")
+def test_package_facts_in_parallel_errors(mock_packages, parallel_package_facts, monkeypatch):
+    """Tests that errors in the pool of processes are raised as in this process."""
+    variant_rules = spack.solver.asp.SpackSolverSetup.variant_rules
+
+    def _variant_rules(self, pkg):
+        if pkg.name == "callpath":
+            raise spack.error.SpackError("cannot translate callpath")
+        return variant_rules(self, pkg)
+
+    monkeypatch.setattr(spack.solver.asp.SpackSolverSetup, "variant_rules", _variant_rules)
+    with pytest.raises(spack.error.SpackError, match="cannot translate callpath"):
+        spack.solver.asp.SpackSolverSetup().setup([Spec("mpileaks")])
+    assert parallel_package_facts == [2]
+
+
+def test_package_facts_cache_miss_on_dependency_variants(
+    mutable_config, mock_packages, tmp_path, monkeypatch
+):
+    """Tests that the facts of a package are generated again when the variants of one of its
+    dependencies change, since they validate the variants in its facts."""
+    builder = spack.repo.MockRepositoryBuilder(tmp_path / "repo", namespace="factsrepo")
+    builder.add_package("facts-root", dependencies=[("facts-dep+shared", None, None)])
+    builder.add_package("facts-dep")
+    with open(builder.recipe_filename("facts-dep"), "a") as f:
+        f.write('    variant("shared", default=True, description="")\n')
+
+    mutable_config.set("config:misc_cache", str(tmp_path / "cache"))
+    mutable_config.set("concretizer:package_facts_cache", {"enable": True})
+    generate_package_facts = spack.solver.asp.SpackSolverSetup.generate_package_facts
+
+    def _generated():
+        """Setup as a new process would, and return the packages whose facts are generated"""
+        generated = []
+
+        def _generate_package_facts(self, pkg):
+            generated.append(pkg.name)
+            return generate_package_facts(self, pkg)
+
+        with monkeypatch.context() as m:
+            m.setattr(
+                spack.solver.asp.SpackSolverSetup,
+                "generate_package_facts",
+                _generate_package_facts,
+            )
+            with spack.repo.use_repositories(builder.root, override=False):
+                spack.solver.asp.SpackSolverSetup().setup([Spec("facts-root")])
+
+        for name in [x for x in sys.modules if x.startswith("spack.pkg.factsrepo")]:
+            del sys.modules[name]
+        spack.solver.asp._module_digest.cache.clear()
+        return generated
+
+    assert {"facts-root", "facts-dep"} <= set(_generated())
+    assert not _generated()
+
+    with open(builder.recipe_filename("facts-dep"), "a") as f:
+        f.write('    variant("static", default=False, description="")\n')
+    assert {"facts-root", "facts-dep"} <= set(_generated())
@@ -705,9 +705,18 @@ def configuration_dir(tmpdir_factory, linux_os):
     modules_root = tmpdir_factory.mktemp("share")
     tcl_root = modules_root.ensure("modules", dir=True)
     lmod_root = modules_root.ensure("lmod", dir=True)
-    content = "".join(config_yaml.read()).format(solver, locks, str(tcl_root), str(lmod_root))
+    content = "".join(config_yaml.read()).format(solver, locks)
+    # Install under the temporary directory, not in the Spack prefix
+    data = syaml.load_config(content)
+    data["config"]["install_tree"]["root"] = str(tmpdir_factory.mktemp("opt"))
     t = tmpdir.join("site", "config.yaml")
-    t.write(content)
+    t.write(syaml.dump_config(data))
+
+    # Write module files under the temporary directory, not in the Spack prefix
+    modules_yaml = tmpdir.join("site", "modules.yaml")
+    data = syaml.load_config(modules_yaml.read())
+    data["modules"]["default"]["roots"] = {"tcl": str(tcl_root), "lmod": str(lmod_root)}
+    modules_yaml.write(syaml.dump_config(data))
 
     compilers_yaml = test_config.join("compilers.yaml")
     content = "".join(compilers_yaml.read()).format(linux_os)
@@ -30,6 +30,7 @@
 import spack.repo
 import spack.spec
 import spack.store
+import spack.util.file_cache
 import spack.version as vn
 from spack.schema.database_index import schema
 from spack.util.executable import Executable
@@ -255,6 +256,81 @@ def test_recursive_upstream_dbs(tmpdir, gen_mock_layout):
             [spec, spec["y"]]
         )
 
+        # Dependents in downstream databases are built when first traversed
+        db_a_from_scratch = spack.database.Database(
+            roots[0],
+            upstream_dbs=spack.store._construct_upstream_dbs_from_install_roots(
+                [roots[1], roots[2]], _test=True
+            ),
+        )
+        z = db_a_from_scratch.query_one("z")
+        assert [s.dag_hash() for s in z.traverse(direction="parents")] == [
+            spec[name].dag_hash() for name in ("z", "y", "x")
+        ]
+
+
+@pytest.mark.usefixtures("config", "temporary_store")
+def test_upstream_index_cache(tmpdir, gen_mock_layout, monkeypatch):
+    roots = [str(tmpdir.mkdir(x)) for x in ["a", "b"]]
+    layouts = [gen_mock_layout(x) for x in ["/ra/", "/rb/"]]
+    cache = spack.database.UpstreamIndexCache(
+        spack.util.file_cache.FileCache(str(tmpdir.mkdir("cache")))
+    )
+
+    builder = spack.repo.MockRepositoryBuilder(tmpdir.mkdir("mock.repo"))
+    builder.add_package("x")
+    builder.add_package("z")
+    builder.add_package("y", dependencies=[("z", None, None)])
+
+    with spack.repo.use_repositories(builder.root):
+        spec = spack.spec.Spec("y").concretized()
+        db_b = spack.database.Database(roots[1])
+        db_b.add(spec["z"], layouts[1])
+        db_a = spack.database.Database(roots[0], upstream_dbs=[db_b])
+        db_a.add(spec, layouts[0])
+
+        def upstreams():
+            dbs = spack.store._construct_upstream_dbs_from_install_roots(
+                roots, _test=True, cache=cache
+            )
+            downstream = spack.database.Database(
+                str(tmpdir.ensure("c", dir=True)), upstream_dbs=dbs
+            )
+            return dbs, downstream
+
+        dbs, downstream = upstreams()
+        assert downstream.db_for_spec_hash(spec.dag_hash()) is dbs[0]
+        assert downstream.db_for_spec_hash(spec["z"].dag_hash()) is dbs[1]
+        y = dbs[0]._data[spec.dag_hash()].spec
+        assert y.dependencies("z")[0] is dbs[1]._data[spec["z"].dag_hash()].spec
+
+        # Unchanged upstream indexes are read from the cache
+        with monkeypatch.context() as m:
+            m.setattr(spack.database.Database, "_load_index", None)
+            dbs, downstream = upstreams()
+        assert downstream.query_by_spec_hash(spec.dag_hash()) == (
+            True,
+            dbs[0]._data[spec.dag_hash()],
+        )
+
+        # Changed ones are read again, and only them
+        x = spack.spec.Spec("x").concretized()
+        db_b.add(x, layouts[1])
+        load_index = spack.database.Database._load_index
+        read = []
+
+        def _load_index(db, filename):
+            read.append(db.root)
+            return load_index(db, filename)
+
+        with monkeypatch.context() as m:
+            m.setattr(spack.database.Database, "_load_index", _load_index)
+            dbs, downstream = upstreams()
+        assert read == [dbs[1].root]
+        assert downstream.db_for_spec_hash(x.dag_hash()) is dbs[1]
+        y = dbs[0]._data[spec.dag_hash()].spec
+        assert y.dependencies("z")[0] is dbs[1]._data[spec["z"].dag_hash()].spec
+
 
 @pytest.fixture()
 def usr_folder_exists(monkeypatch):
@@ -538,6 +614,267 @@ def test_030_db_sanity_from_another_process(mutable_database):
         assert len(mutable_database.query("mpileaks ^zmpi")) == 0
 
 
+def test_batched_writes(mutable_database):
+    """Test specs added while batching writes are seen by other processes, and are in
+    the index once the batch is over."""
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mpich = mutable_database.query_one("mpich")
+    mutable_database.remove(mpileaks)
+    mutable_database.remove(mpich)
+
+    def _read_index():
+        with open(mutable_database._index_path) as f:
+            return f.read()
+
+    index = _read_index()
+    with mutable_database.batched_writes(flush_interval=3600):
+        mutable_database.add(mpich, spack.store.STORE.layout)
+        mutable_database.add(mpileaks, spack.store.STORE.layout, explicit=True)
+        assert _read_index() == index
+        assert os.path.exists(mutable_database._journal_path)
+
+        # Another process replays the journal, as it would after a crash
+        other_db = spack.database.Database(mutable_database.root)
+        with other_db.read_transaction():
+            assert other_db.query_one("mpileaks ^mpich").dag_hash() == mpileaks.dag_hash()
+            assert other_db.get_record(mpileaks).explicit
+            assert other_db.is_occupied_install_prefix(mpileaks.prefix)
+            other_db._check_ref_counts()
+
+        # Partial lines, from interrupted writes, are not replayed
+        with open(mutable_database._journal_path, "a") as f:
+            f.write('{"op": "add", "key": "abc')
+        other_db = spack.database.Database(mutable_database.root)
+        with other_db.read_transaction():
+            other_db._check_ref_counts()
+
+    assert not os.path.exists(mutable_database._journal_path)
+    assert mpileaks.dag_hash() in _read_index()
+    _check_db_sanity(mutable_database)
+
+
+def test_batched_writes_flush_interval(mutable_database):
+    """Test the index is written when the flush interval has elapsed."""
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mutable_database.remove(mpileaks)
+
+    with mutable_database.batched_writes(flush_interval=3600):
+        mutable_database._last_flush -= 3600
+        mutable_database.add(mpileaks, spack.store.STORE.layout)
+        assert not os.path.exists(mutable_database._journal_path)
+        with open(mutable_database._index_path) as f:
+            assert mpileaks.dag_hash() in f.read()
+
+
+def _records(database):
+    # Compare the JSON of the records, whether their spec was built or not
+    return {
+        key: json.loads(json.dumps(rec.to_dict(include_fields=database.record_fields)))
+        for key, rec in database._data.items()
+    }
+
+
+def test_journal(mutable_database, monkeypatch):
+    """Test changes to a journaled database are replayed by other processes, without
+    reading the index again."""
+    monkeypatch.setattr(mutable_database, "journal", True)
+    with open(mutable_database._index_path) as f:
+        index = f.read()
+
+    other_db = spack.database.Database(mutable_database.root)
+    with other_db.read_transaction():
+        pass
+    monkeypatch.setattr(other_db, "_read_from_file", lambda filename: pytest.fail())
+
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mpich = mutable_database.query_one("mpich")
+    zmpi = mutable_database.query_one("zmpi")
+    mutable_database.remove(mpileaks)
+    mutable_database.remove(mpich)
+    mutable_database.deprecate(zmpi, mpich)
+    mutable_database.mark(mutable_database.query_one("libelf"), "explicit", True)
+
+    with open(mutable_database._index_path) as f:
+        assert f.read() == index
+    with other_db.read_transaction():
+        assert _records(other_db) == _records(mutable_database)
+        assert not other_db.is_occupied_install_prefix(mpileaks.prefix)
+        assert other_db._journal_offset == os.path.getsize(other_db._journal_path)
+        other_db._check_ref_counts()
+
+    mutable_database.add(mpileaks, spack.store.STORE.layout)
+    with other_db.read_transaction():
+        assert _records(other_db) == _records(mutable_database)
+        assert other_db.query_one("mpileaks ^mpich").dag_hash() == mpileaks.dag_hash()
+        assert other_db.is_occupied_install_prefix(mpileaks.prefix)
+        other_db._check_ref_counts()
+
+
+def test_journal_append_after_partial_entry(mutable_database, monkeypatch):
+    """Test the partial entry left by an interrupted write is dropped, instead of being
+    completed by the next entries appended to the journal."""
+    monkeypatch.setattr(mutable_database, "journal", True)
+    mutable_database.mark(mutable_database.query_one("libelf"), "explicit", True)
+    with open(mutable_database._journal_path, "a") as f:
+        f.write('{"op": "add", "key": "abc')
+
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mutable_database.remove(mpileaks)
+    mutable_database.add(mpileaks, spack.store.STORE.layout)
+
+    with open(mutable_database._journal_path, "rb") as f:
+        assert b'"abc' not in f.read()
+    other_db = spack.database.Database(mutable_database.root)
+    with other_db.read_transaction():
+        assert _records(other_db) == _records(mutable_database)
+        other_db._check_ref_counts()
+
+
+@pytest.mark.parametrize("journal", [True, False])
+def test_journal_writes_index_of_new_database(journal, tmp_path):
+    """Test the first write transaction on a new journaled, or batching, database
+    writes the index, which other processes look for, even if nothing changed."""
+    db = spack.database.Database(str(tmp_path), journal=journal)
+    with db.batched_writes(flush_interval=3600):
+        with db.write_transaction():
+            pass
+        assert os.path.isfile(db._index_path)
+        assert not os.path.exists(db._journal_path)
+
+
+def test_journal_compaction(mutable_database, monkeypatch):
+    """Test the journal is compacted into the index when it grows too large."""
+    monkeypatch.setattr(mutable_database, "journal", True)
+    mutable_database.mark(mutable_database.query_one("libelf"), "explicit", True)
+    assert os.path.exists(mutable_database._journal_path)
+
+    # The next change makes the journal larger than its current size
+    journal_size = os.path.getsize(mutable_database._journal_path)
+    monkeypatch.setattr(spack.database, "JOURNAL_MIN_COMPACTION_SIZE", journal_size)
+    monkeypatch.setattr(spack.database, "JOURNAL_COMPACTION_RATIO", 0)
+
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mutable_database.remove(mpileaks)
+    assert not os.path.exists(mutable_database._journal_path)
+
+    other_db = spack.database.Database(mutable_database.root)
+    with other_db.read_transaction():
+        assert _records(other_db) == _records(mutable_database)
+
+
+def test_lazy_specs(mutable_database):
+    """Test reading the index builds no spec, and queries only build the specs they
+    need, connected to the specs of their dependencies, and to the specs of their
+    dependents when these are first read."""
+    db = spack.database.Database(mutable_database.root)
+    with db.write_transaction():
+        assert all(rec._spec is None for rec in db._data.values())
+
+        libelf = db.query_one("libelf")
+        built = {key for key, rec in db._data.items() if rec._spec is not None}
+        assert built == {libelf.dag_hash()}
+
+    # Writing the index did not build other specs
+    assert {key for key, rec in db._data.items() if rec._spec is not None} == built
+    with open(db._index_path) as f:
+        assert len(json.load(f)["database"]["installs"]) == len(db._data)
+
+    # Dependents are built when first read, with their dependencies
+    with db.read_transaction():
+        assert sorted(s.name for s in libelf.dependents()) == ["dyninst", "libdwarf"]
+        libdwarf = db.query_one("libdwarf")
+        assert libdwarf.dependencies("libelf")[0] is libelf
+        built = {key for key, rec in db._data.items() if rec._spec is not None}
+        assert built == {s.dag_hash() for d in libelf.dependents() for s in d.traverse()}
+        assert len(built) < len(db._data)
+
+        parents = {s.dag_hash() for s in libelf.traverse(direction="parents")}
+        assert parents == {libelf.dag_hash(), *db.relatives_hashes([libelf.dag_hash()])}
+        db._check_ref_counts()
+
+
+def test_query_indexes(mutable_database):
+    """Test queries narrowed down by the indexes of the database agree with a scan of
+    all the records, as records are added, marked, deprecated and removed."""
+
+    def check():
+        with mutable_database.read_transaction():
+            for explicit in (any, True, False):
+                for installed in (any, True, False, spack.database.InstallStatuses.DEPRECATED):
+                    for query in (
+                        any,
+                        "mpileaks",
+                        "mpi",
+                        "builtin.mock.libelf",
+                        "callpath ^mpich",
+                    ):
+                        kwargs = {"explicit": explicit, "installed": installed}
+                        expected = [
+                            rec.spec
+                            for rec in mutable_database._data.values()
+                            if rec.install_type_matches(installed)
+                            and (explicit is any or rec.explicit == explicit)
+                            and (query is any or rec.spec.satisfies(query))
+                        ]
+                        assert sorted(mutable_database.query_local(query, **kwargs)) == sorted(
+                            expected
+                        ), (query, kwargs)
+
+            for key in mutable_database._data:
+                assert mutable_database.get_by_hash_local(key[:7]) == [
+                    mutable_database._data[key].spec
+                ]
+
+    check()
+    mutable_database.update_explicit(mutable_database.query_one("libelf"), True)
+    check()
+    mutable_database.remove("mpileaks ^mpich")
+    check()
+    mutable_database.add(
+        spack.spec.Spec("mpileaks ^mpich").concretized(), spack.store.STORE.layout
+    )
+    check()
+    mutable_database.deprecate(
+        mutable_database.query_one("libelf"), mutable_database.query_one("libdwarf")
+    )
+    check()
+
+
+def test_relatives_hashes(mutable_database):
+    """Test dependents and dependencies are looked up without building specs, and agree
+    with traversals of the specs, as records are added and removed."""
+
+    def traversal(spec, direction, deptype):
+        nodes = spec.traverse(direction=direction, root=False, deptype=deptype)
+        return sorted(s.dag_hash() for s in nodes)
+
+    def check():
+        db = spack.database.Database(mutable_database.root)
+        with db.read_transaction():
+            for key in db._data:
+                for direction in ("parents", "children"):
+                    db.relatives_hashes([key], direction=direction)
+            assert all(rec._spec is None for rec in db._data.values())
+
+        with mutable_database.read_transaction():
+            for key, rec in mutable_database._data.items():
+                for direction in ("parents", "children"):
+                    for deptype in (dt.ALL, dt.LINK | dt.RUN, dt.BUILD):
+                        relatives = mutable_database.relatives_hashes(
+                            [key], direction=direction, deptype=deptype
+                        )
+                        assert len(relatives) == len(set(relatives))
+                        assert sorted(relatives) == traversal(rec.spec, direction, deptype)
+
+    check()
+    mutable_database.remove("mpileaks ^mpich")
+    check()
+    mutable_database.add(
+        spack.spec.Spec("mpileaks ^mpich").concretized(), spack.store.STORE.layout
+    )
+    check()
+
+
 def test_040_ref_counts(database):
     """Ensure that we got ref counts right when we read the DB."""
     database._check_ref_counts()
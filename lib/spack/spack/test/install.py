@@ -225,6 +225,26 @@ def test_install_times(install_mockery, mock_fetch, mutable_mock_repo):
     assert all(isinstance(x["seconds"], float) for x in times["phases"])
 
 
+def test_install_history(install_mockery, mock_fetch, mutable_mock_repo):
+    """Test install times are recorded in the history of the store, and kept on uninstall."""
+    spec = Spec("dev-build-test-install-phases").concretized()
+    spec.package.do_install()
+    spec.package.do_uninstall()
+
+    (record,) = spack.store.STORE.install_history.records(spec.name)
+    assert record["hash"] == spec.dag_hash()
+    assert record["version"] == str(spec.version)
+    assert not record["cache"]
+    assert [x["name"] for x in record["phases"]] == [
+        "stage",
+        "one",
+        "two",
+        "three",
+        "install",
+        "post-install",
+    ]
+
+
 def test_flatten_deps(install_mockery, mock_fetch, mutable_mock_repo):
     """Explicitly test the flattening code for coverage purposes."""
     # Unfortunately, executing the 'flatten-deps' spec's installation does
@@ -7,6 +7,7 @@
 import os
 import shutil
 import sys
+import threading
 
 import py
 import pytest
@@ -22,12 +23,16 @@
 import spack.database
 import spack.deptypes as dt
 import spack.installer as inst
+import spack.mirror
 import spack.package_base
 import spack.package_prefs as prefs
+import spack.relocate
 import spack.repo
 import spack.spec
+import spack.stage
 import spack.store
 import spack.util.lock as lk
+import spack.util.spack_json
 import spack.version
 
 
@@ -855,6 +860,47 @@ def test_push_task_skip_processed(install_mockery, installed):
     assert len(list(installer.build_tasks)) == 0
 
 
+def test_estimate_install_times(install_mockery, mock_fetch, monkeypatch):
+    """Test install times are estimated from the install history of the store, without
+    querying all the installed specs."""
+    installed = spack.spec.Spec("trivial-install-test-package").concretized()
+    not_installed = spack.spec.Spec("a").concretized()
+    estimates = inst.estimate_install_times([installed, not_installed])
+    assert estimates[inst.package_id(not_installed.package)] == inst.DEFAULT_INSTALL_TIME
+
+    installed.package.do_install()
+    with open(installed.package.times_log_path) as f:
+        total = spack.util.spack_json.load(f)["total"]
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("installed specs should not be queried")
+
+    monkeypatch.setattr(spack.store.STORE.db, "query_local", _fail)
+    monkeypatch.setattr(spack.store.STORE.layout, "metadata_path", _fail)
+    estimates = inst.estimate_install_times([installed, not_installed])
+    assert estimates[inst.package_id(installed.package)] == 0.0
+    assert estimates[inst.package_id(not_installed.package)] == pytest.approx(total)
+
+
+def test_init_queue_critical_path(install_mockery, monkeypatch):
+    """Test tasks on the longest path to the roots are installed first."""
+    times = {"b": 1.0, "dependency-install": 100.0, "dependent-install": 10.0}
+
+    def _estimates(specs):
+        return {inst.package_id(spec.package): times[spec.name] for spec in specs}
+
+    monkeypatch.setattr(inst, "estimate_install_times", _estimates)
+
+    const_arg = installer_args(["b", "dependent-install"], {})
+    installer = create_installer(const_arg)
+    installer._init_queue()
+
+    critical_paths = {t.pkg.name: t.critical_path for t in installer.build_tasks.values()}
+    assert critical_paths == {"b": 1.0, "dependency-install": 110.0, "dependent-install": 10.0}
+    assert installer._pop_task().pkg.name == "dependency-install"
+    assert installer._pop_task().pkg.name == "b"
+
+
 def test_requeue_task(install_mockery, capfd):
     """Test to ensure cover _requeue_task."""
     const_arg = installer_args(["a"], {})
@@ -1259,6 +1305,199 @@ def test_install_skip_patch(install_mockery, mock_fetch):
     assert inst.package_id(spec.package) in installer.installed
 
 
+def test_install_concurrent_packages(install_mockery, mock_fetch, monkeypatch):
+    """Test independent packages are built at the same time, up to the limit."""
+    spack.config.set("config:concurrent_packages", 2)
+    const_arg = installer_args(["dependent-install", "b", "trivial-install-test-package"])
+    installer = create_installer(const_arg)
+    assert installer.max_active_tasks == 2
+
+    active = []
+    wait_for_active_tasks = inst.PackageInstaller._wait_for_active_tasks
+
+    def _wait(self):
+        active.append(len(self.active_tasks))
+        return wait_for_active_tasks(self)
+
+    monkeypatch.setattr(inst.PackageInstaller, "_wait_for_active_tasks", _wait)
+
+    installer.install()
+
+    assert max(active) == 2
+    assert not installer.active_tasks
+    for spec, _ in const_arg:
+        for s in spec.traverse():
+            assert inst.package_id(s.package) in installer.installed
+            assert spack.store.STORE.db.query_one(s, installed=True)
+
+
+@pytest.mark.disable_clean_stage_check
+def test_install_concurrent_packages_failure(install_mockery, mock_fetch):
+    """Test the failure of a concurrent build does not stop the other builds."""
+    spack.config.set("config:concurrent_packages", 2)
+    const_arg = installer_args(["failing-build", "trivial-install-test-package"])
+    installer = create_installer(const_arg)
+
+    with pytest.raises(inst.InstallError, match="request failed"):
+        installer.install()
+
+    failing_id, trivial_id = (inst.package_id(spec.package) for spec, _ in const_arg)
+    assert failing_id in installer.failed
+    assert trivial_id in installer.installed
+    assert not installer.active_tasks
+
+
+def test_install_concurrent_binaries(install_mockery, mock_fetch, monkeypatch):
+    """Test binary packages are extracted concurrently, and registered in the
+    database in topological order."""
+    spack.config.set("config:concurrent_packages", 3)
+    const_arg = installer_args(["dependent-install", "b", "trivial-install-test-package"])
+    installer = create_installer(const_arg)
+
+    def _extract(pkg, unsigned, mirrors_for_spec=None, timer=None, download_result=None):
+        assert mirrors_for_spec == ["mirror"]
+        fs.mkdirp(pkg.spec.prefix)
+        return True
+
+    monkeypatch.setattr(spack.mirror, "MirrorCollection", _true)
+    monkeypatch.setattr(
+        spack.binary_distribution, "get_mirrors_for_spec", lambda *a, **k: ["mirror"]
+    )
+    monkeypatch.setattr(spack.relocate, "_patchelf", _none)
+    monkeypatch.setattr(inst, "_extract_binary_cache_tarball", _extract)
+    monkeypatch.setattr(spack.hooks, "post_install", _noop)
+
+    active = []
+    wait_for_active_tasks = inst.PackageInstaller._wait_for_active_tasks
+
+    def _wait(self):
+        active.append(
+            sum(isinstance(t.process, inst.BinaryInstall) for t in self.active_tasks.values())
+        )
+        return wait_for_active_tasks(self)
+
+    monkeypatch.setattr(inst.PackageInstaller, "_wait_for_active_tasks", _wait)
+
+    registered = []
+    add = spack.database.Database.add
+
+    def _add(self, spec, *args, **kwargs):
+        registered.append(spec.name)
+        return add(self, spec, *args, **kwargs)
+
+    monkeypatch.setattr(spack.database.Database, "add", _add)
+
+    installer.install()
+
+    assert max(active) == 3
+    assert registered.index("dependency-install") < registered.index("dependent-install")
+    for spec, _ in const_arg:
+        for s in spec.traverse():
+            assert s.package.installed_from_binary_cache
+            assert spack.store.STORE.db.query_one(s, installed=True)
+
+
+def test_install_batched_db_writes(install_mockery, mock_fetch, monkeypatch):
+    """Test the database index is only written when created, and at the end, when
+    batching writes."""
+    spack.config.set("config:db_flush_interval", 3600)
+    const_arg = installer_args(["dependent-install"])
+    installer = create_installer(const_arg)
+
+    db = spack.store.STORE.db
+    writes = []
+    write_to_file = spack.database.Database._write_to_file
+
+    def _write_to_file(self, stream):
+        writes.append(os.path.exists(self._journal_path))
+        return write_to_file(self, stream)
+
+    monkeypatch.setattr(spack.database.Database, "_write_to_file", _write_to_file)
+
+    installer.install()
+
+    assert writes == [False, True]
+    assert not os.path.exists(db._journal_path)
+    for s in const_arg[0][0].traverse():
+        assert spack.store.STORE.db.query_one(s, installed=True)
+
+
+def test_install_prefetch_packages(install_mockery, mock_fetch, monkeypatch):
+    """Test the sources of the queued packages are downloaded ahead of their build."""
+    spack.config.set("config:prefetch_packages", 2)
+    const_arg = installer_args(["dependent-install"])
+    installer = create_installer(const_arg)
+    assert installer.prefetcher.max_packages == 2
+
+    prefetched = []
+    prefetch = inst._prefetch
+
+    def _prefetch(pkg, *args):
+        prefetched.append(pkg.name)
+        return prefetch(pkg, *args)
+
+    monkeypatch.setattr(inst, "_prefetch", _prefetch)
+
+    installer.install()
+
+    assert sorted(prefetched) == ["dependency-install", "dependent-install"]
+    assert not installer.prefetcher.futures
+    for s in const_arg[0][0].traverse():
+        assert spack.store.STORE.db.query_one(s, installed=True)
+
+
+def test_install_prefetched_binary(install_mockery, mock_fetch, monkeypatch):
+    """Test a prefetched binary package is used to install from the binary cache."""
+    spack.config.set("config:prefetch_packages", 1)
+    const_arg = installer_args(["trivial-install-test-package"])
+    installer = create_installer(const_arg)
+
+    download_result = {"tarball_stage": None, "specfile_stage": None}
+    monkeypatch.setattr(inst, "_prefetch", lambda *args: download_result)
+
+    used = []
+
+    def _try_install(pkg, explicit, unsigned=None, timer=None, download_result=None):
+        used.append(download_result)
+        return False
+
+    monkeypatch.setattr(inst, "_try_install_from_binary_cache", _try_install)
+
+    installer.install()
+
+    assert used == [download_result]
+    assert not installer.prefetcher.futures
+
+
+def test_prefetcher_drops_orphaned_downloads(install_mockery, monkeypatch):
+    """Test downloads of packages that left the queue don't count against the maximum
+    number of packages downloaded ahead, even while they are still running."""
+    release = threading.Event()
+    monkeypatch.setattr(inst, "_prefetch", lambda *args: release.wait())
+
+    tasks = [create_build_task(spack.spec.Spec(name).concretized().package) for name in ("a", "b")]
+    prefetcher = inst.Prefetcher(1)
+    try:
+        prefetcher.prefetch(tasks[:1])
+        prefetcher.prefetch(tasks[1:])
+        assert list(prefetcher.futures) == [tasks[1].pkg_id]
+    finally:
+        release.set()
+        prefetcher.shutdown()
+
+
+def test_prefetch_sources_stage_in_use(install_mockery, mock_fetch, monkeypatch):
+    """Test sources are not prefetched while another process holds the stage lock."""
+    pkg = spack.spec.Spec("trivial-install-test-package").concretized().package
+
+    def _locked(self, timeout=None):
+        raise ulk.LockTimeoutError("write", self.path, timeout or 0, 1)
+
+    monkeypatch.setattr(spack.stage.Stage, "locked", _locked)
+    monkeypatch.setattr(pkg, "do_fetch", lambda: pytest.fail("the stage is in use"))
+    inst._prefetch_sources(pkg)
+
+
 def test_install_implicit(install_mockery, mock_fetch):
     """Test the path skip_patch install path."""
     spec_name = "trivial-install-test-package"
@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import gc
 import os.path
 import re
 import sys
@@ -279,6 +280,21 @@ def test_dedupe():
     assert [x for x in dedupe([1, -2, 1, 3, 2], key=abs)] == [1, -2, 3]
 
 
+def test_disable_gc():
+    assert gc.isenabled()
+    with llnl.util.lang.disable_gc():
+        assert not gc.isenabled()
+        with llnl.util.lang.disable_gc():
+            assert not gc.isenabled()
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+    with pytest.raises(ValueError):
+        with llnl.util.lang.disable_gc():
+            raise ValueError()
+    assert gc.isenabled()
+
+
 def test_grouped_exception():
     h = llnl.util.lang.GroupedExceptionHandler()
 
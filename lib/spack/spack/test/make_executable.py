@@ -9,11 +9,12 @@
 This just tests whether the right args are getting passed to make.
 """
 import os
+import re
 import sys
 
 import pytest
 
-from spack.build_environment import MakeExecutable
+from spack.build_environment import MakeExecutable, jobserver_tokens, shared_jobserver
 from spack.util.environment import path_put_first
 
 pytestmark = pytest.mark.skipif(
@@ -118,3 +119,84 @@ def test_make_jobserver_not_supported(monkeypatch):
     monkeypatch.setenv("MAKEFLAGS", "--jobserver-auth=X,Y")
     # Currently fallback on default job count, Maybe it should force -j1 ?
     assert make(output=str).strip() == "-j8"
+
+
+def test_make_shared_jobserver(monkeypatch):
+    monkeypatch.delenv("MAKEFLAGS", raising=False)
+    make = MakeExecutable("make", 8)
+    with shared_jobserver(4):
+        assert "-j4 --jobserver-auth=" in os.environ["MAKEFLAGS"]
+        assert make(output=str).strip() == ""
+    assert "MAKEFLAGS" not in os.environ
+    assert make(output=str).strip() == "-j8"
+
+
+def test_make_shared_jobserver_not_supported(monkeypatch):
+    monkeypatch.delenv("MAKEFLAGS", raising=False)
+    ninja = MakeExecutable("make", 8, supports_jobserver=False)
+    with shared_jobserver(4):
+        # All the job slots are available
+        assert ninja(output=str).strip() == "-j4"
+        # Two of them are taken by another build
+        with jobserver_tokens(3) as jobs:
+            assert jobs == 3
+            assert ninja(output=str).strip() == "-j2"
+        assert ninja(output=str).strip() == "-j4"
+
+
+@pytest.fixture(params=["proc", "no-proc"])
+def jobserver_reopen(request, monkeypatch):
+    """Tests the jobserver pipe both when it can be opened again through /proc, and when
+    it cannot, like on macOS and the BSDs."""
+    if request.param == "no-proc":
+        os_open = os.open
+
+        def _open(path, *args, **kwargs):
+            if str(path).startswith("/proc/"):
+                raise FileNotFoundError(path)
+            return os_open(path, *args, **kwargs)
+
+        monkeypatch.setattr(os, "open", _open)
+    return request.param
+
+
+def test_jobserver_tokens_taken_concurrently(jobserver_reopen, monkeypatch):
+    """Tests that no job slot is taken, instead of waiting for one, when another client
+    takes the tokens first."""
+    monkeypatch.delenv("MAKEFLAGS", raising=False)
+    with shared_jobserver(4):
+        read_fd, write_fd = re.search(r"auth=(\d+),(\d+)", os.environ["MAKEFLAGS"]).groups()
+        read = os.read
+        taken = []
+
+        def drain_and_read(fd, n):
+            if not taken:
+                taken.append(read(int(read_fd), 3))
+            return read(fd, n)
+
+        monkeypatch.setattr(os, "read", drain_and_read)
+        with jobserver_tokens(3) as jobs:
+            assert jobs == 1
+        monkeypatch.setattr(os, "read", read)
+
+        assert taken == [b"+++"]
+        os.write(int(write_fd), taken[0])
+        with jobserver_tokens(3) as jobs:
+            assert jobs == 3
+
+
+def test_jobserver_tokens_shared_pipe_stays_blocking(jobserver_reopen, monkeypatch):
+    """Tests that the jobserver pipe shared with make is left in blocking mode, so that
+    make can wait for job slots."""
+    monkeypatch.delenv("MAKEFLAGS", raising=False)
+    with shared_jobserver(4):
+        read_fd = int(re.search(r"auth=(\d+),", os.environ["MAKEFLAGS"]).group(1))
+        with jobserver_tokens(3) as jobs:
+            assert jobs == 3
+            assert os.get_blocking(read_fd)
+            # Only one job slot is left
+            with jobserver_tokens(3) as other_jobs:
+                assert other_jobs == 2
+        assert os.get_blocking(read_fd)
+        with jobserver_tokens(4) as jobs:
+            assert jobs == 4
@@ -5,6 +5,8 @@
 """
 These tests check Spec DAG operations using dummy packages.
 """
+import pickle
+
 import pytest
 
 import spack.deptypes as dt
@@ -13,6 +15,8 @@
 import spack.parser
 import spack.repo
 import spack.util.hash as hashutil
+import spack.variant
+import spack.version
 from spack.dependency import Dependency
 from spack.spec import Spec
 
@@ -607,6 +611,67 @@ def test_copy_concretized(self):
         copy_ids = set(id(s) for s in copy.traverse())
         assert not orig_ids.intersection(copy_ids)
 
+    def test_copy_concretized_node_attributes(self):
+        """Copies of concrete nodes share the contents of their node attributes, and have
+        the edges of each node in the same order."""
+        orig = Spec("mpileaks").concretized()
+        copy = orig.copy()
+        for orig_node, copy_node in zip(orig.traverse(), copy.traverse()):
+            assert copy_node.versions.versions is orig_node.versions.versions
+            assert copy_node.compiler_flags.dict is orig_node.compiler_flags.dict
+            assert copy_node.variants.dict is orig_node.variants.dict
+            assert copy_node.variants.spec is copy_node
+            assert copy_node.compiler_flags.spec is copy_node
+            assert [e.spec.name for e in copy_node.edges_to_dependencies()] == [
+                e.spec.name for e in orig_node.edges_to_dependencies()
+            ]
+
+        for attr in ("versions", "compiler_flags", "variants"):
+            value = getattr(copy, attr)
+            assert pickle.loads(pickle.dumps(value)) == value
+
+        # Marking the original as not concrete does not affect the copy
+        orig._mark_concrete(False)
+        assert copy.concrete and copy.variants.concrete
+        copy._mark_concrete(False)
+        copy.variants["debug"].value = not orig.variants["debug"].value
+        copy.versions.add(spack.version.Version("3.0"))
+        assert copy.variants["debug"].value != orig.variants["debug"].value
+        assert len(copy.versions) == 2 and len(orig.versions) == 1
+
+    def test_modify_copy_of_concretized(self):
+        """Modifying the node attributes of a copy of a concrete spec, or of the original,
+        does not change the other one."""
+        orig = Spec("mpileaks").concretized()
+        expected = orig.to_dict()
+
+        copy = orig.copy()
+        del copy.variants["debug"]
+        copy.variants["debug"] = spack.variant.BoolValuedVariant(
+            "debug", not orig.variants["debug"].value
+        )
+        copy.variants.substitute(spack.variant.BoolValuedVariant("opt", True))
+        copy.compiler_flags["cflags"] = ["-O3"]
+        copy["libelf"].compiler_flags.add_flag("cxxflags", "-g", False)
+        copy.versions.add(spack.version.Version("3.0"))
+        copy.architecture.os = "debian7"
+        assert orig.to_dict() == expected
+        assert copy.variants["debug"].value != orig.variants["debug"].value
+        assert copy.compiler_flags["cflags"] == ["-O3"]
+        assert copy.concrete and orig.concrete
+
+        copy = orig.copy()
+        orig.variants.substitute(
+            spack.variant.BoolValuedVariant("debug", not orig.variants["debug"].value)
+        )
+        orig.compiler_flags["cflags"] = ["-O3"]
+        orig.versions.add(spack.version.Version("3.0"))
+        assert copy.to_dict() == expected
+
+        # The same changes work through Spec.override
+        override = Spec.override(copy, Spec("+debug"))
+        assert override.satisfies("+debug") and copy.to_dict() == expected
+
     def test_copy_through_spec_build_interface(self):
         """Check that copying dependencies using id(node) as a fast identifier of the
         node works when the spec is wrapped in a SpecBuildInterface object.
@@ -17,6 +17,7 @@
     Spec,
     SpecFormatSigilError,
     SpecFormatStringError,
+    SpecMatcher,
     UnsupportedCompilerError,
 )
 from spack.variant import (
@@ -1432,6 +1433,60 @@ def test_intersects_and_satisfies(factory, lhs_str, rhs_str, results):
     assert lhs.satisfies(rhs) is lhs_satisfies_rhs
     assert rhs.satisfies(lhs) is rhs_satisfies_lhs
 
+    if factory is Spec:
+        assert SpecMatcher(rhs)(lhs) is lhs_satisfies_rhs
+        assert SpecMatcher(lhs)(rhs) is rhs_satisfies_lhs
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "mpileaks",
+        "builtin.mock.mpileaks",
+        "builtin.mpileaks",
+        "mpileaks@2.3",
+        "mpileaks@:1",
+        "mpi",
+        "mpi@2:",
+        "mpi@:1",
+        "%gcc",
+        "%clang",
+        "+debug",
+        "~debug",
+        "cflags=-O2",
+        "arch=test-debian6-default",
+        "platform=test",
+        "target=x86_64:",
+        "^mpi",
+        "^mpich",
+        "^mpich@3:",
+        "^zmpi",
+        "^callpath ^dyninst@8:",
+        "mpileaks ^[virtuals=mpi] mpich",
+        "callpath ^libelf",
+    ],
+)
+@pytest.mark.parametrize("deps", [True, False])
+def test_spec_matcher(query, deps, default_mock_concretization):
+    """A matcher agrees with satisfies on concrete and abstract specs."""
+    specs = [
+        s
+        for root in ("mpileaks ^mpich", "mpileaks ^zmpi", "callpath ^mpich2", "dyninst")
+        for s in default_mock_concretization(root).traverse()
+    ]
+    specs += [Spec("mpileaks"), Spec("mpich@3"), Spec("%gcc"), Spec("mpileaks ^mpich")]
+    specs += [Spec(f"/{specs[0].dag_hash()}"), Spec()]
+
+    matcher = SpecMatcher(query, deps=deps)
+    for spec in specs:
+        assert matcher(spec) is spec.satisfies(query, deps=deps), spec
+
+    # Concrete and hash queries
+    for query in (specs[1], Spec(f"/{specs[1].dag_hash()[:7]}")):
+        matcher = SpecMatcher(query, deps=deps)
+        assert [matcher(s) for s in specs] == [s.satisfies(query, deps=deps) for s in specs]
+
 
 @pytest.mark.parametrize(
     "factory,lhs_str,rhs_str,result,constrained_str",
@@ -11,9 +11,11 @@
 import pytest
 
 import spack.cmd
+import spack.parser
 import spack.platforms.test
 import spack.spec
 import spack.variant
+import spack.version
 from spack.parser import (
     UNIX_FILENAME,
     WINDOWS_FILENAME,
@@ -1269,3 +1271,54 @@ def test_git_ref_spec_equivalences(mock_packages, lhs_str, rhs_str, expected):
 def test_platform_is_none_if_not_present(spec_str):
     s = SpecParser(spec_str).next_spec()
     assert s.architecture.platform is None, s
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "zlib",
+        "@1.2:1.4 ~shared",
+        "%gcc@10.2 target=x86_64:",
+        "mpileaks@2.3 +debug cflags=-O3 ^[virtuals=mpi] mpich@3 ^callpath foo=bar",
+    ],
+)
+def test_spec_strings_are_parsed_once(text):
+    """Specs constructed from the same string are copies of a spec parsed once, which
+    is not changed by changing the copies."""
+    cached = spack.parser.parse_one_cached(text)
+    assert cached is not None
+    assert cached is spack.parser.parse_one_cached(text)
+
+    expected = spack.parser.parse_one_or_raise(text)
+    spec = spack.spec.Spec(text)
+    assert spec == cached == expected
+    assert spec is not cached
+
+    for node in spec.traverse():
+        node.versions = spack.version.VersionList(["3.0"])
+        node.compiler_flags.add_flag("cflags", "-g", False)
+        node.variants["static"] = spack.variant.BoolValuedVariant("static", True)
+    assert cached == expected
+    assert str(cached) == str(expected)
+    assert spack.spec.Spec(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "os=fe",
+        "zlib target=default_target",
+        "zlib arch=test-frontend-frontend",
+        "zlib@git.develop",
+        f"zlib@{'a' * 40}=1.2",
+        "./zlib.json",
+    ],
+)
+def test_spec_strings_depending_on_spack_are_not_cached(text):
+    assert spack.parser.parse_one_cached(text) is None
+
+
+def test_spec_string_errors_are_not_cached():
+    for _ in range(2):
+        with pytest.raises(spack.spec.DuplicateCompilerSpecError):
+            spack.spec.Spec("zlib %gcc %clang")
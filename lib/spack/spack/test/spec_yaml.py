@@ -22,6 +22,7 @@
 import spack.paths
 import spack.repo
 import spack.spec
+import spack.util.hash
 import spack.util.spack_json as sjson
 import spack.util.spack_yaml as syaml
 import spack.version
@@ -115,6 +116,54 @@ def test_yaml_subdag(config, mock_packages):
         assert spec[dep].eq_dag(json_spec[dep])
 
 
+def test_concrete_specs_share_architecture_and_compiler(default_mock_concretization):
+    """Concrete nodes read from a specfile share their architecture and compiler, with
+    each other and with their copies, while abstract nodes don't."""
+    spec = Spec.from_json(default_mock_concretization("mpileaks").to_json())
+    assert spec.architecture is spec["callpath"].architecture
+    assert spec.compiler is spec["callpath"].compiler
+    assert spec.name is spack.spec.Spec.from_json(spec.to_json()).name
+
+    # The shared objects cannot be modified, but their copies can
+    with pytest.raises(AttributeError):
+        spec.architecture.os = "debian7"
+    with pytest.raises(AttributeError):
+        spec.compiler.versions = spack.version.VersionList(["=1.0"])
+    arch = spec.architecture.copy()
+    arch.os = "debian7"
+    assert arch != spec.architecture
+
+    copy = spec.copy()
+    assert copy.architecture is spec.architecture
+    assert copy.compiler is spec.compiler
+    copy._mark_concrete(False)
+    assert copy.architecture == spec.architecture
+    assert copy.architecture is not spec.architecture
+    assert copy.compiler is not spec.compiler
+
+    abstract = Spec("mpileaks%gcc arch=test-debian6-core2")
+    first, second = (Spec.from_json(abstract.to_json()) for _ in range(2))
+    assert first.architecture == second.architecture
+    assert first.architecture is not second.architecture
+    assert first.compiler is not second.compiler
+
+
+def test_concrete_specs_share_standard_versions(default_mock_concretization):
+    """Concrete nodes read from a specfile share their standard versions, but not their
+    git versions."""
+    spec = default_mock_concretization("mpileaks ^callpath@1.0")
+    spec["libelf"].versions = spack.version.VersionList([f"{'a' * 40}=0.8.13"])
+    spec["libdwarf"].versions = spack.version.VersionList([f"{'a' * 40}=20130729"])
+
+    first, second = (Spec.from_json(spec.to_json()) for _ in range(2))
+    assert first["callpath"].version is second["callpath"].version
+    assert first["callpath"].versions is not second["callpath"].versions
+    assert first["libelf"].version == second["libelf"].version
+    assert first["libelf"].version is not second["libelf"].version
+    assert first == spec
+    assert first.dag_hash() == spec.dag_hash()
+
+
 def test_using_ordered_dict(mock_packages):
     """Checks that dicts are ordered
 
@@ -291,6 +340,34 @@ def visit_Call(self, node):
     assert [] == find_dicts.nodes
 
 
+@pytest.mark.parametrize("hash", [ht.dag_hash, ht.process_hash, ht.build_hash])
+def test_node_json_is_dump_of_node_dict(hash, default_mock_concretization):
+    """Hashes are computed from JSON text written directly from the spec, which must be
+    the same as the dump of its node dict, or hashes would change."""
+    specs = [
+        default_mock_concretization("mpileaks ^mpich"),
+        default_mock_concretization("dep-diamond-patch-top"),
+        default_mock_concretization("multivalue-variant foo=bar,baz cflags='-O2 -g'"),
+        Spec("zlib@1.2:1.3,2.0 %gcc@10: os=debian6 target=x86_64 +foo bar='é x' ^libelf"),
+        Spec("mpileaks@2.3 platform=test target=core2 ^[virtuals=mpi] mpich"),
+        Spec(),
+    ]
+    external = default_mock_concretization("externaltool")
+    assert external.external
+    specs.append(external)
+    spliced = default_mock_concretization("splice-t")
+    specs.append(spliced.splice(default_mock_concretization("splice-h+foo"), True))
+    assert specs[-1].build_spec is not specs[-1]
+
+    for spec in specs:
+        for node in spec.traverse():
+            expected = sjson.dump(node.to_node_dict(hash=hash))
+            assert node._node_json(hash) == expected
+            # Spliced nodes keep the end of the hash of their build spec
+            if node.build_spec is node:
+                assert node.spec_hash(hash) == spack.util.hash.b32_hash(expected)
+
+
 def reverse_all_dicts(data):
     """Descend into data and reverse all the dictionaries"""
     if isinstance(data, dict):
@@ -534,6 +534,38 @@ def test_from_node_dict():
     assert type(a) is BoolValuedVariant
 
 
+@pytest.mark.parametrize(
+    "value,cls",
+    [
+        (["bar", "baz"], MultiValuedVariant),
+        ([], MultiValuedVariant),
+        ("bar", SingleValuedVariant),
+        ("*", SingleValuedVariant),
+        ("bar,baz", SingleValuedVariant),
+        ("bar , baz", SingleValuedVariant),
+        (True, BoolValuedVariant),
+        (False, BoolValuedVariant),
+        ("False", BoolValuedVariant),
+    ],
+)
+def test_from_node_dict_equals_constructor(value, cls):
+    """Variants read from a node dict without the value setter are the same as the
+    ones constructed from the same value."""
+    if cls is SingleValuedVariant and "," in value:
+        with pytest.raises(MultipleValuesInExclusiveVariantError):
+            MultiValuedVariant.from_node_dict("foo", value)
+        return
+
+    variant = MultiValuedVariant.from_node_dict("foo", value)
+    expected = cls("foo", value)
+    assert type(variant) is cls
+    assert variant == expected
+    assert variant.value == expected.value
+    assert variant.propagate is False
+    assert str(variant) == str(expected)
+    assert variant.yaml_entry() == expected.yaml_entry()
+
+
 class TestVariant:
     def test_validation(self):
         a = Variant(
@@ -9,6 +9,7 @@
 """
 import os
 import pathlib
+import random
 
 import pytest
 
@@ -1015,3 +1016,54 @@ def test_semver_regex(tag, expected):
         assert result is None
     else:
         assert result.group() == expected
+
+
+@pytest.mark.parametrize(
+    "lhs,rhs",
+    [
+        ("1.2", "1.10"),
+        ("1.2a", "1.2"),
+        ("1.2", "1.2.0"),
+        ("1.2", "1.2develop"),
+        ("main", "develop"),
+        ("1.2.3", "master"),
+        ("1.2alpha", "1.2beta"),
+        ("infinity", "2024.01"),
+    ],
+)
+def test_sort_key_compares_like_components(lhs, rhs):
+    """The precomputed keys of versions must order them as their components do."""
+    lhs, rhs = StandardVersion.from_string(lhs), StandardVersion.from_string(rhs)
+    for a, b in ((lhs, rhs), (rhs, lhs), (lhs, lhs)):
+        assert (a.key < b.key) == (a.version < b.version)
+        assert (a.key == b.key) == (a.version == b.version)
+
+
+def test_version_list_bisection_matches_scanning():
+    """Operations on version lists only look at the elements around the position of an
+    item, and must give the same results as checking all the elements."""
+    rng = random.Random(0)
+    pool = ["1", "1.1", "1.2", "2", "2.1", "3", "develop"]
+
+    def random_item():
+        choice = rng.random()
+        if choice < 0.3:
+            return f"={rng.choice(pool)}"
+        if choice < 0.4:
+            return f"{'a' * 40}={rng.choice(pool)}"
+        if choice < 0.6:
+            return rng.choice(pool)
+        lo, hi = sorted(rng.sample(range(len(pool)), 2))
+        return f"{rng.choice(['', pool[lo]])}:{rng.choice(['', pool[hi]])}"
+
+    for _ in range(500):
+        lhs_items = [random_item() for _ in range(rng.randint(1, 5))]
+        rhs_items = [random_item() for _ in range(rng.randint(1, 5))]
+        lhs, rhs = VersionList(lhs_items), VersionList(rhs_items)
+
+        # The union is merged linearly, while the constructor adds items one at a time
+        assert lhs.union(rhs) == VersionList(lhs_items + rhs_items)
+        assert lhs.satisfies(rhs) == all(any(x.satisfies(y) for y in rhs) for x in lhs)
+        for item in rhs:
+            if not isinstance(item, GitVersion):
+                assert lhs.intersects(item) == any(x.intersects(item) for x in lhs)
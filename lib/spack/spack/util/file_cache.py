@@ -97,7 +97,7 @@ def init_entry(self, key):
             self._get_lock(key)
         return exists
 
-    def read_transaction(self, key):
+    def read_transaction(self, key, binary=False):
         """Get a read transaction on a file cache item.
 
         Returns a ReadTransaction context manager and opens the cache file for
@@ -106,17 +106,23 @@ def read_transaction(self, key):
            with file_cache_object.read_transaction(key) as cache_file:
                cache_file.read()
 
+        The file is opened in binary mode if ``binary`` is True.
         """
-        return ReadTransaction(self._get_lock(key), acquire=lambda: open(self.cache_path(key)))
+        mode = "rb" if binary else "r"
+        return ReadTransaction(
+            self._get_lock(key), acquire=lambda: open(self.cache_path(key), mode)
+        )
 
-    def write_transaction(self, key):
+    def write_transaction(self, key, binary=False):
         """Get a write transaction on a file cache item.
 
         Returns a WriteTransaction context manager that opens a temporary file
         for writing.  Once the context manager finishes, if nothing went wrong,
         moves the file into place on top of the old file atomically.
 
+        The files are opened in binary mode if ``binary`` is True.
         """
+        suffix = "b" if binary else ""
         filename = self.cache_path(key)
         if os.path.exists(filename) and not os.access(filename, os.W_OK):
             raise CacheError(
@@ -132,10 +138,10 @@ def __enter__(cm):
                 cm.orig_filename = self.cache_path(key)
                 cm.orig_file = None
                 if os.path.exists(cm.orig_filename):
-                    cm.orig_file = open(cm.orig_filename, "r")
+                    cm.orig_file = open(cm.orig_filename, "r" + suffix)
 
                 cm.tmp_filename = self.cache_path(key) + ".tmp"
-                cm.tmp_file = open(cm.tmp_filename, "w")
+                cm.tmp_file = open(cm.tmp_filename, "w" + suffix)
 
                 return cm.orig_file, cm.tmp_file
 
@@ -12,6 +12,7 @@
 import io
 import itertools
 import re
+import sys
 
 import llnl.util.lang as lang
 import llnl.util.tty.color
@@ -242,6 +243,8 @@ class AbstractVariant:
     values.
     """
 
+    __slots__ = ("name", "propagate", "_value", "_original_value")
+
     def __init__(self, name, value, propagate=False):
         self.name = name
         self.propagate = propagate
@@ -254,20 +257,41 @@ def __init__(self, name, value, propagate=False):
         # Invokes property setter
         self.value = value
 
+    @classmethod
+    def _from_values(cls, name, value, original_value):
+        """Create a variant from values that are known to be valid, without going
+        through the value setter."""
+        variant = cls.__new__(cls)
+        variant.name = name
+        variant.propagate = False
+        variant._value = value
+        variant._original_value = original_value
+        return variant
+
     @staticmethod
     def from_node_dict(name, value):
         """Reconstruct a variant from a node dict."""
+        # The same names and values recur in most nodes of a DAG, so keep one copy
+        name = sys.intern(name)
         if isinstance(value, list):
             # read multi-value variants in and be faithful to the YAML
-            mvar = MultiValuedVariant(name, ())
-            mvar._value = tuple(value)
-            mvar._original_value = mvar._value
-            return mvar
+            value = tuple(sys.intern(x) if type(x) is str else x for x in value)
+            return MultiValuedVariant._from_values(name, value, value)
+
+        elif value is True or value is False:
+            return BoolValuedVariant._from_values(name, value, value)
 
         elif str(value).upper() == "TRUE" or str(value).upper() == "FALSE":
             return BoolValuedVariant(name, value)
 
-        return SingleValuedVariant(name, value)
+        elif type(value) is str and "," not in value:
+            # A single value, which the value setter would store unchanged
+            value = sys.intern(value)
+            return SingleValuedVariant._from_values(name, value, value)
+
+        svar = SingleValuedVariant(name, value)
+        svar._value = sys.intern(svar._value)
+        return svar
 
     def yaml_entry(self):
         """Returns a key, value tuple suitable to be an entry in a yaml dict.
@@ -332,7 +356,10 @@ def copy(self):
         >>> assert a == b
         >>> assert a is not b
         """
-        return type(self)(self.name, self._original_value, self.propagate)
+        # The value was validated already, and is immutable
+        clone = type(self)._from_values(self.name, self._value, self._original_value)
+        clone.propagate = self.propagate
+        return clone
 
     @implicit_variant_conversion
     def satisfies(self, other):
@@ -411,6 +438,9 @@ def __str__(self):
 class MultiValuedVariant(AbstractVariant):
     """A variant that can hold multiple values at once."""
 
+    # Order of the patches, for the "patches" variant
+    __slots__ = ("_patches_in_order_of_appearance",)
+
     @implicit_variant_conversion
     def satisfies(self, other):
         """Returns true if ``other.name == self.name`` and ``other.value`` is
@@ -456,6 +486,8 @@ def __str__(self):
 class SingleValuedVariant(AbstractVariant):
     """A variant that can hold multiple values, but one at a time."""
 
+    __slots__ = ()
+
     def _value_setter(self, value):
         # Treat the value as a multi-valued variant
         super()._value_setter(value)
@@ -512,6 +544,8 @@ class BoolValuedVariant(SingleValuedVariant):
     BoolValuedVariant can also hold the value '*', for coerced
     comparisons between ``foo=*`` and ``+foo`` or ``~foo``."""
 
+    __slots__ = ()
+
     def _value_setter(self, value):
         # Check the string representation of the value and turn
         # it to a boolean
@@ -543,6 +577,8 @@ class VariantMap(lang.HashableMap):
     if the key is not already present.
     """
 
+    __slots__ = ("spec",)
+
     def __init__(self, spec):
         super().__init__()
         self.spec = spec
@@ -597,7 +633,7 @@ def constrain(self, other):
         Returns:
             bool: True or False
         """
-        if other.spec is not None and other.spec._concrete:
+        if other._of_concrete_spec():
             for k in self:
                 if k not in other:
                     raise UnsatisfiableVariantSpecError(self[k], "<absent>")
@@ -624,7 +660,11 @@ def concrete(self):
         Returns:
             bool: True or False
         """
-        return self.spec._concrete or all(v in self for v in self.spec.package_class.variants)
+        return self._of_concrete_spec() or all(v in self for v in self.spec.package_class.variants)
+
+    def _of_concrete_spec(self) -> bool:
+        """Whether these are the variants of a concrete spec."""
+        return self.spec is not None and self.spec._concrete
 
     def copy(self):
         """Return an instance of VariantMap equivalent to self.
@@ -633,8 +673,8 @@ def copy(self):
             VariantMap: a copy of self
         """
         clone = VariantMap(self.spec)
-        for name, variant in self.items():
-            clone[name] = variant.copy()
+        # The variants were checked when added to self
+        clone.dict = {name: variant.copy() for name, variant in self.dict.items()}
         return clone
 
     def __str__(self):
@@ -93,19 +93,43 @@ def parse_string_components(string: str) -> Tuple[tuple, tuple]:
     return version, separators
 
 
+def sort_key(version: tuple) -> tuple:
+    """Return a key that compares like the components of a version, but is made of ints
+    and strings only, so that comparing two keys is done by the interpreter without calling
+    the comparison methods of ``VersionStrComponent``.
+
+    Each component is mapped to a pair, whose first item orders strings before numbers,
+    and numbers before infinity-like strings.
+    """
+    key = []
+    for component in version:
+        if type(component) is int:
+            key.append(1)
+            key.append(component)
+        elif isinstance(component.data, int):
+            key.append(2)
+            key.append(component.data)
+        else:
+            key.append(0)
+            key.append(component.data)
+    return tuple(key)
+
+
 class ConcreteVersion:
-    pass
+    __slots__ = ()
 
 
 class StandardVersion(ConcreteVersion):
     """Class to represent versions"""
 
-    __slots__ = ["version", "string", "separators"]
+    __slots__ = ["version", "string", "separators", "key"]
 
     def __init__(self, string: Optional[str], version: tuple, separators: tuple):
         self.string = string
         self.version = version
         self.separators = separators
+        #: precomputed key used to compare versions, see ``sort_key``
+        self.key = sort_key(version)
 
     @staticmethod
     def from_string(string: str):
@@ -124,43 +148,43 @@ def __bool__(self):
 
     def __eq__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version == other.version
+            return self.key == other.key
         return False
 
     def __ne__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version != other.version
+            return self.key != other.key
         return True
 
     def __lt__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version < other.version
+            return self.key < other.key
         if isinstance(other, ClosedOpenRange):
             # Use <= here so that Version(x) < ClosedOpenRange(Version(x), ...).
-            return self <= other.lo
+            return self.key <= other.lo.key
         return NotImplemented
 
     def __le__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version <= other.version
+            return self.key <= other.key
         if isinstance(other, ClosedOpenRange):
             # Versions are never equal to ranges, so follow < logic.
-            return self <= other.lo
+            return self.key <= other.lo.key
         return NotImplemented
 
     def __ge__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version >= other.version
+            return self.key >= other.key
         if isinstance(other, ClosedOpenRange):
             # Versions are never equal to ranges, so follow > logic.
-            return self > other.lo
+            return self.key > other.lo.key
         return NotImplemented
 
     def __gt__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version > other.version
+            return self.key > other.key
         if isinstance(other, ClosedOpenRange):
-            return self > other.lo
+            return self.key > other.lo.key
         return NotImplemented
 
     def __iter__(self):
@@ -205,7 +229,7 @@ def __repr__(self) -> str:
         return f'Version("{str(self)}")'
 
     def __hash__(self):
-        return hash(self.version)
+        return hash(self.key)
 
     def __contains__(rhs, lhs):
         # We should probably get rid of `x in y` for versions, since
@@ -594,6 +618,8 @@ def up_to(self, index) -> StandardVersion:
 
 
 class ClosedOpenRange:
+    __slots__ = ["lo", "hi"]
+
     def __init__(self, lo: StandardVersion, hi: StandardVersion):
         if hi < lo:
             raise EmptyRangeError(f"{lo}..{hi} is an empty range")
@@ -622,49 +648,48 @@ def __repr__(self):
         return str(self)
 
     def __hash__(self):
-        # prev_version for backward compat.
-        return hash((self.lo, prev_version(self.hi)))
+        return hash((self.lo.key, self.hi.key))
 
     def __eq__(self, other):
         if isinstance(other, StandardVersion):
             return False
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) == (other.lo, other.hi)
+            return self.lo.key == other.lo.key and self.hi.key == other.hi.key
         return NotImplemented
 
     def __ne__(self, other):
         if isinstance(other, StandardVersion):
             return True
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) != (other.lo, other.hi)
+            return self.lo.key != other.lo.key or self.hi.key != other.hi.key
         return NotImplemented
 
     def __lt__(self, other):
         if isinstance(other, StandardVersion):
             return other > self
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) < (other.lo, other.hi)
+            return (self.lo.key, self.hi.key) < (other.lo.key, other.hi.key)
         return NotImplemented
 
     def __le__(self, other):
         if isinstance(other, StandardVersion):
             return other >= self
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) <= (other.lo, other.hi)
+            return (self.lo.key, self.hi.key) <= (other.lo.key, other.hi.key)
         return NotImplemented
 
     def __ge__(self, other):
         if isinstance(other, StandardVersion):
             return other <= self
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) >= (other.lo, other.hi)
+            return (self.lo.key, self.hi.key) >= (other.lo.key, other.hi.key)
         return NotImplemented
 
     def __gt__(self, other):
         if isinstance(other, StandardVersion):
             return other < self
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) > (other.lo, other.hi)
+            return (self.lo.key, self.hi.key) > (other.lo.key, other.hi.key)
         return NotImplemented
 
     def __contains__(rhs, lhs):
@@ -674,22 +699,22 @@ def __contains__(rhs, lhs):
 
     def intersects(self, other: Union[ConcreteVersion, "ClosedOpenRange", "VersionList"]):
         if isinstance(other, StandardVersion):
-            return self.lo <= other < self.hi
+            return self.lo.key <= other.key < self.hi.key
         if isinstance(other, GitVersion):
-            return self.lo <= other.ref_version < self.hi
+            return self.lo.key <= other.ref_version.key < self.hi.key
         if isinstance(other, ClosedOpenRange):
-            return (self.lo < other.hi) and (other.lo < self.hi)
+            return self.lo.key < other.hi.key and other.lo.key < self.hi.key
         if isinstance(other, VersionList):
-            return any(self.intersects(rhs) for rhs in other)
+            return other.intersects(self)
         raise ValueError(f"Unexpected type {type(other)}")
 
     def satisfies(self, other: Union["ClosedOpenRange", ConcreteVersion, "VersionList"]):
         if isinstance(other, ConcreteVersion):
             return False
         if isinstance(other, ClosedOpenRange):
-            return not (self.lo < other.lo or other.hi < self.hi)
+            return other.lo.key <= self.lo.key and self.hi.key <= other.hi.key
         if isinstance(other, VersionList):
-            return any(self.satisfies(rhs) for rhs in other)
+            return any(self.satisfies(rhs) for rhs in other._neighbors(self))
         raise ValueError(other)
 
     def overlaps(self, other: Union["ClosedOpenRange", ConcreteVersion, "VersionList"]) -> bool:
@@ -728,7 +753,13 @@ def intersection(self, other: Union["ClosedOpenRange", ConcreteVersion]):
 
 
 class VersionList:
-    """Sorted, non-redundant list of Version and ClosedOpenRange elements."""
+    """Sorted, non-redundant list of Version and ClosedOpenRange elements.
+
+    Since the elements are sorted and disjoint, only the two elements around the position
+    of an item in the list can contain it, or intersect it, which are found by bisection.
+    """
+
+    __slots__ = ["versions"]
 
     def __init__(self, vlist=None):
         self.versions: List[StandardVersion, GitVersion, ClosedOpenRange] = []
@@ -745,7 +776,7 @@ def __init__(self, vlist=None):
 
     def add(self, item):
         if isinstance(item, ConcreteVersion):
-            i = bisect_left(self, item)
+            i = bisect_left(self.versions, item)
             # Only insert when prev and next are not intersected.
             if (i == 0 or not item.intersects(self[i - 1])) and (
                 i == len(self) or not item.intersects(self[i])
@@ -753,7 +784,7 @@ def add(self, item):
                 self.versions.insert(i, item)
 
         elif isinstance(item, ClosedOpenRange):
-            i = bisect_left(self, item)
+            i = bisect_left(self.versions, item)
 
             # Note: can span multiple concrete versions to the left,
             # For instance insert 1.2: into [1.2, hash=1.2, 1.3]
@@ -794,7 +825,18 @@ def concrete_range_as_version(self) -> Optional[ConcreteVersion]:
         return None
 
     def copy(self):
-        return VersionList(self)
+        # The versions are already sorted and non-redundant
+        clone = VersionList()
+        clone.versions = list(self.versions)
+        return clone
+
+    def _neighbors(self, item) -> list:
+        """Return the elements of the list that can contain, or intersect, item."""
+        versions = self.versions
+        if len(versions) < 3:
+            return versions
+        i = bisect_left(versions, item)
+        return versions[i - 1 : i + 1] if i else versions[:1]
 
     def lowest(self) -> Optional[StandardVersion]:
         """Get the lowest version in the list."""
@@ -817,7 +859,7 @@ def satisfies(self, other) -> bool:
         # This exploits the fact that version lists are "reduced" and normalized, so we can
         # never have a list like [1:3, 2:4] since that would be normalized to [1:4]
         if isinstance(other, VersionList):
-            return all(any(lhs.satisfies(rhs) for rhs in other) for lhs in self)
+            return all(any(lhs.satisfies(rhs) for rhs in other._neighbors(lhs)) for lhs in self)
 
         if isinstance(other, (ConcreteVersion, ClosedOpenRange)):
             return all(lhs.satisfies(other) for lhs in self)
@@ -837,7 +879,7 @@ def intersects(self, other):
             return False
 
         if isinstance(other, (ClosedOpenRange, StandardVersion)):
-            return any(v.intersects(other) for v in self)
+            return any(v.intersects(other) for v in self._neighbors(other))
 
         raise ValueError(f"Unsupported type {type(other)}")
 
@@ -860,8 +902,17 @@ def from_dict(dictionary):
         raise ValueError("Dict must have 'version' or 'versions' in it.")
 
     def update(self, other: "VersionList"):
-        for v in other.versions:
-            self.add(v)
+        # Merge the two sorted lists (sorting two runs is a linear merge), and add each
+        # item to the end of the result, which can only intersect its last elements
+        versions: list = []
+        for item in sorted(self.versions + other.versions):
+            if isinstance(item, ClosedOpenRange):
+                while versions and item.intersects(versions[-1]):
+                    item = item.union(versions.pop())
+            elif versions and item.intersects(versions[-1]):
+                continue
+            versions.append(item)
+        self.versions = versions
 
     def union(self, other: "VersionList"):
         result = self.copy()
@@ -872,11 +923,8 @@ def intersection(self, other: "VersionList") -> "VersionList":
         result = VersionList()
         for lhs, rhs in ((self, other), (other, self)):
             for x in lhs:
-                i = bisect_left(rhs.versions, x)
-                if i > 0:
-                    result.add(rhs[i - 1].intersection(x))
-                if i < len(rhs):
-                    result.add(rhs[i].intersection(x))
+                for y in rhs._neighbors(x):
+                    result.add(y.intersection(x))
         return result
 
     def intersect(self, other) -> bool:
@@ -891,7 +939,7 @@ def intersect(self, other) -> bool:
 
     def __contains__(self, other):
         if isinstance(other, (ClosedOpenRange, StandardVersion)):
-            i = bisect_left(self, other)
+            i = bisect_left(self.versions, other)
             return (i > 0 and other in self[i - 1]) or (i < len(self) and other in self[i])
 
         if isinstance(other, VersionList):
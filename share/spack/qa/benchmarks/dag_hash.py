@@ -0,0 +1,74 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmark the computation of the hashes of a large DAG.
+
+Reads a generated specfile, then times computing the DAG hash and the process hash
+of all its nodes, from the leaves up, both with ``Spec.spec_hash`` and by hashing
+the JSON dump of ``Spec.to_node_dict``, which is what ``spec_hash`` used to do.
+The hashes computed in the two ways are checked to be the same.
+
+Run with::
+
+    spack python share/spack/qa/benchmarks/dag_hash.py --nodes 30000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import spack.hash_types as ht
+import spack.spec
+import spack.util.hash
+import spack.util.spack_json as sjson
+
+# "spack python" does not set __file__ for scripts
+sys.path.insert(0, os.path.dirname(os.path.abspath(sys.argv[0])))
+from spec_memory import write_specfile  # noqa: E402
+
+
+def node_dict_hash(spec, hash):
+    """Hash of a node computed from the JSON dump of its node dict"""
+    return spack.util.hash.b32_hash(sjson.dump(spec.to_node_dict(hash=hash)))
+
+
+def timed_hashes(nodes, hash, hash_fn):
+    """Compute the hashes of all the nodes, children first, after clearing the cached
+    ones, and return the time it took and the hashes."""
+    for node in nodes:
+        setattr(node, hash.attr, None)
+    start = time.perf_counter()
+    for node in nodes:
+        setattr(node, hash.attr, hash_fn(node, hash))
+    elapsed = time.perf_counter() - start
+    return elapsed, [getattr(node, hash.attr) for node in nodes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=30000, help="nodes in the DAG")
+    parser.add_argument("--max-deps", type=int, default=6, help="dependencies per node")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of the benchmark")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "spec.json")
+        write_specfile(path, args.nodes, args.max_deps)
+        with open(path) as f:
+            spec = spack.spec.Spec.from_json(f)
+
+    nodes = list(spec.traverse(order="post"))
+    print(f"{'HASH':>14} {'NODE DICT (s)':>14} {'STREAMED (s)':>14} {'SPEEDUP':>8}")
+    for hash in (ht.dag_hash, ht.process_hash):
+        old = [timed_hashes(nodes, hash, node_dict_hash) for _ in range(args.repeat)]
+        new = [timed_hashes(nodes, hash, spack.spec.Spec.spec_hash) for _ in range(args.repeat)]
+        if old[0][1] != new[0][1]:
+            raise RuntimeError(f"the {hash.name} of the two methods differ")
+        old_time, new_time = min(t for t, _ in old), min(t for t, _ in new)
+        print(f"{hash.name:>14} {old_time:>14.3f} {new_time:>14.3f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmark the time and memory needed to read a large install database.
+
+Generates the index of a synthetic store with many records, then measures the
+time, and the growth of the peak and final resident memory, of the following
+actions, each in a fresh process:
+
+  * ``read``: reading the index, which does not build any spec
+  * ``query``: reading the index, and querying a package by name
+  * ``load all``: reading the index, and building the specs of all the records
+  * ``eager``: reading the same index marked with the previous version, which
+    builds the specs of all the records while reading, like all versions used to
+
+Run with::
+
+    spack python share/spack/qa/benchmarks/database_load.py --stacks 30 --packages 1000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import string
+import sys
+import tempfile
+import time
+import uuid
+
+import spack.database
+
+
+def _hash(rng):
+    return "".join(rng.choice(string.ascii_lowercase + "234567") for _ in range(32))
+
+
+def _node(name, hash, dependencies):
+    return {
+        "name": name,
+        "version": "1.0",
+        "arch": {
+            "platform": "linux",
+            "platform_os": "centos8",
+            "target": {
+                "name": "x86_64",
+                "vendor": "GenuineIntel",
+                "features": [],
+                "generation": 0,
+                "parents": [],
+            },
+        },
+        "compiler": {"name": "gcc", "version": "12.3.0"},
+        "namespace": "builtin",
+        "parameters": {
+            "build_system": "generic",
+            "shared": True,
+            "cflags": [],
+            "cppflags": [],
+            "cxxflags": [],
+            "fflags": [],
+            "ldflags": [],
+            "ldlibs": [],
+        },
+        "package_hash": hash + "=" * 4,
+        "dependencies": [
+            {
+                "name": dname,
+                "hash": dhash,
+                "parameters": {"deptypes": ["build", "link"], "virtuals": []},
+            }
+            for dname, dhash in dependencies
+        ],
+        "hash": hash,
+    }
+
+
+def write_index(root, stacks, packages, max_deps, seed=0):
+    """Write the index of a store with ``stacks`` configurations of a software stack
+    of ``packages`` packages, where each package depends on up to ``max_deps`` of
+    the packages preceding it in the stack."""
+    rng = random.Random(seed)
+    installs = {}
+    for _ in range(stacks):
+        keys = []
+        for i in range(packages):
+            name, hash = f"pkg-{i}", _hash(rng)
+            candidates = range(max(0, i - 100), i)
+            chosen = rng.sample(candidates, min(len(candidates), rng.randint(0, max_deps)))
+            dependencies = [(f"pkg-{j}", keys[j]) for j in chosen]
+            for _, dhash in dependencies:
+                installs[dhash]["ref_count"] += 1
+            installs[hash] = {
+                "spec": _node(name, hash, dependencies),
+                "ref_count": 0,
+                "path": os.path.join(root, f"{name}-{hash}"),
+                "installed": True,
+                "explicit": False,
+                "installation_time": time.time(),
+                "deprecated_for": None,
+            }
+            keys.append(hash)
+
+    for version, subdir in (("7", "lazy"), ("6", "eager")):
+        if version == "6":
+            # Dependencies have no virtuals in the previous version
+            for rec in installs.values():
+                for dep in rec["spec"]["dependencies"]:
+                    dep["type"] = dep.pop("parameters")["deptypes"]
+        db_dir = os.path.join(root, subdir, ".spack-db")
+        os.makedirs(db_dir)
+        with open(os.path.join(db_dir, "index.json"), "w") as f:
+            json.dump({"database": {"version": version, "installs": installs}}, f)
+        # Without a verifier, every transaction reads the index again
+        with open(os.path.join(db_dir, "index_verifier"), "w") as f:
+            f.write(str(uuid.uuid4()))
+    return len(installs)
+
+
+def _rss():
+    """Current resident set size in bytes, or 0 if not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return 0
+
+
+def _measure(root, action, queue):
+    rss_before, peak_rss_before = _rss(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    db_root = os.path.join(root, "eager" if action == "eager" else "lazy")
+    db = spack.database.Database(db_root, lock_cfg=spack.database.NO_LOCK)
+    with db.read_transaction():
+        pass
+    if action == "query":
+        db.query_local("pkg-10")
+    elif action == "load all":
+        db.load_all_specs()
+    elapsed = time.perf_counter() - start
+    rss, peak_rss = _rss(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    queue.put((elapsed, (peak_rss - peak_rss_before) * scale, rss - rss_before))
+
+
+def _in_process(target, *args):
+    """Return the result a function puts in a queue, run in a new process.
+
+    A forked process starts with the peak RSS of its parent, so the parent must not
+    hold the records of the index.
+    """
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    process = ctx.Process(target=target, args=(*args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def _write_index(root, stacks, packages, max_deps, queue):
+    queue.put(write_index(root, stacks, packages, max_deps))
+
+
+def measure(root, action):
+    """Return the time, and the growth of the peak and of the final RSS, of an action
+    run in a new process."""
+    return _in_process(_measure, root, action)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stacks", type=int, default=30, help="configurations of the stack")
+    parser.add_argument("--packages", type=int, default=1000, help="packages in the stack")
+    parser.add_argument("--max-deps", type=int, default=6, help="dependencies per package")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each action")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        records = _in_process(_write_index, root, args.stacks, args.packages, args.max_deps)
+        size = os.path.getsize(os.path.join(root, "lazy", ".spack-db", "index.json"))
+        print(f"{records} records, index of {size / 2**20:.1f} MiB")
+        print(f"{'ACTION':<10} {'TIME (s)':>10} {'PEAK RSS (MiB)':>16} {'FINAL RSS (MiB)':>16}")
+        for action in ("read", "query", "load all", "eager"):
+            results = [measure(root, action) for _ in range(args.repeat)]
+            elapsed, peak_rss, rss = (min(r[i] for r in results) for i in range(3))
+            print(f"{action:<10} {elapsed:>10.3f} {peak_rss / 2**20:>16.1f} {rss / 2**20:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmark the setup of the solver.
+
+Times the generation of the ASP problem for a few specs, without the package facts
+cache, with an empty one, and with one holding the facts of all the possible packages,
+which is what happens when the same packages are concretized again. The cache is kept
+in a temporary directory. With ``--jobs``, also times the generation of the facts of
+packages by that many processes. Checks that the problem is the same in all cases.
+
+Run with::
+
+    spack python share/spack/qa/benchmarks/solver_setup.py hdf5+mpi py-scipy
+"""
+import argparse
+import tempfile
+import time
+
+import spack.config
+import spack.solver.asp
+import spack.solver.cache
+import spack.spec
+
+
+def timed(specs, repeat, setup=lambda: None):
+    """Minimum time over ``repeat`` runs of the setup of the solver, and the problem."""
+    times = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        problem = spack.solver.asp.SpackSolverSetup().setup(specs)
+        times.append(time.perf_counter() - start)
+    return min(times), problem
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs of the benchmark")
+    parser.add_argument("--jobs", type=int, default=1, help="processes generating package facts")
+    parser.add_argument("specs", nargs="*", default=["hdf5+mpi"], help="specs to solve for")
+    args = parser.parse_args()
+
+    specs = [spack.spec.Spec(s) for s in args.specs]
+    with spack.config.override("concretizer:package_facts_cache", {"enable": False}):
+        results = [("no cache",) + timed(specs, args.repeat)]
+        if args.jobs > 1:
+            with spack.config.override("concretizer:package_facts_processes", args.jobs):
+                results.append((f"no cache, -j{args.jobs}",) + timed(specs, args.repeat))
+    with tempfile.TemporaryDirectory() as misc_cache:
+        scope = {
+            "config": {"misc_cache": misc_cache},
+            "concretizer": {"package_facts_cache": {"enable": True}},
+        }
+        with spack.config.override(spack.config.InternalConfigScope("benchmark", scope)):
+            cache = spack.solver.cache.package_facts_cache()
+            results.append(("empty cache",) + timed(specs, args.repeat, setup=cache.destroy))
+            results.append(("full cache",) + timed(specs, args.repeat))
+
+    print(f"{'CACHE':>16} {'TIME (s)':>10}")
+    for name, elapsed, _ in results:
+        print(f"{name:>16} {elapsed:>10.3f}")
+    assert all(problem == results[0][2] for _, _, problem in results), "problems differ"
+
+
+if __name__ == "__main__":
+    main()
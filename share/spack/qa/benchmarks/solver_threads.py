@@ -0,0 +1,88 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmark the solver with multiple threads.
+
+Times the grounding and solving of a few problems that are expensive to solve, first with
+each configuration of the portfolio on a single thread, and then with the portfolio on an
+increasing number of threads. The configuration that found the optimum is reported, which
+helps to choose the configurations of the portfolio, their order, and the default of
+``concretizer:solver_threads``. Also checks that the optimal score is the same in all
+cases.
+
+Each problem is either a spec, or the root specs of an environment, solved together::
+
+    spack python share/spack/qa/benchmarks/solver_threads.py trilinos py-torch -e myenv
+
+Without arguments, the problems are the fixed corpus below: a few specs that took more than
+20 seconds to concretize with the builtin repository, and the environment in
+``solver_corpus``. Pass ``--threads ""`` to only time the configurations on a single thread.
+"""
+import argparse
+import os
+
+import spack.config
+import spack.environment as ev
+import spack.paths
+import spack.solver.asp
+import spack.spec
+
+#: Specs solved when none are given on the command line
+CORPUS_SPECS = ["hdf5+mpi", "trilinos", "py-torch", "mfem+petsc", "ascent"]
+
+#: Environment solved when no specs are given on the command line
+CORPUS_ENV = os.path.join(spack.paths.share_path, "qa", "benchmarks", "solver_corpus")
+
+
+def timed(specs, repeat, threads, portfolio):
+    """Minimum time over ``repeat`` runs of grounding and solving, with the score of the
+    optimum and the configuration that found it."""
+    times = []
+    for _ in range(repeat):
+        driver = spack.solver.asp.PyclingoDriver()
+        setup = spack.solver.asp.SpackSolverSetup()
+        control = spack.solver.asp.portfolio_clingo_control(threads, portfolio)
+        result, timer, _ = driver.solve(setup, specs, control=control)
+        times.append(timer.duration("ground") + timer.duration("solve"))
+    winner = spack.solver.asp.winning_configuration(control, portfolio)
+    return min(times), result.answers[0][0], winner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs of the benchmark")
+    parser.add_argument(
+        "--threads", default="2,4,8", help="comma separated numbers of threads to solve with"
+    )
+    parser.add_argument(
+        "-e", "--env", action="append", default=[], help="environments to solve for"
+    )
+    parser.add_argument("specs", nargs="*", help="specs to solve for")
+    args = parser.parse_args()
+    if not args.specs and not args.env:
+        args.specs, args.env = CORPUS_SPECS, [CORPUS_ENV]
+
+    threads = [int(n) for n in args.threads.split(",") if n]
+    problems = [(s, [spack.spec.Spec(s)]) for s in args.specs]
+    for name in args.env:
+        env = ev.read(name) if ev.exists(name) else ev.Environment(name)
+        problems.append((f"env {name}", [s.copy() for s in env.user_specs]))
+
+    portfolio = spack.solver.asp.SOLVER_PORTFOLIO
+    runs = [(f"{entry[0]}, -t1", 1, [entry]) for entry in portfolio]
+    runs.extend((f"portfolio, -t{n}", n, portfolio) for n in threads)
+
+    print(f"{'PROBLEM':>24} {'CONFIGURATION':>24} {'TIME (s)':>10} {'WINNER':>32}")
+    with spack.config.override("concretizer:concretization_cache", {"enable": False}):
+        for problem, specs in problems:
+            scores = set()
+            for run, n, configurations in runs:
+                elapsed, score, winner = timed(specs, args.repeat, n, configurations)
+                scores.add(tuple(score))
+                print(f"{problem:>24} {run:>24} {elapsed:>10.3f} {winner:>32}")
+            assert len(scores) == 1, f"the optimal scores for {problem} differ"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmark copying a large concrete DAG.
+
+Reads a generated specfile, then times ``Spec.copy`` of the whole DAG, and of all
+its nodes one by one without dependencies, as done when splicing or when building
+the specs from a solve. The memory allocated by one copy of the DAG is measured
+with ``tracemalloc``, and reported also per node.
+
+Run with::
+
+    spack python share/spack/qa/benchmarks/spec_copy.py --nodes 30000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import spack.spec
+
+# "spack python" does not set __file__ for scripts
+sys.path.insert(0, os.path.dirname(os.path.abspath(sys.argv[0])))
+from spec_memory import write_specfile  # noqa: E402
+
+
+def timed(fn, repeat):
+    """Return the best time of ``repeat`` calls to fn"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def allocated(fn):
+    """Return the memory allocated by fn, and still alive once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=30000, help="nodes in the DAG")
+    parser.add_argument("--max-deps", type=int, default=6, help="dependencies per node")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of the benchmark")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "spec.json")
+        write_specfile(path, args.nodes, args.max_deps)
+        with open(path) as f:
+            spec = spack.spec.Spec.from_json(f)
+
+    nodes = list(spec.traverse())
+    dag_time = timed(spec.copy, args.repeat)
+    nodes_time = timed(lambda: [s.copy(deps=False) for s in nodes], args.repeat)
+    size, copy = allocated(spec.copy)
+    if copy != spec or copy.dag_hash() != spec.dag_hash():
+        raise RuntimeError("the copy differs from the original DAG")
+
+    print(
+        f"{'NODES':>8} {'DAG COPY (s)':>14} {'NODE COPIES (s)':>16} {'COPY (MiB)':>12}"
+        f" {'BYTES/NODE':>12}"
+    )
+    print(
+        f"{len(nodes):>8} {dag_time:>14.3f} {nodes_time:>16.3f} {size / 2**20:>12.1f}"
+        f" {size / len(nodes):>12.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
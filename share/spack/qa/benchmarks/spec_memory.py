@@ -0,0 +1,158 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmark the memory needed to hold many concrete specs.
+
+Generates a specfile with a DAG of many concrete nodes, then measures, in a
+fresh process, the time and the growth of the peak and final resident memory
+of reading it with ``Spec.from_json``. The final memory is also reported per
+node, since it is what the specs keep alive once read.
+
+Run with::
+
+    spack python share/spack/qa/benchmarks/spec_memory.py --nodes 30000
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import random
+import resource
+import string
+import sys
+import tempfile
+import time
+
+import spack.spec
+
+
+def _hash(rng):
+    return "".join(rng.choice(string.ascii_lowercase + "234567") for _ in range(32))
+
+
+def _node(name, hash, dependencies):
+    return {
+        "name": name,
+        "version": "1.0",
+        "arch": {
+            "platform": "linux",
+            "platform_os": "centos8",
+            "target": {
+                "name": "x86_64",
+                "vendor": "GenuineIntel",
+                "features": [],
+                "generation": 0,
+                "parents": [],
+            },
+        },
+        "compiler": {"name": "gcc", "version": "12.3.0"},
+        "namespace": "builtin",
+        "parameters": {
+            "build_system": "generic",
+            "shared": True,
+            "pic": True,
+            "libs": ["shared", "static"],
+            "cflags": [],
+            "cppflags": [],
+            "cxxflags": [],
+            "fflags": [],
+            "ldflags": [],
+            "ldlibs": [],
+        },
+        "package_hash": hash + "=" * 4,
+        "dependencies": [
+            {
+                "name": dname,
+                "hash": dhash,
+                "parameters": {"deptypes": ["build", "link"], "virtuals": []},
+            }
+            for dname, dhash in dependencies
+        ],
+        "hash": hash,
+    }
+
+
+def write_specfile(path, nodes, max_deps, seed=0):
+    """Write a specfile with ``nodes`` nodes, where each node depends on up to
+    ``max_deps`` of the 100 nodes preceding it, and the last node on all the nodes
+    without dependents, so that it is the root."""
+    rng = random.Random(seed)
+    hashes, entries, roots = [], [], {}
+    for i in range(nodes - 1):
+        name, hash = f"pkg-{i}", _hash(rng)
+        candidates = range(max(0, i - 100), i)
+        chosen = rng.sample(candidates, min(len(candidates), rng.randint(0, max_deps)))
+        for j in chosen:
+            roots.pop(j, None)
+        entries.append(_node(name, hash, [(f"pkg-{j}", hashes[j]) for j in chosen]))
+        hashes.append(hash)
+        roots[i] = None
+    root = _node("root", _hash(rng), [(f"pkg-{j}", hashes[j]) for j in roots])
+    with open(path, "w") as f:
+        json.dump({"spec": {"_meta": {"version": 4}, "nodes": [root] + entries[::-1]}}, f)
+
+
+def _rss():
+    """Current resident set size in bytes, or 0 if not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return 0
+
+
+def _measure(path, queue):
+    gc.collect()
+    rss_before, peak_rss_before = _rss(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with open(path) as f:
+        spec = spack.spec.Spec.from_json(f)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    rss, peak_rss = _rss(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    nodes = sum(1 for _ in spec.traverse())
+    queue.put((nodes, elapsed, (peak_rss - peak_rss_before) * scale, rss - rss_before))
+
+
+def measure(path):
+    """Return the number of nodes, the time, and the growth of the peak and of the
+    final RSS of reading a specfile in a new process."""
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=30000, help="nodes in the DAG")
+    parser.add_argument("--max-deps", type=int, default=6, help="dependencies per node")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of the benchmark")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "spec.json")
+        write_specfile(path, args.nodes, args.max_deps)
+        print(f"specfile of {os.path.getsize(path) / 2**20:.1f} MiB")
+        results = [measure(path) for _ in range(args.repeat)]
+        nodes = results[0][0]
+        elapsed, peak_rss, rss = (min(r[i] for r in results) for i in range(1, 4))
+        print(
+            f"{'NODES':>8} {'TIME (s)':>10} {'PEAK RSS (MiB)':>16} {'FINAL RSS (MiB)':>16}"
+            f" {'BYTES/NODE':>12}"
+        )
+        print(
+            f"{nodes:>8} {elapsed:>10.3f} {peak_rss / 2**20:>16.1f} {rss / 2**20:>16.1f}"
+            f" {rss / nodes:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
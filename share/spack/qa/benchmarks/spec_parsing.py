@@ -0,0 +1,81 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmark the parsing of spec strings.
+
+Takes as corpus the ``when=`` arguments of the directives in the packages of the
+builtin repository, then times tokenizing them, parsing them without the cache of
+parsed specs, and constructing specs from them with an empty cache and with a full
+one, which is what happens when the same strings are parsed again.
+
+Run with::
+
+    spack python share/spack/qa/benchmarks/spec_parsing.py
+"""
+import argparse
+import glob
+import os
+import re
+import time
+
+import spack.parser
+import spack.paths
+import spack.spec
+
+#: Matches the quoted when= arguments in a package.py
+WHEN = re.compile(r"""when=(["'])(.*?)\1""")
+
+
+def when_strings(repo_path):
+    """Return the when= arguments of the directives of the packages in a repository,
+    which can be parsed, in the order they appear."""
+    strings = []
+    for path in sorted(glob.glob(os.path.join(repo_path, "packages", "*", "package.py"))):
+        with open(path) as f:
+            strings.extend(match.group(2) for match in WHEN.finditer(f.read()))
+
+    def parses(string):
+        try:
+            spack.parser.parse_one_or_raise(string)
+            return True
+        except Exception:
+            return False
+
+    return [s for s in strings if parses(s)]
+
+
+def timed(fn, strings, repeat, setup=lambda: None):
+    """Minimum time over ``repeat`` runs of calling fn on all the strings."""
+    times = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        for string in strings:
+            fn(string)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs of the benchmark")
+    args = parser.parse_args()
+
+    strings = when_strings(spack.paths.packages_path)
+    print(f"{len(strings)} spec strings, {len(set(strings))} unique")
+
+    clear = spack.parser._parse_one_cached.cache_clear
+    results = [
+        ("tokenize", timed(lambda s: list(spack.parser.tokenize(s)), strings, args.repeat)),
+        ("parse", timed(spack.parser.parse_one_or_raise, strings, args.repeat)),
+        ("Spec(), cold cache", timed(spack.spec.Spec, strings, args.repeat, setup=clear)),
+        ("Spec(), warm cache", timed(spack.spec.Spec, strings, args.repeat)),
+    ]
+    print(f"{'OPERATION':>20} {'TIME (s)':>10} {'PER STRING (us)':>16}")
+    for name, elapsed in results:
+        print(f"{name:>20} {elapsed:>10.3f} {1e6 * elapsed / len(strings):>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
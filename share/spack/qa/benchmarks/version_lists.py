@@ -0,0 +1,113 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmark the operations on versions and version lists.
+
+Takes as corpus the versions declared with the ``version()`` directive in each package
+of the builtin repository, then times the operations the solver setup does on them:
+parsing and sorting the versions, making a version list of them, checking which ones
+satisfy a few constraints, as ``define_version_constraints`` does, and taking unions
+and intersections of lists.
+
+Run with::
+
+    spack python share/spack/qa/benchmarks/version_lists.py
+"""
+import argparse
+import glob
+import os
+import re
+import time
+
+import spack.paths
+import spack.version as vn
+
+#: Matches the first argument of the version directives in a package.py
+VERSION = re.compile(r"""^\s*version\(\s*(["'])(.*?)\1""", re.MULTILINE)
+
+
+def declared_versions(repo_path):
+    """Return, for each package in a repository, the list of the strings of the versions
+    it declares, which can be parsed."""
+    result = []
+    for path in sorted(glob.glob(os.path.join(repo_path, "packages", "*", "package.py"))):
+        with open(path) as f:
+            strings = [match.group(2) for match in VERSION.finditer(f.read())]
+
+        def parses(string):
+            try:
+                vn.StandardVersion.from_string(string)
+                return True
+            except ValueError:
+                return False
+
+        strings = [s for s in strings if parses(s)]
+        if strings:
+            result.append(strings)
+    return result
+
+
+def constraints(versions):
+    """Return the version constraints a package is typically subject to: an upper and a
+    lower bound, and a list with a version and a range."""
+    ordered = sorted(versions)
+    low, mid, high = ordered[0], ordered[len(ordered) // 2], ordered[-1]
+    return [
+        vn.VersionList([f":{mid}"]),
+        vn.VersionList([f"{mid}:"]),
+        vn.VersionList([f"{low}", f"{mid}:{high}"]),
+    ]
+
+
+def timed(fn, packages, repeat):
+    """Minimum time over ``repeat`` runs of calling fn on the data of all the packages."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for data in packages:
+            fn(*data)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs of the benchmark")
+    args = parser.parse_args()
+
+    strings = declared_versions(spack.paths.packages_path)
+    versions = [[vn.StandardVersion.from_string(s) for s in p] for p in strings]
+    lists = [vn.VersionList(p) for p in versions]
+    halves = [(vn.VersionList(p[::2]), vn.VersionList(p[1::2])) for p in versions]
+    package_constraints = [constraints(p) for p in versions]
+    with_constraints = list(zip(versions, package_constraints))
+    print(f"{len(strings)} packages, {sum(len(p) for p in strings)} versions")
+
+    def satisfying(versions, constraints):
+        for constraint in constraints:
+            [v for v in versions if v.satisfies(constraint)]
+
+    def intersections(versions, constraints):
+        for constraint in constraints:
+            versions.intersection(constraint)
+
+    results = [
+        (
+            "parse",
+            timed(lambda p: [vn.Version(s) for s in p], [(p,) for p in strings], args.repeat),
+        ),
+        ("sort", timed(sorted, [(p,) for p in versions], args.repeat)),
+        ("hash", timed(lambda p: {hash(v) for v in p}, [(p,) for p in lists], args.repeat)),
+        ("make list", timed(vn.VersionList, [(p,) for p in versions], args.repeat)),
+        ("satisfies", timed(satisfying, with_constraints, args.repeat)),
+        ("union", timed(vn.VersionList.union, halves, args.repeat)),
+        ("intersection", timed(intersections, list(zip(lists, package_constraints)), args.repeat)),
+    ]
+    print(f"{'OPERATION':>14} {'TIME (s)':>10}")
+    for name, elapsed in results:
+        print(f"{name:>14} {elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -416,6 +416,7 @@ complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a restage -d 'rever
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a solve -d 'concretize a specs using an ASP solver'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a spec -d 'show what would be installed, given a spec'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a stage -d 'expand downloaded archive in preparation for install'
+complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a stats -d 'report statistics on the time taken to install packages'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a style -d 'runs source code style checks on spack'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a tags -d 'show package tags and associated packages'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a test -d 'run spack\'s tests for an install'
@@ -1001,7 +1002,7 @@ complete -c spack -n '__fish_spack_using_command ci reproduce-build' -l gpg-url
 complete -c spack -n '__fish_spack_using_command ci reproduce-build' -l gpg-url -r -d 'URL to public GPG key for validating binary cache installs'
 
 # spack clean
-set -g __fish_spack_optspecs_spack_clean h/help s/stage d/downloads f/failures m/misc-cache p/python-cache b/bootstrap a/all
+set -g __fish_spack_optspecs_spack_clean h/help s/stage d/downloads f/failures m/misc-cache c/concretization-cache p/python-cache b/bootstrap a/all
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 clean' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command clean' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command clean' -s h -l help -d 'show this help message and exit'
@@ -1013,6 +1014,8 @@ complete -c spack -n '__fish_spack_using_command clean' -s f -l failures -f -a f
 complete -c spack -n '__fish_spack_using_command clean' -s f -l failures -d 'force removal of all install failure tracking markers'
 complete -c spack -n '__fish_spack_using_command clean' -s m -l misc-cache -f -a misc_cache
 complete -c spack -n '__fish_spack_using_command clean' -s m -l misc-cache -d 'remove long-lived caches, like the virtual package index'
+complete -c spack -n '__fish_spack_using_command clean' -s c -l concretization-cache -f -a concretization_cache
+complete -c spack -n '__fish_spack_using_command clean' -s c -l concretization-cache -d 'remove the caches of the concretizer'
 complete -c spack -n '__fish_spack_using_command clean' -s p -l python-cache -f -a python_cache
 complete -c spack -n '__fish_spack_using_command clean' -s p -l python-cache -d 'remove .pyc, .pyo files and __pycache__ folders'
 complete -c spack -n '__fish_spack_using_command clean' -s b -l bootstrap -f -a bootstrap
@@ -1931,7 +1934,7 @@ complete -c spack -n '__fish_spack_using_command info' -l variants-by-name -f -a
 complete -c spack -n '__fish_spack_using_command info' -l variants-by-name -d 'list variants in strict name order; don\'t group by condition'
 
 # spack install
-set -g __fish_spack_optspecs_spack_install h/help only= u/until= j/jobs= overwrite fail-fast keep-prefix keep-stage dont-restage use-cache no-cache cache-only use-buildcache= include-build-deps no-check-signature show-log-on-error source n/no-checksum deprecated v/verbose fake only-concrete add no-add f/file= clean dirty test= log-format= log-file= help-cdash cdash-upload-url= cdash-build= cdash-site= cdash-track= cdash-buildstamp= y/yes-to-all U/fresh reuse reuse-deps
+set -g __fish_spack_optspecs_spack_install h/help only= u/until= j/jobs= overwrite fail-fast concurrent-packages= keep-prefix keep-stage dont-restage use-cache no-cache cache-only use-buildcache= include-build-deps no-check-signature show-log-on-error source n/no-checksum deprecated v/verbose fake only-concrete add no-add f/file= clean dirty test= log-format= log-file= help-cdash cdash-upload-url= cdash-build= cdash-site= cdash-track= cdash-buildstamp= y/yes-to-all U/fresh reuse reuse-deps
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 install' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command install' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command install' -s h -l help -d 'show this help message and exit'
@@ -1945,6 +1948,8 @@ complete -c spack -n '__fish_spack_using_command install' -l overwrite -f -a ove
 complete -c spack -n '__fish_spack_using_command install' -l overwrite -d 'reinstall an existing spec, even if it has dependents'
 complete -c spack -n '__fish_spack_using_command install' -l fail-fast -f -a fail_fast
 complete -c spack -n '__fish_spack_using_command install' -l fail-fast -d 'stop all builds if any build fails (default is best effort)'
+complete -c spack -n '__fish_spack_using_command install' -l concurrent-packages -r -f -a concurrent_packages
+complete -c spack -n '__fish_spack_using_command install' -l concurrent-packages -r -d 'maximum number of packages to build at the same time (default 1)'
 complete -c spack -n '__fish_spack_using_command install' -l keep-prefix -f -a keep_prefix
 complete -c spack -n '__fish_spack_using_command install' -l keep-prefix -d 'don\'t remove the install prefix if installation fails'
 complete -c spack -n '__fish_spack_using_command install' -l keep-stage -f -a keep_stage
@@ -2577,9 +2582,13 @@ complete -c spack -n '__fish_spack_using_command python' -l path -f -a show_path
 complete -c spack -n '__fish_spack_using_command python' -l path -d 'show path to python interpreter that spack uses'
 
 # spack reindex
-set -g __fish_spack_optspecs_spack_reindex h/help
+set -g __fish_spack_optspecs_spack_reindex h/help j/jobs= incremental
 complete -c spack -n '__fish_spack_using_command reindex' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command reindex' -s h -l help -d 'show this help message and exit'
+complete -c spack -n '__fish_spack_using_command reindex' -s j -l jobs -r -f -a jobs
+complete -c spack -n '__fish_spack_using_command reindex' -s j -l jobs -r -d 'number of threads looking for and reading spec files concurrently'
+complete -c spack -n '__fish_spack_using_command reindex' -l incremental -f -a incremental
+complete -c spack -n '__fish_spack_using_command reindex' -l incremental -d 'only read the spec files modified since the database was last written'
 
 # spack remove
 set -g __fish_spack_optspecs_spack_remove h/help a/all l/list-name= f/force
@@ -2766,6 +2775,50 @@ complete -c spack -n '__fish_spack_using_command stage' -l reuse -d 'reuse insta
 complete -c spack -n '__fish_spack_using_command stage' -l reuse-deps -f -a concretizer_reuse
 complete -c spack -n '__fish_spack_using_command stage' -l reuse-deps -d 'reuse installed dependencies only'
 
+# spack stats
+set -g __fish_spack_optspecs_spack_stats h/help
+complete -c spack -n '__fish_spack_using_command_pos 0 stats' -f -a slowest -d 'show the packages taking the longest to install'
+complete -c spack -n '__fish_spack_using_command_pos 0 stats' -f -a phases -d 'show the mean time of each phase of the builds of a package'
+complete -c spack -n '__fish_spack_using_command_pos 0 stats' -f -a regressions -d 'show packages whose latest version builds slower than the previous one'
+complete -c spack -n '__fish_spack_using_command_pos 0 stats' -f -a cache -d 'show how many installs were from binary caches rather than from sources'
+complete -c spack -n '__fish_spack_using_command_pos 0 stats' -f -a clear -d 'remove all the recorded install times'
+complete -c spack -n '__fish_spack_using_command stats' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command stats' -s h -l help -d 'show this help message and exit'
+
+# spack stats slowest
+set -g __fish_spack_optspecs_spack_stats_slowest h/help n/number= from-cache
+complete -c spack -n '__fish_spack_using_command stats slowest' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command stats slowest' -s h -l help -d 'show this help message and exit'
+complete -c spack -n '__fish_spack_using_command stats slowest' -s n -l number -r -f -a number
+complete -c spack -n '__fish_spack_using_command stats slowest' -s n -l number -r -d 'number of packages to show (default 10)'
+complete -c spack -n '__fish_spack_using_command stats slowest' -l from-cache -f -a from_cache
+complete -c spack -n '__fish_spack_using_command stats slowest' -l from-cache -d 'rank installs from binary caches instead of builds from sources'
+
+# spack stats phases
+set -g __fish_spack_optspecs_spack_stats_phases h/help version=
+complete -c spack -n '__fish_spack_using_command_pos 0 stats phases' -f -a '(__fish_spack_packages)'
+complete -c spack -n '__fish_spack_using_command stats phases' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command stats phases' -s h -l help -d 'show this help message and exit'
+complete -c spack -n '__fish_spack_using_command stats phases' -l version -r -f -a version
+complete -c spack -n '__fish_spack_using_command stats phases' -l version -r -d 'only consider builds of this version'
+
+# spack stats regressions
+set -g __fish_spack_optspecs_spack_stats_regressions h/help t/threshold=
+complete -c spack -n '__fish_spack_using_command stats regressions' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command stats regressions' -s h -l help -d 'show this help message and exit'
+complete -c spack -n '__fish_spack_using_command stats regressions' -s t -l threshold -r -f -a threshold
+complete -c spack -n '__fish_spack_using_command stats regressions' -s t -l threshold -r -d 'minimum slowdown to report, in percent (default 20)'
+
+# spack stats cache
+set -g __fish_spack_optspecs_spack_stats_cache h/help
+complete -c spack -n '__fish_spack_using_command stats cache' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command stats cache' -s h -l help -d 'show this help message and exit'
+
+# spack stats clear
+set -g __fish_spack_optspecs_spack_stats_clear h/help
+complete -c spack -n '__fish_spack_using_command stats clear' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command stats clear' -s h -l help -d 'show this help message and exit'
+
 # spack style
 set -g __fish_spack_optspecs_spack_style h/help b/base= a/all r/root-relative U/no-untracked f/fix root= t/tool= s/skip=
 